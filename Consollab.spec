@@ -13,7 +13,7 @@ a = Analysis(
     ['splash_app.py'],
     pathex=[],
     binaries=[],
-    datas=[('version_info.py', '.'), ('streamlit_app.py', '.'), ('ConsolLab_logo.png', '.')] + streamlit_datas + streamlit_metadata + packaging_metadata + requests_metadata,
+    datas=[('version_info.py', '.'), ('streamlit_app.py', '.'), ('workbook_io.py', '.'), ('fs_cache.py', '.'), ('consolidation.py', '.'), ('coa_model.py', '.'), ('excel_export.py', '.'), ('columnar_export.py', '.'), ('save_jobs.py', '.'), ('close_package.py', '.'), ('sheet_cache.py', '.'), ('adjustment_ledger.py', '.'), ('adjustment_effects.py', '.'), ('caje_rules.py', '.'), ('carryover.py', '.'), ('balance_check.py', '.'), ('period_store.py', '.'), ('ce_layout.py', '.'), ('ConsolLab_logo.png', '.')] + streamlit_datas + streamlit_metadata + packaging_metadata + requests_metadata,
     hiddenimports=[
         'streamlit',
         'streamlit.runtime.scriptrunner.magic_funcs', 
@@ -25,8 +25,10 @@ a = Analysis(
         'packaging.requirements',
         'pandas',
         'numpy',
+        'sqlite3',
         'altair',
         'pyarrow',
+        'python_calamine',
         'tenacity',
         'rich',
         'click',
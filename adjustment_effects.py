@@ -0,0 +1,201 @@
+"""
+연결조정분개의 법인세/비지배지분(NCI) 효과 자동계산.
+
+조정명세 원장(adjustment_ledger)에서 CAJE02/03/05/96 시트의 당기 손익(R/X) 행을 골라 한 번에 계산하고,
+CAJE97(법인세비용/이연법인세) · CAJE98(이익잉여금/비지배지분순이익) 분개 쌍을
+배열 연산으로 만듭니다. (시트/행 순서는 시트별로 행을 순회하던 기존 방식과 동일)
+
+CAJE 유형별 규칙 (TAX_NCI_RULES)
+- post_to: 효과 분개의 회사와 세율 기준
+  "asset" = 시트의 첫 자산(A) 행 회사 (자산 행이 없으면 시트 전체 건너뜀), "row" = 손익 행의 회사
+- tax: 법인세효과
+  "asset_total" = 시트의 자산 행 금액 합계 × 세율 (시트당 1건)
+  "row" = 손익 행별 금액 × 세율 (비용(X) 행은 부호 반대)
+- NCI 효과 = -금액 × (1 - 세율) × (1 - 손익 행 회사의 지분율)
+- 금액의 절댓값이 1 이하인 효과는 분개하지 않음
+"""
+import numpy as np
+import pandas as pd
+
+ENTRY_COLUMNS = ["회사명", "계정코드", "계정명", "당기전기", "금액", "설명"]
+
+TAX_NCI_RULES = {
+    "CAJE02": {"post_to": "asset", "tax": "asset_total"},
+    "CAJE03": {"post_to": "asset", "tax": "row"},
+    "CAJE96": {"post_to": "row", "tax": "row"},
+    "CAJE05": {"post_to": "row", "tax": "row"},
+}
+
+
+def rate_lookup(keys, rates):
+    """회사명 Series에 대응하는 비율 배열 (rates에 없는 회사는 0.0, 값이 NaN이면 NaN 그대로)"""
+    mapping = {key: rates.get(key, 0.0) for key in pd.unique(keys)}
+    return keys.map(mapping).to_numpy(dtype=float)
+
+
+def paired_entries(
+    companies, first_account, first_amounts, second_account, second_amounts, descriptions, period="당기"
+):
+    """
+    효과 하나당 분개 두 줄(first, second)을 번갈아 쌓은 DataFrame을 만듭니다.
+    *_account: (계정코드, 계정명), companies/descriptions/*_amounts: 효과별 배열, period: 당기전기 값
+    """
+    n = len(companies)
+    if n == 0:
+        return pd.DataFrame(columns=ENTRY_COLUMNS)
+    pair = np.repeat(np.arange(n), 2)
+    codes = np.array([first_account[0], second_account[0]], dtype=object)
+    names = np.array([first_account[1], second_account[1]], dtype=object)
+    return pd.DataFrame(
+        {
+            "회사명": np.asarray(companies, dtype=object)[pair],
+            "계정코드": np.tile(codes, n),
+            "계정명": np.tile(names, n),
+            "당기전기": period,
+            "금액": np.column_stack([first_amounts, second_amounts]).ravel(),
+            "설명": np.asarray(descriptions, dtype=object)[pair],
+        }
+    )
+
+
+def _rule_rows(ledger, fs_map):
+    """규칙이 있는 CAJE 시트의 원장 행에 설명 문자열과 FS_Element를 붙입니다."""
+    rows = ledger.rows(types=list(TAX_NCI_RULES))
+    if rows.empty:
+        return None
+    return rows.assign(
+        _desc=rows["설명"].astype(str),
+        FS_Element=rows["계정코드"].map(fs_map),
+    )
+
+
+def tax_nci_effects(ledger, fs_map, accounts):
+    """
+    CAJE 시트들의 법인세/NCI 효과 분개를 계산합니다.
+    ledger: AdjustmentLedger (행 회사의 세율/비지배지분율 열과 Info 비율 사용)
+    fs_map: 계정코드 -> FS_Element
+    accounts: {"it": 법인세비용, "dta": 이연법인세, "re": 이익잉여금, "nci_pl": 비지배지분순이익}
+              각 값은 (계정코드, 계정명)
+    반환: (CAJE97 추가분 DataFrame, CAJE98 추가분 DataFrame)
+    """
+    empty = pd.DataFrame(columns=ENTRY_COLUMNS)
+    rows = _rule_rows(ledger, fs_map)
+    if rows is None:
+        return empty, empty
+
+    post_to = rows["유형"].map({t: rule["post_to"] for t, rule in TAX_NCI_RULES.items()})
+    tax_mode = rows["유형"].map({t: rule["tax"] for t, rule in TAX_NCI_RULES.items()})
+
+    # 자산 기준 시트: 첫 자산 행의 회사 (전기/빈 행 포함 시트 전체 기준)
+    asset_rows = rows[(post_to == "asset") & (rows["FS_Element"] == "A")]
+    asset_corp = asset_rows.drop_duplicates("_sheet").set_index("_sheet")["회사명"]
+
+    current = rows[rows["당기전기"] == "당기"].dropna(subset=["금액", "계정코드", "회사명"])
+    pl = current[current["FS_Element"].isin(["R", "X"])]
+    pl = pl[(post_to.loc[pl.index] == "row") | pl["_sheet"].isin(asset_corp.index)]
+    pl_post_to = post_to.loc[pl.index]
+    pl_tax_mode = tax_mode.loc[pl.index]
+
+    is_row = (pl_post_to == "row").to_numpy()
+    corp = pl["회사명"].where(is_row, pl["_sheet"].map(asset_corp))
+    tax_rate = np.where(is_row, pl["세율"].to_numpy(), rate_lookup(corp, ledger.tax_rates))
+    nci_rate = pl["비지배지분율"].to_numpy()
+    amount = pl["금액"].to_numpy()
+    desc = ("[" + pl["시트"] + "] " + pl["_desc"] + " 관련").to_numpy()
+    is_expense = (pl["FS_Element"] == "X").to_numpy()
+
+    # --- 법인세효과: 손익 행별 ---
+    row_tax = (pl_tax_mode == "row").to_numpy()
+    tax_effect = np.where(is_expense, -amount * tax_rate, amount * tax_rate)
+    keep = row_tax & (np.abs(tax_effect) > 1)
+    tax_parts = [
+        pd.DataFrame(
+            {
+                "_sheet": pl["_sheet"].to_numpy()[keep],
+                "_row": pl["_row"].to_numpy()[keep],
+                "회사명": corp.to_numpy()[keep],
+                "금액": tax_effect[keep],
+                "설명": desc[keep] + " 법인세효과",
+            }
+        )
+    ]
+
+    # --- 법인세효과: 자산 금액 합계 기준 (시트당 1건, 시트의 손익 행보다 앞) ---
+    total_sheets = pl.loc[(pl_tax_mode == "asset_total").to_numpy(), "_sheet"].unique()
+    if len(total_sheets):
+        totals = asset_rows[asset_rows["_sheet"].isin(total_sheets)]
+        sheet_tax = []
+        for sheet_no, sheet_assets in totals.groupby("_sheet", sort=False):
+            sheet_corp = asset_corp[sheet_no]
+            effect = sheet_assets["금액"].sum() * ledger.tax_rates.get(sheet_corp, 0.0)
+            if abs(effect) > 1:
+                sheet_name = sheet_assets["시트"].iloc[0]
+                sheet_tax.append((sheet_no, -1, sheet_corp, effect, f"[{sheet_name}] 미실현이익 법인세효과"))
+        tax_parts.append(pd.DataFrame(sheet_tax, columns=["_sheet", "_row", "회사명", "금액", "설명"]))
+
+    tax_parts = [part for part in tax_parts if not part.empty]
+    if tax_parts:
+        taxes = pd.concat(tax_parts, ignore_index=True).sort_values(
+            ["_sheet", "_row"], kind="mergesort"
+        )
+        tax_df = paired_entries(
+            taxes["회사명"].to_numpy(),
+            accounts["it"], taxes["금액"].to_numpy(),
+            accounts["dta"], taxes["금액"].to_numpy(),
+            taxes["설명"].to_numpy(),
+        )
+    else:
+        tax_df = empty
+
+    # --- NCI 효과 ---
+    nci_effect = -amount * (1 - tax_rate) * nci_rate
+    keep = (nci_rate > 0) & (np.abs(nci_effect) > 1)
+    nci_df = paired_entries(
+        corp.to_numpy()[keep],
+        accounts["re"], -nci_effect[keep],
+        accounts["nci_pl"], nci_effect[keep],
+        desc[keep] + " 비지배지분효과",
+    )
+    return tax_df, nci_df
+
+
+def ce_nci_effects(block, corp, nci_rate, nci_pl, nci_equity, name_map):
+    """
+    자회사 CE 블록(ce_layout.CEBlock)의 당기 변동에 따른 비지배지분 안분 분개.
+    기초/기말을 제외한 변동 행마다 자본 계정(마지막 비지배지분 열 제외) 합계 × 비지배지분율을
+    계정별 금액 비중으로 나눠, 자본 계정(조정코드 행의 계정)과 상대 계정 쌍으로 기록합니다.
+    상대 계정: 계정코드에 '_NI'가 있는 행은 nci_pl, 그 외는 nci_equity ((계정코드, 계정명))
+    행 합계 또는 안분 금액의 절댓값이 1 이하이면 분개하지 않습니다. (행 순서, 계정 순서)
+    """
+    if block.adjust_codes is None:
+        raise ValueError("CE 시트에서 '조정코드' 행을 찾을 수 없습니다.")
+    labels, row_codes, values = block.changes()
+    values = values[:, :-1]
+    row_sum = values.sum(axis=1)
+    rows = np.abs(row_sum) > 1
+    labels, row_codes, values, row_sum = labels[rows], row_codes[rows], values[rows], row_sum[rows]
+    effects = values / row_sum[:, None] * (row_sum * nci_rate)[:, None]
+    row_idx, col_idx = np.nonzero(np.abs(effects) > 1)
+    n = len(row_idx)
+    if n == 0:
+        return pd.DataFrame(columns=ENTRY_COLUMNS)
+
+    equity_codes = np.asarray(block.adjust_codes[:-1], dtype=object)[col_idx]
+    is_ni = np.array(["_NI" in str(code) for code in row_codes], dtype=bool)[row_idx]
+    contra_codes = np.where(is_ni, nci_pl[0], nci_equity[0]).astype(object)
+    contra_names = np.where(is_ni, nci_pl[1], nci_equity[1]).astype(object)
+    descriptions = np.array([f"{corp} 자본변동 ({label})" for label in labels], dtype=object)
+    amounts = effects[row_idx, col_idx]
+    pair = np.repeat(np.arange(n), 2)
+    return pd.DataFrame(
+        {
+            "회사명": corp,
+            "계정코드": np.column_stack([equity_codes, contra_codes]).ravel(),
+            "계정명": np.column_stack(
+                [[name_map.get(code, "") for code in equity_codes], contra_names]
+            ).ravel(),
+            "당기전기": "당기",
+            "금액": np.column_stack([amounts, -amounts]).ravel(),
+            "설명": descriptions[row_idx][pair],
+        }
+    )
@@ -0,0 +1,172 @@
+"""
+조정명세 파일의 통합 원장(long format).
+
+조정명세 파일 하나를 한 번만 읽어 모든 CAJE* 시트를 한 표로 이어 붙이고,
+Info 시트의 세율/지분율을 회사명 기준으로 붙여 둡니다.
+중간 조정(법인세/NCI 자동계산), 최종 연결조정분개 생성, 차기 이월, 자본변동표는
+시트를 다시 읽지 않고 이 원장을 필터/그룹 연산으로 사용합니다.
+
+entries 열
+- _sheet / _row: 파일 안의 시트 순서 / 시트 안의 행 위치 (원래 순서 복원용)
+  (시트의 완전히 빈 행은 원장에 넣지 않으므로 _row가 연속되지 않을 수 있음)
+- 시트 / 유형: 시트 이름 / 시트 이름의 CAJE 유형 (예: CAJE02)
+- 조정유형: 행의 조정유형 열 (없으면 유형, CAJE_BSPL 등 요약 시트용)
+- 회사명, 계정코드, 계정명, 설명: 시트 값 그대로 (설명 열이 없는 시트는 "")
+- 당기전기: categorical (당기, 전기, 그 외 값 순)
+- 금액: float (금액 열, 없으면 조정금액 열, 둘 다 없으면 0)
+- 세율 / 비지배지분율: 행 회사의 Info 당기세율 / (1 - 당기지분율) (Info에 없는 회사는 0.0)
+"""
+import numpy as np
+import pandas as pd
+
+ENTRY_COLUMNS = [
+    "_sheet", "_row", "시트", "유형", "조정유형", "회사명", "계정코드", "계정명",
+    "당기전기", "금액", "설명", "세율", "비지배지분율",
+]
+PERIODS = ["당기", "전기"]
+
+
+def parse_percent(s):
+    """
+    다양한 형태의 퍼센트 값을 소수점 형태로 변환합니다.
+    - '60%': 0.6
+    - 60: 0.6 (1보다 크므로 퍼센트로 간주)
+    - 0.6: 0.6 (1보다 작거나 같으므로 소수점으로 간주)
+    """
+    # 1. 입력값이 문자열일 경우
+    if isinstance(s, str):
+        try:
+            # 문자열은 항상 '%'가 있거나 퍼센트 숫자로 간주하고 100으로 나눔
+            return float(s.strip().strip('%')) / 100
+        except (ValueError, TypeError):
+            # "hello" 같이 변환 불가능한 문자열은 0.0 처리
+            return 0.
+    # 2. 입력값이 숫자(int, float)일 경우
+    elif isinstance(s, (int, float)):
+        # 숫자의 절댓값이 1보다 크면 (e.g., 60, -50) 퍼센트로 간주하고 100으로 나눔
+        if abs(s) > 1:
+            return float(s) / 100
+        # 숫자의 절댓값이 1보다 작거나 같으면 (e.g., 0.6, -0.5, 1) 이미 변환된 소수점으로 간주하고 그대로 반환
+        else:
+            return float(s)
+
+    # 3. 그 외 타입은 0.0 반환
+    else:
+        return 0.0
+
+
+def caje_type(sheet_name):
+    """시트 이름의 CAJE 유형 (예: 'CAJE02_제품미실현이익제거' -> 'CAJE02')"""
+    return str(sheet_name).upper().split("_")[0]
+
+
+def _info_rates(info_df, column):
+    """Info 시트의 회사명 -> 비율 (열이 없으면 None)"""
+    if column not in info_df.columns:
+        return None
+    key_col = "회사명" if "회사명" in info_df.columns else info_df.columns[0]
+    return dict(zip(info_df[key_col], info_df[column].apply(parse_percent)))
+
+
+def _rate_column(companies, rates):
+    """회사명 Series의 비율 (rates에 없는 회사는 0.0, 값이 NaN이면 NaN 그대로)"""
+    if not rates:
+        return np.zeros(len(companies))
+    mapping = {key: rates.get(key, 0.0) for key in pd.unique(companies)}
+    return companies.map(mapping).to_numpy(dtype=float)
+
+
+def _sheet_entries(sheet_no, sheet_name, df):
+    """시트 하나를 원장 열로 변환합니다. (완전히 빈 행 제외)"""
+    frame = df.reset_index(drop=True)
+    frame = frame[frame.notna().any(axis=1)]
+
+    def column(name, default=np.nan):
+        return frame[name] if name in frame.columns else default
+
+    if "금액" in frame.columns:
+        amounts = frame["금액"]
+    else:
+        amounts = column("조정금액", 0)
+    return pd.DataFrame(
+        {
+            "_sheet": sheet_no,
+            "_row": frame.index.to_numpy(),
+            "시트": sheet_name,
+            "유형": caje_type(sheet_name),
+            "조정유형": column("조정유형", caje_type(sheet_name)),
+            "회사명": column("회사명"),
+            "계정코드": column("계정코드"),
+            "계정명": column("계정명"),
+            "당기전기": column("당기전기"),
+            "금액": pd.to_numeric(amounts, errors="coerce"),
+            "설명": column("설명", ""),
+        },
+        index=frame.index,
+    )
+
+
+class AdjustmentLedger:
+    """
+    조정명세 파일의 통합 원장.
+    - sheet_names: 파일의 시트 이름 (순서대로)
+    - entries: CAJE* 시트 전체의 long format 표 (모듈 설명 참고)
+    - info: Info 시트 (없으면 None), tax_rates / nci_rates: 회사명 -> 세율 / 비지배지분율
+    - workbook() / sheet(): 적재 스키마가 적용된 원본 시트 (복사본, 빈 행 포함, 템플릿 재작성용)
+    원장은 여러 단계가 함께 사용하므로 entries를 직접 수정하지 말고 복사해서 사용합니다.
+    """
+
+    def __init__(self, sheets):
+        self._sheets = dict(sheets)
+        self.sheet_names = list(self._sheets)
+        self.info = self._sheets.get("Info")
+        self.tax_rates = self.nci_rates = None
+        if self.info is not None:
+            self.tax_rates = _info_rates(self.info, "당기세율")
+            ownership = _info_rates(self.info, "당기지분율")
+            if ownership is not None:
+                self.nci_rates = {corp: 1 - rate for corp, rate in ownership.items()}
+
+        frames = [
+            _sheet_entries(sheet_no, sheet_name, df)
+            for sheet_no, (sheet_name, df) in enumerate(self._sheets.items())
+            if str(sheet_name).upper().startswith("CAJE")
+        ]
+        if frames:
+            entries = pd.concat(frames, ignore_index=True)
+        else:
+            entries = pd.DataFrame(columns=ENTRY_COLUMNS[:-2])
+        entries["금액"] = entries["금액"].astype(float).fillna(0.0)
+        other_periods = sorted(
+            set(entries["당기전기"].dropna().astype(str)) - set(PERIODS)
+        )
+        entries["당기전기"] = pd.Categorical(
+            entries["당기전기"].where(entries["당기전기"].isna(), entries["당기전기"].astype(str)),
+            categories=PERIODS + other_periods,
+        )
+        entries["세율"] = _rate_column(entries["회사명"], self.tax_rates)
+        entries["비지배지분율"] = _rate_column(entries["회사명"], self.nci_rates)
+        self.entries = entries
+
+    def sheet(self, name):
+        """시트 하나의 복사본 (없으면 빈 DataFrame)"""
+        df = self._sheets.get(name)
+        return pd.DataFrame() if df is None else df.copy()
+
+    def has_column(self, name, column):
+        """시트에 열이 있는지 (원장에서 기본값으로 채운 열과 구분할 때 사용)"""
+        df = self._sheets.get(name)
+        return df is not None and column in df.columns
+
+    def workbook(self):
+        """{시트 이름: DataFrame} 복사본 (파일의 시트 순서)"""
+        return {name: df.copy() for name, df in self._sheets.items()}
+
+    def rows(self, sheet=None, types=None):
+        """시트 이름 또는 CAJE 유형으로 거른 entries (원래 시트/행 순서)"""
+        mask = np.ones(len(self.entries), dtype=bool)
+        if sheet is not None:
+            mask &= (self.entries["시트"] == sheet).to_numpy()
+        if types is not None:
+            mask &= self.entries["유형"].isin(types).to_numpy()
+        return self.entries[mask]
@@ -0,0 +1,72 @@
+"""
+연결조정분개 차대 검증.
+
+최종 조정명세 원장의 BS/PL 조정분개(caje_rules.bspl_amounts, caje_bspl_df와 같은 행/부호)를
+원장을 복사하지 않고 (시트, 회사명, 당기전기, 설명)으로 한 번 집계한 뒤, 검증 단위별로 다시 합산해
+차변과 대변이 맞지 않는 그룹만 차이와 함께 반환합니다.
+
+- 부호: 부호 조정 후 금액이 음수면 차변, 양수면 대변 (차이 = 대변 - 차변 = 금액 합계)
+- 검증 단위 (BALANCE_LEVELS): 시트 / 시트×회사명 / 시트×당기전기 / 시트×설명(분개)
+  (회사 간 거래 제거처럼 회사별로는 원래 차대가 맞지 않는 분개도 있으므로 회사 단위 결과는 참고용)
+"""
+import numpy as np
+import pandas as pd
+
+from caje_rules import bspl_amounts
+
+GROUP_KEYS = ["시트", "회사명", "당기전기", "설명"]
+BALANCE_LEVELS = {
+    "시트": ["시트"],
+    "회사": ["시트", "회사명"],
+    "당기전기": ["시트", "당기전기"],
+    "분개": ["시트", "설명"],
+}
+ISSUE_COLUMNS = ["검증단위"] + GROUP_KEYS + ["차변", "대변", "차이"]
+
+
+def balance_issues(ledger, fs_map, tolerance=1.0):
+    """
+    차대가 맞지 않는 그룹 목록 (검증단위 순, 같은 단위 안에서는 차이가 큰 순)
+    검증 단위에 포함되지 않는 키 열은 ""입니다. tolerance: 허용 차이 (절댓값 기준)
+    """
+    keep, amounts = bspl_amounts(ledger, fs_map)
+    if not keep.any():
+        return pd.DataFrame(columns=ISSUE_COLUMNS)
+    entries = ledger.entries
+    base = (
+        pd.DataFrame(
+            {
+                "차변": np.where(amounts < 0, -amounts, 0.0),
+                "대변": np.where(amounts > 0, amounts, 0.0),
+            }
+        )
+        .groupby(
+            [entries[key].to_numpy()[keep] for key in GROUP_KEYS[:2]]
+            + [entries["당기전기"].cat.codes.to_numpy()[keep], entries["설명"].to_numpy()[keep]],
+            sort=False,
+            dropna=False,
+        )
+        .sum()
+    )
+    base.index.names = GROUP_KEYS
+    base = base.reset_index()
+    # 집계 후의 작은 표에서만 키를 문자열로 정리 (빈 칸은 "")
+    periods = np.asarray(entries["당기전기"].cat.categories.astype(object).tolist() + [""], dtype=object)
+    base["당기전기"] = periods[base["당기전기"].to_numpy()]
+    for key in ("시트", "회사명", "설명"):
+        base[key] = base[key].where(base[key].notna(), "").astype(str)
+
+    issues = []
+    for level, keys in BALANCE_LEVELS.items():
+        sums = base.groupby(keys, sort=False)[["차변", "대변"]].sum().reset_index()
+        sums["차이"] = sums["대변"] - sums["차변"]
+        failing = sums[sums["차이"].abs() > tolerance]
+        if failing.empty:
+            continue
+        failing = failing.reindex(
+            failing["차이"].abs().sort_values(ascending=False, kind="mergesort").index
+        )
+        issues.append(failing.assign(검증단위=level).reindex(columns=ISSUE_COLUMNS, fill_value=""))
+    if not issues:
+        return pd.DataFrame(columns=ISSUE_COLUMNS)
+    return pd.concat(issues, ignore_index=True)
@@ -0,0 +1,48 @@
+"""
+마감 패키지 내보내기 벤치마크.
+
+연결 정산표 형태의 워크북 여러 개를 패키지(zip)로 저장할 때,
+순차 생성(프로세스 1개)과 프로세스 풀 동시 생성의 시간을 비교합니다.
+(참고용으로 가장 큰 워크북 하나만 만드는 시간도 표시)
+
+실행: python benchmarks/bench_close_package.py [프로세스 수] [워크북별 행 수 ...]
+(기본: 프로세스 4개, 40,000 / 20,000 / 20,000 / 10,000 / 5,000행)
+"""
+import os
+import sys
+import tempfile
+import time
+import zipfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bench_excel_export import working_paper  # noqa: E402
+from close_package import MANIFEST_NAME, PackageItem, write_close_package  # noqa: E402
+from excel_export import export_excel_file  # noqa: E402
+
+
+def main():
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    sizes = [int(n) for n in sys.argv[2:]] or [40_000, 20_000, 20_000, 10_000, 5_000]
+    items = [
+        PackageItem(f"result{i}", f"result{i}.xlsx", {"Consol_BS": working_paper(n, 20, seed=i)})
+        for i, n in enumerate(sizes)
+    ]
+    print(f"워크북 {len(items)}개 (행 수: {', '.join(f'{n:,}' for n in sizes)})")
+
+    with tempfile.TemporaryDirectory() as directory:
+        start = time.perf_counter()
+        export_excel_file(items[sizes.index(max(sizes))].payload, os.path.join(directory, "largest.xlsx"))
+        print(f"{'가장 큰 워크북 하나':<24}{time.perf_counter() - start:>8.2f}s")
+
+        for n_workers in (1, workers):
+            target = os.path.join(directory, f"package_{n_workers}.zip")
+            start = time.perf_counter()
+            write_close_package(items, target, n_workers)
+            seconds = time.perf_counter() - start
+            with zipfile.ZipFile(target) as zf:
+                assert sorted(zf.namelist()) == sorted([i.filename for i in items] + [MANIFEST_NAME])
+            print(f"{f'패키지 (프로세스 {n_workers}개)':<24}{seconds:>8.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+엑셀 내보내기 벤치마크.
+
+연결 정산표 형태의 데이터(계정 정보 + 회사별 금액 열, 일부 소계 행)를
+행 수별로 만들어 내보내기 시간을 비교합니다.
+- 기존 방식: pandas to_excel 후 헤더/소계 행/숫자 열의 모든 셀을 순회하며 서식 지정
+- excel_export: 이름 있는 스타일을 한 번 등록하고 열/행 단위로 지정
+
+실행: python benchmarks/bench_excel_export.py [회사 수] [행 수 ...]
+(기본: 회사 20개, 1,000 / 10,000 / 100,000행)
+"""
+import io
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from openpyxl.styles import Alignment, Font, PatternFill
+from openpyxl.utils import get_column_letter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from excel_export import export_excel  # noqa: E402
+
+
+def legacy_to_excel(df_dict):
+    """변경 전 streamlit_app.to_excel (데이터 유효성 검사 제외)"""
+    output = io.BytesIO()
+    with pd.ExcelWriter(output, engine="openpyxl") as writer:
+        for sheet_name, df in df_dict.items():
+            if df is None:
+                continue
+            is_subtotal_col = df["is_subtotal"] if "is_subtotal" in df.columns else None
+            df_to_write = (
+                df.drop(columns=["is_subtotal"]) if is_subtotal_col is not None else df
+            )
+            df_to_write.to_excel(writer, sheet_name=sheet_name, index=False)
+            ws = writer.sheets[sheet_name]
+
+            header_font = Font(bold=True, color="FFFFFF")
+            header_fill = PatternFill(
+                start_color="4F81BD", end_color="4F81BD", fill_type="solid"
+            )
+            header_alignment = Alignment(
+                horizontal="center", vertical="center", wrap_text=True
+            )
+            for cell in ws[1]:
+                cell.font = header_font
+                cell.fill = header_fill
+                cell.alignment = header_alignment
+
+            if is_subtotal_col is not None:
+                bold_font = Font(bold=True)
+                for row_idx, is_sub in enumerate(is_subtotal_col):
+                    if is_sub:
+                        for cell in ws[row_idx + 2]:
+                            cell.font = bold_font
+
+            for i, column_name in enumerate(df_to_write.columns, 1):
+                column_letter = get_column_letter(i)
+                ws.column_dimensions[column_letter].width = 17
+                if pd.api.types.is_numeric_dtype(df_to_write[df_to_write.columns[i - 1]]):
+                    number_format = "0.000" if sheet_name == "Info" else "#,##0"
+                    for cell in ws[column_letter][1:]:
+                        if isinstance(cell.value, (int, float)):
+                            cell.number_format = number_format
+                            cell.alignment = Alignment(horizontal="right", vertical="center")
+    return output.getvalue()
+
+
+def working_paper(n_rows, n_entities, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame(
+        {
+            "계정코드": [f"{100000 + i}" for i in range(n_rows)],
+            "계정명": [f"계정{i}" for i in range(n_rows)],
+            "FS_Element": rng.choice(["A", "L", "E"], n_rows),
+        }
+    )
+    amounts = rng.integers(-10**9, 10**9, size=(n_rows, n_entities))
+    for j in range(n_entities):
+        df[f"회사{j + 1}"] = amounts[:, j]
+    df["단순합계"] = amounts.sum(axis=1)
+    df["is_subtotal"] = np.arange(n_rows) % 10 == 0
+    return df
+
+
+def measure(func, df_dict):
+    start = time.perf_counter()
+    data = func(df_dict)
+    return time.perf_counter() - start, len(data)
+
+
+def main():
+    n_entities = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    sizes = [int(n) for n in sys.argv[2:]] or [1_000, 10_000, 100_000]
+    backends = [("기존 to_excel", legacy_to_excel), ("excel_export", export_excel)]
+
+    header = f"{'행 수':>10}" + "".join(f"{name:>20}" for name, _ in backends) + f"{'배속':>10}"
+    print(f"회사 {n_entities}개 + 단순합계 (금액 열 {n_entities + 1}개)")
+    print(header)
+    print("-" * len(header))
+    for n_rows in sizes:
+        df_dict = {"Consol_BS": working_paper(n_rows, n_entities)}
+        seconds = [measure(func, df_dict)[0] for _, func in backends]
+        print(
+            f"{n_rows:>10,}"
+            + "".join(f"{s:>19.2f}s" for s in seconds)
+            + f"{seconds[0] / seconds[1]:>9.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
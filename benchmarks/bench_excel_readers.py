@@ -0,0 +1,83 @@
+"""
+엑셀 읽기 엔진 벤치마크.
+
+templates/ 폴더의 워크북을 엔진별로 읽어 전체 시트 파싱 시간을 비교합니다.
+- openpyxl (전체 모드): 셀 객체 모델 전체를 만드는 load_workbook 기본 모드 (비교 기준)
+- openpyxl (read_only): pandas 기본 엔진. 읽기 전용·값 전용 스트리밍
+- calamine: python-calamine이 설치된 경우
+
+실행: python benchmarks/bench_excel_readers.py [반복 횟수]
+"""
+import glob
+import io
+import os
+import statistics
+import sys
+import time
+
+import openpyxl
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from workbook_io import available_excel_engines  # noqa: E402
+
+TEMPLATES_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "templates"
+)
+
+
+def read_openpyxl_full(data):
+    wb = openpyxl.load_workbook(io.BytesIO(data))
+    try:
+        return {
+            ws.title: pd.DataFrame(list(ws.iter_rows(values_only=True)))
+            for ws in wb.worksheets
+        }
+    finally:
+        wb.close()
+
+
+def read_with_engine(engine):
+    def read(data):
+        return pd.read_excel(io.BytesIO(data), sheet_name=None, engine=engine)
+
+    return read
+
+
+def measure(func, data, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(data)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1000
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    backends = [("openpyxl (전체 모드)", read_openpyxl_full)]
+    backends += [
+        ("openpyxl (read_only)" if engine == "openpyxl" else engine, read_with_engine(engine))
+        for engine in reversed(available_excel_engines())
+    ]
+
+    files = sorted(glob.glob(os.path.join(TEMPLATES_DIR, "*.xlsx")))
+    header = f"{'파일':<50}" + "".join(f"{name:>22}" for name, _ in backends)
+    print(header)
+    print("-" * len(header))
+    totals = [0.0] * len(backends)
+    for path in files:
+        with open(path, "rb") as f:
+            data = f.read()
+        row = f"{os.path.basename(path):<50}"
+        for i, (_, func) in enumerate(backends):
+            ms = measure(func, data, repeat)
+            totals[i] += ms
+            row += f"{ms:>20.1f}ms"
+        print(row)
+    print("-" * len(header))
+    print(f"{'합계':<50}" + "".join(f"{ms:>20.1f}ms" for ms in totals))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+시트 XML 캐시 벤치마크.
+
+조정 파일만 바꿔 다시 실행하는 상황을 흉내 냅니다.
+BS/PL/CF 연결 정산표는 그대로 두고 CAJE 시트만 바꿔 가며 같은 워크북을 여러 번 내보내고,
+캐시 없이 내보낼 때와 시트 캐시를 사용할 때의 시간을 비교합니다.
+
+실행: python benchmarks/bench_sheet_cache.py [정산표 행 수] [반복 횟수]
+(기본: 20,000행, 3회)
+"""
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bench_excel_export import working_paper  # noqa: E402
+from excel_export import export_excel  # noqa: E402
+from sheet_cache import SheetXMLCache  # noqa: E402
+
+
+def caje_sheet(run):
+    return pd.DataFrame(
+        {
+            "회사명": ["회사1", "회사2"] * 50,
+            "계정코드": [f"{100000 + i}" for i in range(100)],
+            "금액": [float(run * 1000 + i) for i in range(100)],
+        }
+    )
+
+
+def main():
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    runs = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    statements = {
+        "Consol_BS": working_paper(n_rows, 20, seed=0),
+        "Consol_PL": working_paper(n_rows // 2, 20, seed=1),
+        "Consol_CF": working_paper(n_rows // 4, 20, seed=2),
+    }
+    print(f"정산표 {n_rows:,} / {n_rows // 2:,} / {n_rows // 4:,}행, CAJE 시트만 매번 변경")
+    print(f"{'실행':>6}{'캐시 없음':>14}{'시트 캐시':>14}")
+    with tempfile.TemporaryDirectory() as directory:
+        cache = SheetXMLCache(directory)
+        for run in range(1, runs + 1):
+            df_dict = dict(statements, CAJE_BSPL=caje_sheet(run))
+            seconds = []
+            for sheet_cache in (None, cache):
+                start = time.perf_counter()
+                export_excel(df_dict, sheet_cache)
+                seconds.append(time.perf_counter() - start)
+            print(f"{run:>6}" + "".join(f"{s:>13.2f}s" for s in seconds))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+"""
+최종 조정명세(CAJE 시트)에서 BS/PL 조정분개와 CF 조정분개를 만드는 규칙.
+
+조정명세 원장(adjustment_ledger)의 모든 CAJE 시트 행을 한 번에 계산합니다. (시트별 분기/pivot_table/행 단위 apply 대체)
+새 CAJE 유형의 CF 처리는 CF_RULES에 한 줄을 추가하면 됩니다.
+
+CF_RULES (CAJE 유형 -> 규칙)
+- method "pl_total": 시트의 손익(R/X) 행 (당기+전기) 합계를 비용(X)은 +, 수익(R)은 -로 더해
+  당기순이익(NI) 계정에 기록하고, offset 계정에 offset_sign을 곱한 금액을 기록합니다.
+  offset: "bs" = 시트의 첫 재무상태(A/L/E) 행 계정, "pl" = 시트의 첫 손익 행 계정
+  (회사명은 시트 첫 행의 회사, 손익 또는 재무상태 행이 없으면 건너뛰고 경고)
+- method "working_capital": (회사명, 계정코드, 설명)별 (당기 - 전기) 증감을
+  운전자본 변동으로 기록합니다. (부채(L)는 +, 그 외는 -, 설명 앞에 prefix)
+규칙이 없는 유형은 CF 조정을 만들지 않습니다.
+
+BSPL_CURRENT_ONLY: BS/PL 조정에 당기 행만 반영하는 유형
+BS/PL 조정 금액의 부호는 자산/비용/영업권(A/X/CA)이면 반대로 바꿉니다.
+금액/조정금액 열은 항상 float64입니다.
+"""
+import numpy as np
+import pandas as pd
+
+from adjustment_ledger import caje_type
+
+CF_RULES = {
+    "CAJE01": {"method": "working_capital", "prefix": "[운전자본]"},
+    "CAJE02": {
+        "method": "pl_total",
+        "offset": "bs",
+        "offset_sign": -1,
+        "ni_desc": "[비현금손익] 미실현이익(NI)",
+        "offset_desc": "[비현금손익] 미실현이익(재고)",
+    },
+    "CAJE03": {
+        "method": "pl_total",
+        "offset": "pl",
+        "offset_sign": -1,
+        "ni_desc": "[비현금손익] 미실현이익(NI)",
+        "offset_desc": "[비현금손익] 미실현이익(손익)",
+    },
+    "CAJE04": {
+        "method": "pl_total",
+        "offset": "pl",
+        "offset_sign": 1,
+        "ni_desc": "[손익/재무활동] 미실현이익(NI)",
+        "offset_desc": "[손익/재무활동] 미실현이익(손익)",
+    },
+    "CAJE05": {
+        "method": "pl_total",
+        "offset": "pl",
+        "offset_sign": 1,
+        "ni_desc": "[손익] 기타손익조정(NI)",
+        "offset_desc": "[손익] 기타손익조정(손익)",
+    },
+    "CAJE97": {
+        "method": "pl_total",
+        "offset": "pl",
+        "offset_sign": -1,
+        "ni_desc": "[비현금손익] 법인세 당기손익 효과(NI)",
+        "offset_desc": "[비현금손익] 법인세바용",
+    },
+}
+
+BSPL_CURRENT_ONLY = ("CAJE01", "CAJE04")
+BSPL_NEGATIVE = ("A", "X", "CA")
+
+BSPL_COLUMNS = ["조정유형", "회사명", "계정코드", "금액", "설명", "당기전기", "FS_Element"]
+CF_COLUMNS = ["조정유형", "회사명", "계정코드", "조정금액", "설명"]
+
+
+def _entry_rows(ledger):
+    """원장의 CAJE 행 (빈 칸은 "", 당기전기는 문자열)"""
+    entries = ledger.entries
+    return pd.DataFrame(
+        {
+            "_sheet": entries["_sheet"],
+            "시트": entries["시트"],
+            "조정유형": entries["유형"],
+            "회사명": entries["회사명"].fillna(""),
+            "계정코드": entries["계정코드"].fillna(""),
+            "금액": entries["금액"],
+            "설명": entries["설명"].fillna(""),
+            "당기전기": entries["당기전기"].astype(object).fillna(""),
+        }
+    )
+
+
+def _bspl_signed(types, codes, periods, amounts, fs_map):
+    """
+    BS/PL 조정분개 대상 행 mask와 (FS_Element, 부호 조정 금액)
+    (계정코드가 없거나 금액이 0인 행 제외, 자산/비용/영업권은 부호 반대)
+    """
+    keep = (codes.notna() & codes.astype(bool) & (amounts != 0)).to_numpy()
+    keep &= (~types.isin(BSPL_CURRENT_ONLY) | (periods == "당기")).to_numpy()
+    kept_codes = codes[keep]
+    fs_lookup = {code: fs_map.get(code, "") for code in pd.unique(kept_codes)}
+    fs_elements = kept_codes.map(fs_lookup)
+    sign = np.where(fs_elements.isin(BSPL_NEGATIVE), -1, 1)
+    return keep, fs_elements, amounts.to_numpy(dtype=float)[keep] * sign
+
+
+def _bspl_entries(rows, fs_map):
+    """BS/PL 조정분개 (_bspl_signed 기준)"""
+    keep, fs_elements, amounts = _bspl_signed(
+        rows["조정유형"], rows["계정코드"], rows["당기전기"], rows["금액"], fs_map
+    )
+    if not keep.any():
+        return pd.DataFrame(columns=BSPL_COLUMNS)
+    result = rows.loc[keep, BSPL_COLUMNS[:-1]].assign(금액=amounts, FS_Element=fs_elements)
+    return result.reset_index(drop=True)
+
+
+def bspl_amounts(ledger, fs_map):
+    """
+    원장 entries 중 BS/PL 조정분개 대상 행 mask와 부호 조정 금액 (caje_bspl_df와 같은 행/부호)
+    entries를 복사하지 않으므로 검증/집계용으로 사용합니다.
+    """
+    entries = ledger.entries
+    keep, _, amounts = _bspl_signed(
+        entries["유형"], entries["계정코드"], entries["당기전기"], entries["금액"], fs_map
+    )
+    return keep, amounts
+
+
+def _period_sums(rows, keys):
+    """keys + 당기전기별 금액 합계의 당기/전기 열 (없는 쪽은 0)"""
+    sums = rows.groupby(keys + ["당기전기"])["금액"].sum().unstack("당기전기")
+    current = sums["당기"].fillna(0) if "당기" in sums.columns else 0
+    prior = sums["전기"].fillna(0) if "전기" in sums.columns else 0
+    return sums.index, current, prior
+
+
+def _pl_total_entries(rows, sheets, coa_df, ni_code, warnings):
+    """
+    pl_total 규칙의 CF 조정: [(시트 번호, DataFrame)]
+    sheets: [(시트 번호, 시트 이름, 조정유형, 첫 행 회사명)] (빈 시트 포함)
+    """
+    if ni_code is None:
+        for _, sheet_name, _, _ in sheets:
+            warnings.append(f"[{sheet_name}] CF조정 건너뜀: 당기순이익 계정 코드를 CoA에서 찾을 수 없습니다.")
+        return []
+
+    merged = rows.merge(coa_df[["계정코드", "FS_Element"]], on="계정코드", how="left")
+    pl_rows = merged[merged["FS_Element"].isin(["R", "X"])]
+    bs_rows = merged[merged["FS_Element"].isin(["A", "L", "E"])]
+    first_pl = pl_rows.drop_duplicates("_sheet").set_index("_sheet")["계정코드"]
+    first_bs = bs_rows.drop_duplicates("_sheet").set_index("_sheet")["계정코드"]
+
+    # (시트, 계정코드, FS_Element)별 (당기 + 전기) -> 손익 영향 (비용 +, 수익 -)
+    if not pl_rows.empty:
+        index, current, prior = _period_sums(pl_rows, ["_sheet", "계정코드", "FS_Element"])
+        change = pd.Series(current + prior, index=index)
+        impact = change.where(index.get_level_values("FS_Element") == "X", -change)
+
+    result = []
+    for sheet_no, sheet_name, sheet_type, corp in sheets:
+        if sheet_no not in first_pl.index or sheet_no not in first_bs.index:
+            warnings.append(
+                f"[{sheet_name}] CF조정 건너뜀: 시트에서 손익(R/X) 또는 재무상태(A/L/E) 계정을 찾을 수 없습니다."
+            )
+            continue
+        rule = CF_RULES[sheet_type]
+        total = impact.xs(sheet_no, level="_sheet").sum()
+        offset_code = (first_bs if rule["offset"] == "bs" else first_pl)[sheet_no]
+        entries = [
+            (sheet_type, corp, ni_code, float(total), rule["ni_desc"]),
+            (sheet_type, corp, offset_code, float(total * rule["offset_sign"]), rule["offset_desc"]),
+        ]
+        result.append((sheet_no, pd.DataFrame(entries, columns=CF_COLUMNS)))
+    return result
+
+
+def _working_capital_entries(rows, fs_map):
+    """
+    working_capital 규칙의 CF 조정: [(시트 번호, DataFrame)]
+    시트별로 (회사명, 계정코드, 설명) 순으로 정렬되며 0에 가까운 증감은 제외합니다.
+    """
+    if rows.empty:
+        return []
+    index, current, prior = _period_sums(rows, ["_sheet", "조정유형", "회사명", "계정코드", "설명"])
+    keys = index.to_frame(index=False)
+    change = np.broadcast_to(np.asarray(current - prior, dtype=float), len(keys))
+    fs_elements = keys["계정코드"].map({code: fs_map.get(code, "") for code in pd.unique(keys["계정코드"])})
+    amounts = np.where(fs_elements == "L", change, -change)
+    keep = np.abs(amounts) > 1e-6
+    keys = keys[keep]
+    prefixes = keys["조정유형"].map({t: rule.get("prefix") for t, rule in CF_RULES.items()})
+    entries = pd.DataFrame(
+        {
+            "조정유형": keys["조정유형"],
+            "회사명": keys["회사명"],
+            "계정코드": keys["계정코드"],
+            "조정금액": amounts[keep],
+            "설명": prefixes + " " + keys["설명"].astype(str),
+        }
+    )
+    return [
+        (sheet_no, part.reset_index(drop=True))
+        for sheet_no, part in entries.groupby(keys["_sheet"], sort=False)
+    ]
+
+
+def caje_entries(ledger, coa):
+    """
+    조정명세 원장(AdjustmentLedger)의 CAJE 시트로 BS/PL 조정분개와 CF 조정분개를 만듭니다.
+    coa: CoAModel
+    반환: (caje_bspl_df, caje_cf_df, 경고 메시지 목록)
+    """
+    warnings = []
+    rows = _entry_rows(ledger)
+    bspl_df = _bspl_entries(rows, coa.fs_map)
+
+    methods = rows["조정유형"].map({t: rule["method"] for t, rule in CF_RULES.items()})
+    first_corp = rows.drop_duplicates("_sheet").set_index("_sheet")["회사명"]
+    pl_total_sheets = [
+        (sheet_no, sheet_name, caje_type(sheet_name), first_corp.get(sheet_no))
+        for sheet_no, sheet_name in enumerate(ledger.sheet_names)
+        if CF_RULES.get(caje_type(sheet_name), {}).get("method") == "pl_total"
+    ]
+    cf_parts = []
+    if pl_total_sheets:
+        cf_parts += _pl_total_entries(
+            rows[methods == "pl_total"], pl_total_sheets, coa.coa_df, coa.ni_code, warnings
+        )
+    cf_parts += _working_capital_entries(rows[methods == "working_capital"], coa.fs_map)
+    cf_parts = [part for _, part in sorted(cf_parts, key=lambda item: item[0]) if not part.empty]
+    if cf_parts:
+        cf_df = pd.concat(cf_parts, ignore_index=True)
+    else:
+        cf_df = pd.DataFrame(columns=CF_COLUMNS)
+    return bspl_df, cf_df, warnings
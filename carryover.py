@@ -0,0 +1,242 @@
+"""
+조정명세 차기 이월.
+
+당기 조정명세 원장(adjustment_ledger)에서 차기에 사용할 전기누적 조정명세 템플릿을 만듭니다.
+행 변환과 법인세효과/재작성 분개는 원장 전체에 대한 배열 연산으로 계산하고,
+시트별로는 원래 열 구성에 맞춰 결과를 조립하기만 합니다.
+roll_forward는 이월 결과로 다시 원장을 만들어 N기간을 한 번에 이월합니다. (재작성 후 여러 기간 재생성용)
+
+CAJE 유형별 이월 규칙 (CARRYOVER_RULES, 규칙이 없는 유형은 "keep")
+- keep: 그대로 유지
+- current_only: 당기 행만 남기고 전기로 변경
+- unrealized_profit: 당기 자산(A) 합계로 [첫 비용(X) 계정 / 이익잉여금] 전기 분개를 다시 작성
+  (자산/비용 행이 모두 있어야 함, 법인세효과 = -합계 × 자산 첫 행 회사 세율)
+- pl_to_retained: 모든 행을 전기로, 비용(X) 행은 부호를 바꿔 이익잉여금으로 대체
+  법인세효과 = 이익잉여금/자본(E) 행 금액 × 세율 (tax_corp "asset" = 시트 첫 자산 행 회사, 자산 행이 없으면 생략
+  / "row" = 행의 회사)
+- nci_dividend: 비지배지분(CE) 행 합계로 계정코드별 [비지배지분 / 이익잉여금] 전기 분개를 다시 작성
+- tax_reset: 당기/전기 행을 지우고 (취득일 등) 나머지 행만 유지, 새 법인세효과는 이 시트 뒤에 추가
+- nci_pl_to_equity: 모든 행을 전기로, 비지배지분순이익 계정은 비지배지분 계정으로 대체
+법인세효과는 절댓값이 1보다 클 때만 [이익잉여금 / 이연법인세] 쌍으로 CAJE97 시트에 추가합니다.
+"""
+import numpy as np
+import pandas as pd
+
+from adjustment_effects import ENTRY_COLUMNS, paired_entries, rate_lookup
+from adjustment_ledger import AdjustmentLedger, caje_type
+
+CARRYOVER_RULES = {
+    "CAJE00": {"method": "keep"},
+    "CAJE01": {"method": "current_only"},
+    "CAJE02": {"method": "unrealized_profit"},
+    "CAJE03": {"method": "pl_to_retained", "tax_corp": "asset"},
+    "CAJE04": {"method": "nci_dividend"},
+    "CAJE96": {"method": "pl_to_retained", "tax_corp": "row"},
+    "CAJE97": {"method": "tax_reset"},
+    "CAJE98": {"method": "nci_pl_to_equity"},
+}
+NEW_TAX_SHEET = "CAJE97_법인세조정"
+TAX_COLUMNS = ["_sheet", "_row", "회사명", "금액1", "금액2", "설명"]
+
+
+def carryover_accounts(coa):
+    """이월 분개에 쓰는 계정 {"re", "dtl", "nci_pl", "nci_equity"} (CoA에 없으면 기본 계정)"""
+    return {
+        "re": coa.aje_account("E"),
+        "dtl": coa.aje_account("L"),
+        "nci_pl": coa.nci_pl[0] if coa.nci_pl is not None else "302000",
+        "nci_equity": coa.nci_equity if coa.nci_equity is not None else ("201100", "비지배지분"),
+    }
+
+
+def _method(sheet_name):
+    return CARRYOVER_RULES.get(caje_type(sheet_name), {}).get("method", "keep")
+
+
+def _unrealized_profit(rows, is_current, fs, ledger, accounts):
+    """unrealized_profit 시트의 재작성 분개 {시트 번호: DataFrame}과 법인세효과 DataFrame"""
+    current = rows[is_current]
+    assets = current[fs.loc[current.index] == "A"]
+    expenses = current[fs.loc[current.index] == "X"]
+    first_asset = assets.drop_duplicates("_sheet").set_index("_sheet")
+    first_expense = expenses.drop_duplicates("_sheet").set_index("_sheet")
+
+    rebuilt, taxes = {}, []
+    for sheet_no, sheet_assets in assets.groupby("_sheet", sort=False):
+        if sheet_no not in first_expense.index:
+            continue
+        total = sheet_assets["금액"].sum()
+        corp = first_asset.at[sheet_no, "회사명"]
+        sheet_name = first_asset.at[sheet_no, "시트"]
+        desc = str(first_asset.at[sheet_no, "설명"]) if ledger.has_column(sheet_name, "설명") else "미실현이익"
+        code, name = first_expense.at[sheet_no, "계정코드"], first_expense.at[sheet_no, "계정명"]
+        rebuilt[sheet_no] = pd.DataFrame(
+            [
+                (corp, code, name, "전기", total, desc),
+                (corp, accounts["re"][0], accounts["re"][1], "전기", total, desc),
+            ],
+            columns=ENTRY_COLUMNS,
+        )
+        effect = total * ledger.tax_rates.get(corp, 0.0)
+        if abs(effect) > 1:
+            taxes.append((sheet_no, -1, corp, -effect, -effect, f"전기 미실현이익 법인세효과 ({desc})"))
+    return rebuilt, pd.DataFrame(taxes, columns=TAX_COLUMNS)
+
+
+def _pl_to_retained_taxes(rows, fs, is_expense, ledger):
+    """pl_to_retained 시트의 이익잉여금/자본 행별 법인세효과"""
+    tax_corp = rows["유형"].map({t: rule.get("tax_corp") for t, rule in CARRYOVER_RULES.items()})
+    asset_corp = rows[fs.loc[rows.index] == "A"].drop_duplicates("_sheet").set_index("_sheet")["회사명"]
+    by_asset = (tax_corp == "asset").to_numpy()
+    keep = (fs.loc[rows.index] == "E").to_numpy() | is_expense
+    keep &= ~by_asset | rows["_sheet"].isin(asset_corp.index).to_numpy()
+    rows, by_asset, is_expense = rows[keep], by_asset[keep], is_expense[keep]
+
+    corp = rows["회사명"].where(~by_asset, rows["_sheet"].map(asset_corp))
+    tax_rate = np.where(by_asset, rate_lookup(corp, ledger.tax_rates), rows["세율"].to_numpy())
+    amount = rows["금액"].to_numpy()
+    effect = np.where(is_expense, -amount, amount) * tax_rate
+    keep = np.abs(effect) > 1
+    return pd.DataFrame(
+        {
+            "_sheet": rows["_sheet"].to_numpy()[keep],
+            "_row": rows["_row"].to_numpy()[keep],
+            "회사명": corp.to_numpy()[keep],
+            "금액1": effect[keep],
+            "금액2": -effect[keep],
+            "설명": ("법인세효과 (" + rows["설명"].astype(str) + ")").to_numpy()[keep],
+        }
+    )
+
+
+def _nci_dividend(rows, fs, accounts):
+    """nci_dividend 시트의 재작성 분개 {시트 번호: DataFrame}"""
+    ce_rows = rows[fs.loc[rows.index] == "CE"]
+    rebuilt = {}
+    for sheet_no, sheet_ce in ce_rows.groupby("_sheet", sort=False):
+        total = sheet_ce["금액"].sum()
+        ce_code, ce_name = sheet_ce["계정코드"].iloc[0], sheet_ce["계정명"].iloc[0]
+        by_code = (
+            sheet_ce.dropna(subset=["계정코드"])
+            .drop_duplicates("계정코드")
+            .sort_values("계정코드", kind="mergesort")
+        )
+        n = len(by_code)
+        desc = np.repeat(("배당금 조정 (" + by_code["계정코드"].astype(str) + ")").to_numpy(), 2)
+        rebuilt[sheet_no] = pd.DataFrame(
+            {
+                "회사명": np.repeat(by_code["회사명"].to_numpy(), 2),
+                "계정코드": np.tile(np.array([ce_code, accounts["re"][0]], dtype=object), n),
+                "계정명": np.tile(np.array([ce_name, accounts["re"][1]], dtype=object), n),
+                "당기전기": "전기",
+                "금액": np.tile([total, -total], n),
+                "설명": desc,
+            }
+        )
+    return rebuilt
+
+
+def carry_forward(ledger, coa):
+    """
+    원장을 한 기간 이월한 조정명세 템플릿 {시트 이름: DataFrame}을 반환합니다.
+    시트 순서와 열 구성은 원래 파일과 같고, CAJE97 시트가 없는데 새 법인세효과가 있으면
+    NEW_TAX_SHEET 시트를 끝에 추가합니다.
+    """
+    accounts = carryover_accounts(coa)
+    re_code, re_name = accounts["re"]
+    sheets = ledger.workbook()
+    caje_names = [name for name in sheets if str(name).upper().startswith("CAJE")]
+
+    # 완전히 빈 행은 이월하지 않음 (원장 행 번호와 시트 행 위치를 맞추기 위해 원장을 다시 만듦)
+    cleaned = {name: sheets[name].dropna(how="all") for name in caje_names}
+    if any(len(cleaned[name]) != len(sheets[name]) for name in caje_names):
+        sheets.update({name: df.reset_index(drop=True) for name, df in cleaned.items()})
+        ledger = AdjustmentLedger(sheets)
+        sheets = ledger.workbook()
+
+    entries = ledger.entries
+    fs = entries["계정코드"].map(coa.fs_map)
+    methods = entries["유형"].map({t: _method(t) for t in pd.unique(entries["유형"])})
+    is_current = (entries["당기전기"] == "당기").to_numpy()
+    is_expense = (fs == "X").to_numpy()
+    positions = entries.groupby("_sheet").indices
+
+    # --- 원장 전체에서 재작성 분개/법인세효과 계산 ---
+    profit_mask = (methods == "unrealized_profit").to_numpy()
+    rebuilt, profit_taxes = _unrealized_profit(
+        entries[profit_mask], is_current[profit_mask], fs, ledger, accounts
+    )
+    rebuilt.update(_nci_dividend(entries[(methods == "nci_dividend").to_numpy()], fs, accounts))
+    retained_mask = (methods == "pl_to_retained").to_numpy()
+    retained_taxes = _pl_to_retained_taxes(entries[retained_mask], fs, is_expense[retained_mask], ledger)
+    taxes = pd.concat(
+        [part for part in (profit_taxes, retained_taxes) if not part.empty] or [profit_taxes],
+        ignore_index=True,
+    ).sort_values(["_sheet", "_row"], kind="mergesort")
+    new_tax_df = paired_entries(
+        taxes["회사명"].to_numpy(),
+        accounts["re"], taxes["금액1"].to_numpy(),
+        accounts["dtl"], taxes["금액2"].to_numpy(),
+        taxes["설명"].to_numpy(),
+        period="전기",
+    )
+
+    # --- 시트별 조립 (원래 열 구성 유지) ---
+    output = {}
+    for sheet_no, name in enumerate(ledger.sheet_names):
+        df = sheets[name]
+        if name not in caje_names or df.empty:
+            output[name] = df
+            continue
+        columns = df.columns.drop("FS_Element", errors="ignore")
+        method = _method(name)
+        at = positions.get(sheet_no, np.zeros(0, dtype=int))
+        if method in ("unrealized_profit", "nci_dividend"):
+            new_df = rebuilt.get(sheet_no, pd.DataFrame())
+        elif method == "current_only":
+            new_df = df[is_current[at]].copy()
+            new_df["당기전기"] = "전기"
+        elif method == "pl_to_retained":
+            new_df = df.copy()
+            mask = is_expense[at]
+            new_df.loc[mask, "금액"] = -new_df.loc[mask, "금액"]
+            new_df.loc[mask, "계정코드"] = re_code
+            new_df.loc[mask, "계정명"] = re_name
+            new_df["당기전기"] = "전기"
+        elif method == "nci_pl_to_equity":
+            new_df = df.copy()
+            mask = (new_df["계정코드"] == accounts["nci_pl"]).to_numpy()
+            new_df.loc[mask, "계정코드"] = accounts["nci_equity"][0]
+            new_df.loc[mask, "계정명"] = accounts["nci_equity"][1]
+            new_df["당기전기"] = "전기"
+        elif method == "tax_reset":
+            new_df = df[~df["당기전기"].isin(["당기", "전기"])]
+        else:
+            new_df = df
+        output[name] = new_df.reindex(columns=columns)
+
+    # --- 새 법인세효과를 첫 CAJE97 시트에 추가 ---
+    tax_sheet = next((name for name in caje_names if caje_type(name) == "CAJE97"), None)
+    if tax_sheet is not None:
+        columns = sheets[tax_sheet].columns
+        if columns.empty:
+            columns = ENTRY_COLUMNS
+        parts = [df for df in (output[tax_sheet], new_tax_df) if not df.empty]
+        tax_df = pd.concat(parts, ignore_index=True) if parts else output[tax_sheet]
+        output[tax_sheet] = tax_df.reindex(columns=columns)
+    elif not new_tax_df.empty:
+        output[NEW_TAX_SHEET] = new_tax_df
+    return output
+
+
+def roll_forward(ledger, coa, periods=1):
+    """
+    periods 기간만큼 차례로 이월한 템플릿 목록 [{시트 이름: DataFrame}, ...]을 반환합니다.
+    (k번째 결과 = k기간 뒤의 전기누적 조정명세, Info의 세율은 모든 기간에 그대로 사용)
+    """
+    templates = []
+    for _ in range(periods):
+        template = carry_forward(ledger, coa)
+        templates.append(template)
+        ledger = AdjustmentLedger(template)
+    return templates
@@ -0,0 +1,132 @@
+"""
+CE(자본변동표) 시트 양식 파서.
+
+모회사/자회사 재무제표 파일의 CE 시트(header=None)는 같은 템플릿이면 행/열 배치가 같으므로
+양식(조정코드/계정코드 행, 데이터 블록 범위)은 템플릿 버전별로 한 번만 찾아 두고,
+회사마다 배열 슬라이싱으로 숫자 블록(CEBlock)만 잘라냅니다.
+자본변동표(SCE)와 자본변동에 따른 NCI 안분이 같은 블록을 사용합니다.
+
+양식 (기본 템플릿 기준)
+- 열 0~2: 회사명 / 구분 / 계정코드, 열 3~: 자본 계정 (마지막 열은 비지배지분)
+- 열 2가 '조정코드'인 행: 자본 계정별 조정코드 (NCI 안분 계정)
+- 열 2가 '계정코드'인 행: 자본 계정코드 (SCE 열), 다음 행부터 데이터
+- 데이터 중 구분에 '기초'/'Beginning'이 있으면 기초 행, '기말'/'Ending'이 있는 첫 행이 기말 행
+템플릿 버전 = 시트 크기 + 열 1~2의 문자열 값 (회사별 금액/지분율 같은 숫자 칸과 무관)
+양식은 세션 간에 공유하므로 _layouts는 잠금 안에서만 읽고 씁니다.
+"""
+import threading
+
+import numpy as np
+import pandas as pd
+
+DESC_COLUMNS = 3
+CODE_LABEL = "계정코드"
+ADJUST_CODE_LABEL = "조정코드"
+BEGINNING_PATTERN = "기초|Beginning"
+ENDING_PATTERN = "기말|Ending"
+_MAX_LAYOUTS = 32
+_layouts = {}
+_layouts_lock = threading.Lock()
+
+
+class CELayout:
+    """
+    템플릿 버전 하나의 CE 시트 양식 (행 번호는 시트의 0부터 시작하는 위치)
+    - code_row: '계정코드' 행, adjust_row: '조정코드' 행 (없으면 None)
+    - data_start: 데이터 첫 행 (code_row + 1)
+    - ending: 데이터 블록 안에서 첫 기말 행의 위치 (없으면 블록 끝)
+    - beginning: 데이터 블록 안의 기초 행 bool 배열
+    """
+
+    def __init__(self, code_row, adjust_row, n_rows, beginning, ending):
+        self.code_row = code_row
+        self.adjust_row = adjust_row
+        self.data_start = code_row + 1
+        data_ending = np.flatnonzero(ending[self.data_start:])
+        self.ending = int(data_ending[0]) if len(data_ending) else n_rows - self.data_start
+        self.beginning = beginning[self.data_start:]
+
+
+def _first_row(labels, value):
+    rows = np.flatnonzero(labels == value)
+    return int(rows[0]) if len(rows) else None
+
+
+def _layout_key(df):
+    """템플릿 버전 키: 시트 크기 + 구분/계정코드 열의 문자열 값 (숫자인 칸은 회사별 값이므로 제외)"""
+    labels = df.iloc[:, 1:3].to_numpy(dtype=object)
+    return df.shape, tuple(value if isinstance(value, str) else None for value in labels.ravel())
+
+
+def detect_layout(df):
+    """CE 시트의 양식 (같은 템플릿 버전이면 처음 찾은 양식을 재사용, '계정코드' 행이 없으면 IndexError)"""
+    key = _layout_key(df)
+    with _layouts_lock:
+        layout = _layouts.get(key)
+    if layout is not None:
+        return layout
+
+    code_labels = df.iloc[:, 2].to_numpy(dtype=object)
+    code_row = _first_row(code_labels, CODE_LABEL)
+    if code_row is None:
+        raise IndexError(f"CE 시트에서 '{CODE_LABEL}' 행을 찾을 수 없습니다.")
+    row_labels = df.iloc[:, 1].astype(str)
+    layout = CELayout(
+        code_row,
+        _first_row(code_labels, ADJUST_CODE_LABEL),
+        len(df),
+        row_labels.str.contains(BEGINNING_PATTERN).to_numpy(),
+        row_labels.str.contains(ENDING_PATTERN).to_numpy(),
+    )
+    with _layouts_lock:
+        if len(_layouts) >= _MAX_LAYOUTS:
+            _layouts.clear()
+        _layouts[key] = layout
+    return layout
+
+
+class CEBlock:
+    """
+    회사 하나의 CE 데이터 블록 ('계정코드' 행 다음 행부터 시트 끝까지)
+    - layout: CELayout, shape: 원본 시트 크기
+    - codes: '계정코드' 행의 자본 계정코드 (문자열, 앞뒤 공백 제거)
+    - adjust_codes: '조정코드' 행의 값 (문자열, '조정코드' 행이 없으면 None)
+    - labels / row_codes: 데이터 행의 구분 / 계정코드 (시트 값 그대로)
+    - values: 데이터 행 × 자본 계정 금액 (float, 숫자가 아니거나 빈 칸이면 0)
+    """
+
+    def __init__(self, df, layout):
+        self.layout = layout
+        self.shape = df.shape
+        raw = df.to_numpy(dtype=object)
+        self.codes = [str(code).strip() for code in raw[layout.code_row, DESC_COLUMNS:]]
+        self.adjust_codes = None
+        if layout.adjust_row is not None:
+            self.adjust_codes = [str(code) for code in raw[layout.adjust_row, DESC_COLUMNS:]]
+        block = raw[layout.data_start:]
+        self.labels = block[:, 1]
+        self.row_codes = block[:, 2]
+        self.values = (
+            pd.DataFrame(block[:, DESC_COLUMNS:])
+            .apply(pd.to_numeric, errors="coerce")
+            .fillna(0)
+            .to_numpy(dtype=float)
+        )
+
+    def frame(self):
+        """SCE용 DataFrame (열: 구분, 계정코드 + 자본 계정코드)"""
+        df = pd.DataFrame(self.values, columns=self.codes)
+        df.insert(0, "계정코드", self.row_codes)
+        df.insert(0, "구분", self.labels)
+        return df
+
+    def changes(self):
+        """기초/기말을 제외한 당기 변동 행: (구분, 계정코드, 금액 배열) (기말 행 이후는 제외)"""
+        end = self.layout.ending
+        keep = ~self.layout.beginning[:end]
+        return self.labels[:end][keep], self.row_codes[:end][keep], self.values[:end][keep]
+
+
+def parse_ce_sheet(df):
+    """CE 시트(header=None)를 CEBlock으로 파싱합니다. ('계정코드' 행이 없으면 IndexError)"""
+    return CEBlock(df, detect_layout(df))
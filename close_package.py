@@ -0,0 +1,204 @@
+"""
+월말 마감 패키지 내보내기.
+
+연결재무제표, 취합 주석, CAJE, 외화환산 결과, 조정명세(검토용/차기이월) 등
+준비된 결과 워크북을 한 번에 만들어 zip 파일(또는 폴더) 하나와 manifest.json으로 저장합니다.
+
+엑셀 직렬화(openpyxl)는 순수 파이썬이라 스레드로는 병렬화되지 않으므로,
+워크북마다 프로세스 풀(workbook_io.get_process_pool)에서 동시에 만듭니다.
+(전체 소요 시간 ≈ 가장 큰 워크북 하나를 만드는 시간)
+"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+import zipfile
+from concurrent.futures import as_completed
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+
+from excel_export import export_excel_file
+from workbook_io import discard_process_pool, get_process_pool
+
+MANIFEST_NAME = "manifest.json"
+
+
+class PackageItem:
+    """
+    패키지에 넣을 파일 하나.
+    payload는 다음 중 하나입니다.
+    - {시트: DataFrame}: 엑셀 워크북으로 새로 만듦
+    - bytes: 이미 만든 엑셀 파일 내용
+    - str: 이미 저장해 둔 같은 버전의 파일 경로 (그대로 복사)
+    sheets: manifest에 기록할 {시트: DataFrame} (생략하면 payload가 dict일 때 payload)
+    """
+
+    def __init__(self, result, filename, payload, sheets=None):
+        self.result = result
+        self.filename = filename
+        self.payload = payload
+        self.sheets = sheets if sheets is not None else payload
+
+    @property
+    def rows(self):
+        if not isinstance(self.payload, dict):
+            return 0
+        return sum(len(df) for df in self.payload.values() if df is not None)
+
+
+def _build_workbook(df_dict, path, sheet_cache=None):
+    """[프로세스 풀 작업 함수] 워크북 하나를 path에 쓰고 걸린 시간(초)을 반환합니다."""
+    start = time.perf_counter()
+    export_excel_file(df_dict, path, sheet_cache=sheet_cache)
+    return time.perf_counter() - start
+
+
+def _sheet_summary(sheets):
+    if not isinstance(sheets, dict):
+        return None
+    return [
+        {"name": name, "rows": len(df), "columns": len(df.columns)}
+        for name, df in sheets.items()
+        if df is not None
+    ]
+
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def build_package_files(items, directory, max_workers=1, progress=None, sheet_cache=None):
+    """
+    items의 파일을 directory에 만들고 manifest 항목 목록을 반환합니다.
+    워크북 생성은 max_workers개 프로세스에서 동시에 실행합니다. (큰 워크북부터 제출)
+    progress: 파일이 하나 끝날 때마다 진행률(0~1)을 받을 함수 (선택)
+    sheet_cache: 시트 XML 캐시 (선택, 디스크 캐시라 작업 프로세스끼리 공유)
+    """
+    entries = {}
+    done = [0]
+
+    def finish(item, source, seconds):
+        path = os.path.join(directory, item.filename)
+        entries[item.filename] = {
+            "file": item.filename,
+            "result": item.result,
+            "source": source,
+            "sheets": _sheet_summary(item.sheets),
+            "bytes": os.path.getsize(path),
+            "sha256": _sha256(path),
+            "build_seconds": round(seconds, 3),
+        }
+        done[0] += 1
+        if progress is not None:
+            progress(done[0] / len(items))
+
+    to_build = []
+    for item in items:
+        path = os.path.join(directory, item.filename)
+        if isinstance(item.payload, dict):
+            to_build.append(item)
+        elif isinstance(item.payload, bytes):
+            with open(path, "wb") as f:
+                f.write(item.payload)
+            finish(item, "bytes", 0.0)
+        else:
+            shutil.copyfile(item.payload, path)
+            finish(item, "reused", 0.0)
+
+    to_build.sort(key=lambda item: item.rows, reverse=True)
+    if max_workers > 1 and len(to_build) > 1:
+        pool = get_process_pool(max_workers)
+        try:
+            futures = {
+                pool.submit(
+                    _build_workbook,
+                    item.payload,
+                    os.path.join(directory, item.filename),
+                    sheet_cache,
+                ): item
+                for item in to_build
+            }
+            for future in as_completed(futures):
+                finish(futures[future], "built", future.result())
+        except BrokenProcessPool:
+            # 작업 프로세스가 비정상 종료되면 풀을 버리고 남은 워크북은 순차로 만듦
+            discard_process_pool(pool)
+        to_build = [item for item in to_build if item.filename not in entries]
+    for item in to_build:
+        seconds = _build_workbook(
+            item.payload, os.path.join(directory, item.filename), sheet_cache
+        )
+        finish(item, "built", seconds)
+
+    # manifest는 요청한 순서대로
+    return [entries[item.filename] for item in items]
+
+
+def write_close_package(
+    items, target, max_workers=1, metadata=None, progress=None, sheet_cache=None
+):
+    """
+    마감 패키지를 저장합니다.
+    - target이 .zip으로 끝나면 zip 파일 하나로 (같은 폴더의 임시 파일에 쓴 뒤 교체)
+    - 그 외에는 target 폴더에 파일들과 manifest.json을 씀
+    metadata: manifest에 함께 기록할 정보 (앱 버전 등)
+    sheet_cache: 시트 XML 캐시 (선택)
+    반환: manifest (dict)
+    """
+    if not items:
+        raise ValueError("패키지에 넣을 결과가 없습니다.")
+    filenames = [item.filename for item in items]
+    if len(set(filenames)) != len(filenames):
+        raise ValueError("패키지 파일 이름이 중복되었습니다.")
+
+    as_zip = target.lower().endswith(".zip")
+    parent = os.path.dirname(os.path.abspath(target))
+    os.makedirs(parent, exist_ok=True)
+
+    def file_progress(value):
+        # zip 압축 단계를 위해 남겨 둠
+        progress(0.95 * value if as_zip else value)
+
+    start = time.perf_counter()
+    with tempfile.TemporaryDirectory(prefix=".consollab_package_", dir=parent) as staging:
+        entries = build_package_files(
+            items,
+            staging,
+            max_workers,
+            file_progress if progress is not None else None,
+            sheet_cache,
+        )
+        manifest = dict(metadata or {})
+        manifest.update(
+            {
+                "created_at": datetime.now().isoformat(timespec="seconds"),
+                "build_seconds": round(time.perf_counter() - start, 3),
+                "files": entries,
+            }
+        )
+        manifest_text = json.dumps(manifest, ensure_ascii=False, indent=2)
+
+        if as_zip:
+            tmp_path = os.path.join(staging, "package.zip")
+            # xlsx는 이미 압축된 파일이므로 다시 압축하지 않음
+            with zipfile.ZipFile(tmp_path, "w", zipfile.ZIP_STORED) as zf:
+                for name in filenames:
+                    zf.write(os.path.join(staging, name), name)
+                zf.writestr(MANIFEST_NAME, manifest_text, zipfile.ZIP_DEFLATED)
+            os.replace(tmp_path, target)
+        else:
+            os.makedirs(target, exist_ok=True)
+            for name in filenames:
+                os.replace(os.path.join(staging, name), os.path.join(target, name))
+            with open(os.path.join(target, MANIFEST_NAME), "w", encoding="utf-8") as f:
+                f.write(manifest_text)
+
+    if progress is not None:
+        progress(1.0)
+    return manifest
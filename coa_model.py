@@ -0,0 +1,139 @@
+"""
+CoA(계정체계) 모델.
+
+CoA 업로드 하나당 한 번 만들어 두고 모든 단계(연결 재무제표, 자본변동표,
+법인세/NCI 자동계산, 연결조정분개 생성, 차기 이월)에서 함께 사용합니다.
+"""
+import numpy as np
+import pandas as pd
+
+from consolidation import AccountIndex, LevelTree
+
+BS_ELEMENTS = ["A", "L", "E", "CA", "CE"]
+PL_ELEMENTS = ["R", "X", "CR"]
+
+# 재무제표 표시 부호 (BS: 자산 -1, PL: 비용 -1)
+BS_SIGNS = {"A": -1, "CA": -1, "L": 1, "E": 1, "CE": 1}
+PL_SIGNS = {"R": 1, "X": -1, "CR": 1}
+
+# 연결조정분개 금액의 부호를 뒤집는 FS_Element (대변 잔액 계정)
+CREDIT_ELEMENTS = ["L", "E", "R", "CE", "CR"]
+
+
+def _level_cols(df):
+    """(L*_code 컬럼 목록, L*_name 컬럼 목록)"""
+    code_cols = [c for c in df.columns if c.startswith("L") and c.endswith("code")]
+    name_cols = [c for c in df.columns if c.startswith("L") and not c.endswith("code")]
+    return code_cols, name_cols
+
+
+def _level_name_code_map(df, code_cols, name_cols):
+    """레벨 이름 -> 레벨 코드 (같은 이름이면 하위 레벨, 아래쪽 행이 우선)"""
+    name_code_map = {}
+    for code, name in zip(code_cols, name_cols):
+        rows = df[df[name].notna()]
+        name_code_map.update(zip(rows[name], rows[code]))
+    return name_code_map
+
+
+def _first_account(df, fs_element):
+    """FS_Element가 일치하는 첫 계정의 (계정코드, 계정명). 없으면 None"""
+    if df.empty or "FS_Element" not in df.columns:
+        return None
+    rows = df[df["FS_Element"] == fs_element]
+    if rows.empty:
+        return None
+    return rows.iloc[0]["계정코드"], rows.iloc[0]["계정명"]
+
+
+class CoAModel:
+    """
+    CoA에서 미리 계산한 정보 모음.
+    - coa_df / cf_coa_df / aje_code: 적재 스키마가 적용된 원본 시트
+    - account_index, level_tree, name_code_map: BS/PL 집계 및 소계용
+    - cf_index(CF_code), cf_account_index(계정코드), cf_level_tree, cf_name_code_map: CF용
+    - fs_map / name_map / l3_map: 계정코드 -> FS_Element / 계정명 / L3_code
+    - bs_mask / pl_mask / statement_sign / adjustment_sign / cf_sign: CoA 행 순서 배열
+    - nci_pl / nci_equity / ni_code, aje_account(): 특수 계정
+    """
+
+    def __init__(self, coa_df, cf_coa_df=None, aje_code=None):
+        self.coa_df = coa_df.reset_index(drop=True)
+        self.cf_coa_df = (
+            pd.DataFrame() if cf_coa_df is None else cf_coa_df.reset_index(drop=True)
+        )
+        self.aje_code = pd.DataFrame() if aje_code is None else aje_code
+
+        # --- BS/PL ---
+        coa_df = self.coa_df
+        self.level_code_cols, self.level_name_cols = _level_cols(coa_df)
+        self.level_tree = LevelTree(coa_df[self.level_name_cols])
+        self.name_code_map = _level_name_code_map(
+            coa_df, self.level_code_cols, self.level_name_cols
+        )
+        self.account_index = AccountIndex(coa_df["계정코드"])
+        self.fs_map = dict(zip(coa_df["계정코드"], coa_df["FS_Element"]))
+        self.name_map = dict(zip(coa_df["계정코드"], coa_df["계정명"]))
+        self.l3_map = (
+            dict(zip(coa_df["계정코드"], coa_df["L3_code"]))
+            if "L3_code" in coa_df.columns
+            else {}
+        )
+
+        fs_elements = coa_df["FS_Element"]
+        self.bs_mask = fs_elements.isin(BS_ELEMENTS).to_numpy()
+        self.pl_mask = fs_elements.isin(PL_ELEMENTS).to_numpy()
+        self.statement_sign = np.where(
+            self.bs_mask,
+            fs_elements.map(BS_SIGNS).fillna(1),
+            fs_elements.map(PL_SIGNS).fillna(1),
+        )
+        self.adjustment_sign = np.where(fs_elements.isin(CREDIT_ELEMENTS), -1, 1)
+
+        # --- CF ---
+        cf_coa_df = self.cf_coa_df
+        self.has_cf = not cf_coa_df.empty and "CF_code" in cf_coa_df.columns
+        self.cf_level_code_cols, self.cf_level_name_cols = _level_cols(cf_coa_df)
+        self.cf_level_tree = LevelTree(cf_coa_df[self.cf_level_name_cols])
+        self.cf_name_code_map = _level_name_code_map(
+            cf_coa_df, self.cf_level_code_cols, self.cf_level_name_cols
+        )
+        if self.has_cf:
+            self.cf_index = AccountIndex(cf_coa_df["CF_code"])
+            self.cf_account_index = AccountIndex(cf_coa_df["계정코드"])
+            # CF의 FS_Element는 부호(1/-1)로 사용
+            self.cf_sign = np.ones(len(cf_coa_df))
+            if "FS_Element" in cf_coa_df.columns:
+                self.cf_sign = (
+                    pd.to_numeric(cf_coa_df["FS_Element"], errors="coerce")
+                    .fillna(1)
+                    .to_numpy()
+                )
+
+        # --- 특수 계정 ---
+        self.nci_pl = _first_account(coa_df, "CR")  # 비지배지분순손익
+        self.nci_equity = _first_account(coa_df, "CE")  # 비지배지분
+        r_rows = coa_df[fs_elements == "R"]
+        self.ni_code = (
+            r_rows.iloc[0].get("L1_code") if not r_rows.empty else None
+        )  # 당기순이익 (CF 조정용)
+
+    def with_account_info(self, df):
+        """df에 계정코드 기준 FS_Element / L3_code 열을 붙인 복사본 (CoA에 없는 코드는 NaN)"""
+        codes = df["계정코드"]
+        return df.assign(
+            FS_Element=codes.map(self.fs_map),
+            L3_code=codes.map(self.l3_map).astype(object),
+        )
+
+    def aje_account(self, fs_element):
+        """
+        AJE 시트의 자동분개 계정 (계정코드, 계정명).
+        E: 이익잉여금, L: 이연법인세부채(자산), X: 법인세비용
+        """
+        account = _first_account(self.aje_code, fs_element)
+        if account is None:
+            raise ValueError(
+                f"CoA 파일의 AJE 시트에서 FS_Element가 '{fs_element}'인 계정을 찾을 수 없습니다."
+            )
+        return account
@@ -0,0 +1,106 @@
+"""
+결과 데이터의 컬럼형 파일 내보내기 (Parquet / Arrow IPC / CSV).
+
+BI·웨어하우스 적재용으로 서식 없이 시트(DataFrame)마다 파일 하나를 씁니다.
+열 이름은 문자열로 고정하고, 열 타입은 pandas dtype에서 명시적으로 정합니다.
+- 불리언 → bool, 정수 → int64, 실수 → float64, 날짜 → timestamp[ns]
+- 그 외(문자/혼합) → string (빈 칸은 null)
+"""
+import os
+import re
+import uuid
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+
+# 형식 -> 확장자
+COLUMNAR_FORMATS = {"parquet": ".parquet", "arrow": ".arrow", "csv": ".csv"}
+
+
+def column_names(columns):
+    """열 이름을 문자열로 바꾸고, 중복되면 '_2', '_3'... 을 붙여 고유하게 만듭니다."""
+    names, seen = [], {}
+    for column in columns:
+        name = str(column).strip()
+        if name in seen:
+            # 붙인 이름이 원래 있던 열 이름(예: 'a_2')과 겹치지 않을 때까지 번호를 올림
+            base = name
+            while name in seen:
+                seen[base] += 1
+                name = f"{base}_{seen[base]}"
+        seen[name] = 1
+        names.append(name)
+    return names
+
+
+def arrow_type(values):
+    """pandas 열의 Arrow 타입"""
+    if pd.api.types.is_bool_dtype(values):
+        return pa.bool_()
+    if pd.api.types.is_integer_dtype(values):
+        return pa.int64()
+    if pd.api.types.is_float_dtype(values):
+        return pa.float64()
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return pa.timestamp("ns")
+    return pa.string()
+
+
+def result_table(df):
+    """DataFrame을 명시적 스키마의 Arrow 테이블로 변환합니다. (인덱스는 제외)"""
+    arrays, fields = [], []
+    for name, (_, values) in zip(column_names(df.columns), df.items()):
+        values = values.reset_index(drop=True)
+        dtype = arrow_type(values)
+        if dtype == pa.string():
+            values = values.where(values.isna(), values.astype(str))
+        arrays.append(pa.array(values, type=dtype, from_pandas=True))
+        fields.append(pa.field(name, dtype))
+    return pa.Table.from_arrays(arrays, schema=pa.schema(fields))
+
+
+def file_stem(sheet_name):
+    """시트 이름에서 파일 이름으로 쓸 수 없는 문자를 '_'로 바꿉니다."""
+    return re.sub(r'[\\/:*?"<>|\s]+', "_", str(sheet_name)).strip("_") or "sheet"
+
+
+def write_table(table, path, fmt):
+    if fmt == "parquet":
+        pq.write_table(table, path)
+    elif fmt == "arrow":
+        with pa.OSFile(path, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    elif fmt == "csv":
+        pa_csv.write_csv(table, path)
+    else:
+        raise ValueError(f"지원하지 않는 형식입니다: {fmt}")
+
+
+def write_columnar(df_dict, directory, fmt="parquet", progress=None):
+    """
+    {시트: DataFrame}을 directory 아래 시트별 파일(<시트>.<확장자>)로 저장합니다.
+    None인 시트는 건너뜁니다. 각 파일은 임시 파일에 쓴 뒤 교체합니다.
+    progress: 시트를 하나 쓸 때마다 진행률(0~1)을 받을 함수 (선택)
+    반환: 저장한 파일 경로 목록
+    """
+    if fmt not in COLUMNAR_FORMATS:
+        raise ValueError(f"지원하지 않는 형식입니다: {fmt}")
+    os.makedirs(directory, exist_ok=True)
+    sheets = [(name, df) for name, df in df_dict.items() if df is not None]
+    paths = []
+    for sheet_name, df in sheets:
+        path = os.path.join(directory, file_stem(sheet_name) + COLUMNAR_FORMATS[fmt])
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        try:
+            write_table(result_table(df), tmp_path, fmt)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        paths.append(path)
+        if progress is not None:
+            progress(len(paths) / len(sheets))
+    return paths
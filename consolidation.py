@@ -0,0 +1,208 @@
+"""
+연결 재무제표 집계 엔진.
+
+CoA의 계정코드를 정수 위치로 바꿔 두고, 회사별 재무제표와 연결조정분개를
+문자열 merge 대신 위치 배열 + np.bincount로 집계합니다.
+"""
+import numpy as np
+import pandas as pd
+
+
+class AccountIndex:
+    """
+    CoA 계정코드(또는 CF_code) → 정수 위치(int32) 매핑.
+    - codes: 고유 계정코드 (CoA 등장 순서)
+    - row_positions: CoA 각 행이 가리키는 고유 코드 위치 (코드가 빈 행은 -1)
+    CoA에 같은 코드가 여러 행 있으면 집계 값이 각 행에 똑같이 들어갑니다. (left merge와 동일)
+    """
+
+    def __init__(self, coa_codes):
+        coa_codes = pd.Series(coa_codes)
+        self.codes = pd.Index(coa_codes.dropna().unique())
+        self.row_positions = self.codes.get_indexer(coa_codes).astype(np.int32)
+
+    def __len__(self):
+        return len(self.codes)
+
+    def positions(self, codes):
+        """계정코드 배열을 위치 배열로 변환합니다. CoA에 없거나 빈 코드는 -1."""
+        return self.codes.get_indexer(pd.Series(codes)).astype(np.int32)
+
+    def aggregate(self, codes, amounts):
+        """
+        계정코드별 금액 합계를 고유 코드 순서의 배열로 반환합니다.
+        반환: (합계 배열[float64], CoA에 없는 계정코드 목록)
+        """
+        codes = pd.Series(codes).reset_index(drop=True)
+        positions = self.positions(codes)
+        known = positions >= 0
+        amounts = np.asarray(amounts, dtype=np.float64)
+        sums = np.bincount(
+            positions[known], weights=amounts[known], minlength=len(self.codes)
+        )
+        unknown = sorted(codes[~known].dropna().unique())
+        return sums, unknown
+
+    def to_rows(self, values):
+        """
+        고유 코드 순서의 값(1차원 배열 또는 계정 × 회사 행렬)을 CoA 행 순서로 펼칩니다.
+        코드가 빈 행은 0.
+        """
+        values = np.asarray(values, dtype=np.float64)
+        if not len(values):
+            return np.zeros((len(self.row_positions),) + values.shape[1:])
+        known = (self.row_positions >= 0).reshape((-1,) + (1,) * (values.ndim - 1))
+        return np.where(known, values[self.row_positions], 0.0)
+
+
+def entity_matrix(index, statements):
+    """
+    회사별 재무제표를 하나의 계정 × 회사 행렬(float64)로 집계합니다.
+    statements: 회사 순서대로 (계정코드, 금액) 또는 None(데이터 없음)
+    반환: (행렬[len(index) × 회사 수], 회사별 CoA에 없는 계정코드 목록)
+    """
+    matrix = np.zeros((len(index), len(statements)))
+    missing = []
+    for j, statement in enumerate(statements):
+        if statement is None:
+            missing.append([])
+            continue
+        matrix[:, j], unknown = index.aggregate(*statement)
+        missing.append(unknown)
+    return matrix, missing
+
+
+def consolidation_frame(coa_df, index, entity_names, matrix, adjustments=None):
+    """
+    CoA 행 순서의 연결 정산표를 만듭니다.
+    컬럼: CoA 컬럼 + 회사별 금액 + 단순합계 + 연결조정 + 연결금액
+    adjustments: CoA 행 순서의 연결조정 금액 배열 (None이면 0)
+    """
+    rows = index.to_rows(matrix)
+    simple_sum = rows.sum(axis=1)
+    if adjustments is None:
+        adjustments = np.zeros(len(rows))
+    amounts = pd.DataFrame(
+        np.column_stack([rows, simple_sum, adjustments, simple_sum + adjustments]),
+        columns=list(entity_names) + ["단순합계", "연결조정", "연결금액"],
+    )
+    return pd.concat([coa_df.reset_index(drop=True), amounts], axis=1)
+
+
+def balance_differences(fs_elements, values):
+    """
+    재무상태표 차대 차이(자산 - (부채 + 자본))를 열별로 계산합니다.
+    fs_elements: 행별 FS_Element, values: 행 × 열 금액 배열
+    """
+    fs_elements = pd.Series(fs_elements)
+    values = np.asarray(values, dtype=np.float64)
+    assets = values[fs_elements.isin(["A", "CA"]).to_numpy()].sum(axis=0)
+    liabilities = values[(fs_elements == "L").to_numpy()].sum(axis=0)
+    equity = values[fs_elements.isin(["E", "CE"]).to_numpy()].sum(axis=0)
+    return assets - (liabilities + equity)
+
+
+class LevelTree:
+    """
+    CoA 레벨(L1_name..L5_name) 트리.
+    각 CoA 행이 속한 레벨별 그룹 번호((상위 그룹, 레벨 값) 조합)를 한 번에 계산해 둡니다.
+    레벨 값이 빈 행은 상위 그룹별로 별도 그룹이 되며 소계를 만들지 않습니다.
+    """
+
+    def __init__(self, level_df):
+        self.level_cols = list(level_df.columns)
+        parent = np.zeros(len(level_df), dtype=np.int64)
+        self.group_ids, self.has_level = [], []
+        for col in self.level_cols:
+            values = level_df[col].reset_index(drop=True)
+            has_level = values.notna().to_numpy()
+            # (상위 그룹, 레벨 값) 조합을 등장 순서대로 번호 매김
+            group_ids, _ = pd.MultiIndex.from_arrays(
+                [parent, values.where(has_level, None).fillna("\0")]
+            ).factorize()
+            self.group_ids.append(group_ids.astype(np.int64))
+            self.has_level.append(has_level)
+            parent = group_ids
+
+
+def subtotal_statement(
+    df, tree, amount_cols, name_code_map, desc_col="계정명", code_col="계정코드"
+):
+    """
+    레벨 트리 기준으로 소계 행을 붙인 재무제표를 만듭니다.
+    df: CoA 기반 정산표 (인덱스 = tree를 만든 CoA의 행 위치, 일부 행만 있어도 됨)
+    - 금액은 sign 컬럼(있으면)을 곱해 합산하고, 각 행의 sign으로 다시 나눕니다.
+      (소계 행의 sign은 그룹 첫 행의 sign)
+    - 소계 행의 나머지 컬럼은 빈 문자열, FS_Element/sign은 그룹 첫 행 값을 사용합니다.
+    - is_subtotal 컬럼으로 소계 행을 구조적으로 표시합니다.
+    """
+    if df.empty or not tree.level_cols:
+        return df.reset_index(drop=True).assign(is_subtotal=False)
+
+    positions = df.index.to_numpy()
+    df = df.reset_index(drop=True)
+    amount_cols = [c for c in amount_cols if c in df.columns]
+    signed = df[amount_cols].to_numpy(dtype=np.float64)
+    apply_sign_logic = "sign" in df.columns
+    if apply_sign_logic:
+        sign = pd.to_numeric(df["sign"], errors="coerce").fillna(1).to_numpy()
+        signed = signed * sign[:, None]
+        # Sign 원복용 (0은 1로 처리)
+        restore_sign = np.where(sign == 0, 1, sign)
+        df["sign"] = restore_sign
+        df[amount_cols] = signed / restore_sign[:, None]
+
+    n = len(df)
+    depth = len(tree.level_cols)
+    row_numbers = np.arange(n)
+    # 레벨별 정렬 키: 같은 상위 그룹 안에서는 처음 등장한 순서, 레벨 값이 빈 행(n)은 그 뒤
+    order_keys = []
+    for level in range(depth):
+        group_ids = tree.group_ids[level][positions]
+        first_seen = np.full(group_ids.max() + 1, n, dtype=np.int64)
+        np.minimum.at(first_seen, group_ids, row_numbers)
+        order_keys.append(
+            np.where(tree.has_level[level][positions], first_seen[group_ids], n)
+        )
+    # 일반 행 정렬 키: (레벨별 순서..., 행 순서)
+    leaf_keys = np.column_stack(order_keys + [row_numbers])
+    after_children = n + 1
+
+    subtotal_frames, subtotal_keys = [], []
+    for level, col in enumerate(tree.level_cols):
+        has_level = tree.has_level[level][positions]
+        if not has_level.any():
+            continue
+        member_groups = tree.group_ids[level][positions][has_level]
+        groups, first = np.unique(member_groups, return_index=True)
+        first_rows = row_numbers[has_level][first]
+
+        sums = np.zeros((len(groups), len(amount_cols)))
+        np.add.at(sums, np.searchsorted(groups, member_groups), signed[has_level])
+
+        keys = df[col].to_numpy()[first_rows]
+        frame = pd.DataFrame("", index=range(len(groups)), columns=df.columns)
+        for meta_col in ["FS_Element", "sign"]:
+            if meta_col in df.columns:
+                frame[meta_col] = df[meta_col].to_numpy()[first_rows]
+        if apply_sign_logic:
+            sums = sums / df["sign"].to_numpy()[first_rows][:, None]
+        frame[amount_cols] = sums
+        frame[desc_col] = keys
+        frame[code_col] = [name_code_map.get(key, "") for key in keys]
+        subtotal_frames.append(frame)
+
+        # 소계 행 정렬 키: 자기 레벨까지는 그룹 첫 행과 같고, 이후는 모든 하위 행 뒤
+        key = np.full((len(groups), depth + 1), after_children, dtype=np.int64)
+        for k in range(level + 1):
+            key[:, k] = order_keys[k][first_rows]
+        subtotal_keys.append(key)
+
+    result = pd.concat(
+        [df.assign(is_subtotal=False)]
+        + [frame.assign(is_subtotal=True) for frame in subtotal_frames],
+        ignore_index=True,
+    )
+    all_keys = np.vstack([leaf_keys] + subtotal_keys)
+    order = np.lexsort(all_keys.T[::-1])
+    return result.iloc[order].reset_index(drop=True)
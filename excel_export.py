@@ -0,0 +1,295 @@
+"""
+결과 엑셀 내보내기 엔진.
+
+openpyxl로 워크북을 직접 만들고, 서식은 워크북당 한 번 등록한 이름 있는 스타일
+(NamedStyle)을 열/행 단위로 한꺼번에 지정합니다.
+(셀마다 Font/Alignment 객체를 새로 만들던 pandas to_excel + 셀 순회 방식 대체)
+
+시트는 write-only(스트리밍) 모드로 CHUNK_ROWS행씩 변환하면서 바로 기록하므로,
+export_excel_file로 디스크에 쓰면 행 수와 관계없이 메모리 사용량이 일정합니다.
+
+sheet_cache(sheet_cache.SheetXMLCache)를 넘기면 내용이 같은 시트는 이전에 만든
+시트 XML을 그대로 넣고, 바뀐 시트만 새로 만듭니다.
+"""
+import datetime
+import io
+import os
+import tempfile
+from types import SimpleNamespace
+from zipfile import ZIP_DEFLATED, ZipFile
+
+import numpy as np
+import pandas as pd
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment, Border, Font, NamedStyle, PatternFill, Side
+from openpyxl.styles.fonts import DEFAULT_FONT
+from openpyxl.utils import get_column_letter
+from openpyxl.worksheet.datavalidation import DataValidation
+from openpyxl.writer.excel import ExcelWriter
+
+COLUMN_WIDTH = 17
+CHUNK_ROWS = 5000
+
+# 스타일 이름
+HEADER = "consollab_header"
+BOLD = "consollab_bold"
+NUMBER = "consollab_number"
+NUMBER_BOLD = "consollab_number_bold"
+RATE = "consollab_rate"
+RATE_BOLD = "consollab_rate_bold"
+CELL_STYLES = (BOLD, NUMBER, NUMBER_BOLD, RATE, RATE_BOLD)
+
+
+def _named_styles():
+    """워크북에 등록할 스타일 목록 (NamedStyle은 워크북마다 새로 만들어야 함)"""
+    thin = Side(style="thin")
+    number_alignment = Alignment(horizontal="right", vertical="center")
+    styles = [
+        NamedStyle(
+            name=HEADER,
+            font=Font(bold=True, color="FFFFFF"),
+            fill=PatternFill(start_color="4F81BD", end_color="4F81BD", fill_type="solid"),
+            alignment=Alignment(horizontal="center", vertical="center", wrap_text=True),
+            border=Border(left=thin, right=thin, top=thin, bottom=thin),
+        ),
+        NamedStyle(name=BOLD, font=Font(bold=True)),
+    ]
+    for name, number_format in [(NUMBER, "#,##0"), (RATE, "0.000")]:
+        styles.append(
+            NamedStyle(
+                name=name,
+                font=DEFAULT_FONT,
+                number_format=number_format,
+                alignment=number_alignment,
+            )
+        )
+        styles.append(
+            NamedStyle(
+                name=f"{name}_bold",
+                font=Font(bold=True),
+                number_format=number_format,
+                alignment=number_alignment,
+            )
+        )
+    return styles
+
+
+def new_workbook():
+    """스타일이 등록된 빈 write-only 워크북을 만듭니다."""
+    wb = Workbook(write_only=True)
+    for style in _named_styles():
+        wb.add_named_style(style)
+    # 셀 스타일 번호(s 속성)를 사용 순서와 무관하게 고정 (시트 XML 캐시를 다른 워크북에 재사용하기 위함)
+    anchor = SimpleNamespace(parent=wb)
+    for name in (HEADER,) + CELL_STYLES:
+        cell = WriteOnlyCell(anchor)
+        cell.style = name
+        # 셀 스타일 목록에 등록해 번호를 정함 (openpyxl은 style_id를 처음 읽을 때 하는 일)
+        wb._cell_styles.add(cell._style)
+    return wb
+
+
+def sheet_values(df):
+    """엑셀에 쓸 행 값 목록 (빈 칸(NaN/NaT)은 None)"""
+    return df.astype(object).where(df.notna(), None).to_numpy().tolist()
+
+
+def column_styles(df, sheet_name, is_subtotal):
+    """
+    열별 스타일 이름 배열 목록을 계산합니다. (값이 없으면 None)
+    - 숫자 열의 값이 있는 셀: 숫자 서식 (Info 시트는 0.000, 그 외 #,##0) + 오른쪽 정렬
+    - 소계 행: 모든 셀 굵게
+    """
+    number, number_bold = (RATE, RATE_BOLD) if sheet_name == "Info" else (NUMBER, NUMBER_BOLD)
+    text_styles = np.where(is_subtotal, BOLD, None)
+    styles = []
+    for i in range(df.shape[1]):
+        values = df.iloc[:, i]
+        if pd.api.types.is_numeric_dtype(values):
+            number_styles = np.where(is_subtotal, number_bold, number)
+            styles.append(np.where(values.notna().to_numpy(), number_styles, text_styles))
+        else:
+            styles.append(text_styles)
+    return styles
+
+
+def split_subtotal(df):
+    """
+    (엑셀에 쓸 열 목록, 소계 행 여부 배열) — 'is_subtotal' 열은 엑셀에서 제외
+    (DataFrame 전체를 복사하지 않도록 열 목록만 반환)
+    """
+    if "is_subtotal" not in df.columns:
+        return list(df.columns), np.zeros(len(df), dtype=bool)
+    is_subtotal = df["is_subtotal"].fillna(False).astype(bool).to_numpy()
+    return [c for c in df.columns if c != "is_subtotal"], is_subtotal
+
+
+def company_validation(df_dict):
+    """CAJE 시트의 회사명 입력 목록 수식 (Info 시트의 회사 목록). 없으면 None"""
+    info_df = df_dict.get("Info")
+    if info_df is None or info_df.empty:
+        return None
+    return f"='Info'!$A$2:$A${len(info_df) + 1}"
+
+
+def add_company_validation(ws, columns, sheet_name, validation_formula):
+    """CAJE 시트의 회사명 열에 목록 데이터 유효성 검사를 추가합니다."""
+    if not (validation_formula and sheet_name.startswith("CAJE") and "회사명" in columns):
+        return
+    dv = DataValidation(type="list", formula1=validation_formula, allow_blank=True)
+    dv.error = "목록에 있는 값만 입력할 수 있습니다."
+    dv.errorTitle = "잘못된 입력"
+    dv.prompt = "목록에서 회사명을 선택하세요."
+    dv.promptTitle = "회사명 선택"
+
+    company_col_letter = get_column_letter(list(columns).index("회사명") + 1)
+    ws.data_validations.append(dv)
+    dv.add(f"{company_col_letter}2:{company_col_letter}10000")
+
+
+def styled_chunks(ws, df, sheet_name, columns, is_subtotal):
+    """
+    시트 행을 CHUNK_ROWS행씩 변환해 청크(행 목록) 단위로 순서대로 내보냅니다.
+    스타일이 필요한 셀만 스타일이 지정된 셀 객체로, 나머지는 값 그대로 둡니다.
+    (값/스타일 변환은 청크 단위로만 하므로 메모리 사용량이 행 수와 무관)
+    """
+    for start in range(0, len(df), CHUNK_ROWS):
+        stop = start + CHUNK_ROWS
+        chunk = df.iloc[start:stop][columns]
+        rows = sheet_values(chunk)
+        styles = column_styles(chunk, sheet_name, is_subtotal[start:stop])
+        # 같은 스타일을 쓰는 셀을 열 단위로 모아서 지정
+        for col_idx, col_styles in enumerate(styles):
+            for style in CELL_STYLES:
+                for row_idx in np.flatnonzero(col_styles == style):
+                    cell = WriteOnlyCell(ws, rows[row_idx][col_idx])
+                    cell.style = style
+                    rows[row_idx][col_idx] = cell
+        yield rows
+
+
+def write_sheet(wb, sheet_name, df, validation_formula=None, on_rows=None):
+    """
+    DataFrame 하나를 서식과 함께 시트로 씁니다.
+    on_rows: 청크를 쓸 때마다 쓴 행 수로 호출할 함수 (진행률 표시용)
+    """
+    columns, is_subtotal = split_subtotal(df)
+    ws = wb.create_sheet(sheet_name)
+
+    # 열 너비와 데이터 유효성 검사는 행을 쓰기 전에 지정해야 함 (write-only 모드)
+    for i in range(1, len(columns) + 1):
+        ws.column_dimensions[get_column_letter(i)].width = COLUMN_WIDTH
+    add_company_validation(ws, columns, sheet_name, validation_formula)
+
+    header = []
+    for column_name in columns:
+        cell = WriteOnlyCell(ws, column_name)
+        cell.style = HEADER
+        header.append(cell)
+    ws.append(header)
+    for rows in styled_chunks(ws, df, sheet_name, columns, is_subtotal):
+        for row in rows:
+            ws.append(row)
+        if on_rows is not None:
+            on_rows(len(rows))
+    return ws
+
+
+class _SheetCacheArchive(ZipFile):
+    """
+    워크북을 저장하면서 시트 XML을 캐시와 주고받는 zip 아카이브.
+    parts: {zip 안의 시트 경로: (캐시 키, 캐시된 XML 경로 또는 None)}
+    - 캐시된 시트: 빈 자리 시트 대신 캐시된 XML을 넣음
+    - 새로 만든 시트: 기록하면서 캐시에 저장
+    """
+
+    def __init__(self, target, parts, sheet_cache):
+        super().__init__(target, "w", ZIP_DEFLATED, allowZip64=True)
+        self.parts = parts
+        self.sheet_cache = sheet_cache
+
+    def write(self, filename, arcname=None, *args, **kwargs):
+        part = self.parts.get(arcname)
+        if part is not None:
+            key, cached_path = part
+            if cached_path is not None:
+                filename = cached_path
+            else:
+                self.sheet_cache.put(key, filename)
+        return super().write(filename, arcname, *args, **kwargs)
+
+
+def write_workbook(df_dict, target, progress=None, sheet_cache=None):
+    """
+    여러 DataFrame을 하나의 엑셀 파일로 씁니다.
+    df_dict: {'sheet_name': DataFrame} (None인 시트는 건너뜀, 빈 DataFrame은 빈 시트)
+    target: 파일 경로 또는 쓰기 가능한 파일 객체
+    progress: 진행률(0~1)을 받을 함수 (선택)
+    sheet_cache: 시트 XML 캐시 (선택). 내용이 같은 시트는 다시 만들지 않음
+    """
+    wb = new_workbook()
+    validation_formula = company_validation(df_dict)
+    total_rows = max(1, sum(len(df) for df in df_dict.values() if df is not None))
+    written = [0]
+
+    def on_rows(n):
+        written[0] += n
+        # 마지막 압축(save) 단계를 위해 남겨 둠
+        progress(0.95 * written[0] / total_rows)
+
+    parts = {}
+    for sheet_name, df in df_dict.items():
+        if df is None:
+            continue
+        key = sheet_cache.key(sheet_name, df, validation_formula) if sheet_cache else None
+        cached_path = sheet_cache.get(key) if key else None
+        if cached_path is not None:
+            # 빈 자리 시트만 만들고, 저장할 때 캐시된 XML로 교체
+            wb.create_sheet(sheet_name)
+            if progress is not None:
+                on_rows(len(df))
+        else:
+            write_sheet(
+                wb, sheet_name, df, validation_formula,
+                on_rows if progress is not None else None,
+            )
+        if key:
+            # openpyxl은 시트를 순서대로 sheet1.xml, sheet2.xml ... 로 저장
+            parts[f"xl/worksheets/sheet{len(wb.worksheets)}.xml"] = (key, cached_path)
+    if not wb.worksheets:
+        wb.create_sheet()
+    if parts:
+        wb.properties.modified = datetime.datetime.now(tz=datetime.timezone.utc).replace(tzinfo=None)
+        ExcelWriter(wb, _SheetCacheArchive(target, parts, sheet_cache)).save()
+    else:
+        wb.save(target)
+    if progress is not None:
+        progress(1.0)
+
+
+def export_excel(df_dict, sheet_cache=None):
+    """여러 DataFrame을 하나의 엑셀 파일(bytes)로 저장합니다."""
+    output = io.BytesIO()
+    write_workbook(df_dict, output, sheet_cache=sheet_cache)
+    return output.getvalue()
+
+
+def export_excel_file(df_dict, path, progress=None, sheet_cache=None):
+    """
+    대용량 결과용: 엑셀 파일을 메모리에 만들지 않고 path에 바로 씁니다.
+    같은 폴더의 임시 파일에 스트리밍으로 기록한 뒤 교체하므로,
+    중간에 실패해도 기존 파일이 손상되지 않습니다.
+    progress: 진행률(0~1)을 받을 함수 (선택)
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=".consollab_", suffix=".xlsx", dir=directory)
+    os.close(fd)
+    try:
+        write_workbook(df_dict, tmp_path, progress, sheet_cache)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return path
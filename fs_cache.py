@@ -0,0 +1,175 @@
+"""
+정제된 재무제표 시트의 로컬 디스크 캐시 (Parquet).
+
+파일 내용 해시 + 파서 버전 + 엑셀 읽기 엔진을 키로 BSPL/CF/CE 정제 결과를 저장해 두고,
+다음 실행에서 같은 파일이 업로드되면 엑셀 파싱 없이 바로 읽어옵니다.
+(엔진마다 날짜/정수 값의 타입이 다를 수 있으므로 엔진별로 따로 보관)
+"""
+import datetime
+import json
+import os
+import shutil
+import uuid
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_MAX_BYTES = 1024 ** 3
+
+
+def default_cache_dir():
+    """캐시 기본 위치 (CONSOLLAB_CACHE_DIR 환경변수로 변경 가능)."""
+    return os.environ.get(
+        "CONSOLLAB_CACHE_DIR",
+        os.path.join(os.path.expanduser("~"), ".consollab", "cache"),
+    )
+
+
+def _json_value(value):
+    """JSON으로 바로 바꿀 수 없는 값 (날짜는 {"datetime": ISO 문자열}, numpy 스칼라는 파이썬 값)"""
+    if isinstance(value, datetime.datetime):
+        return {"datetime": value.isoformat()}
+    return value.item() if isinstance(value, np.generic) else str(value)
+
+
+def _from_json_value(obj):
+    if list(obj) == ["datetime"]:
+        return datetime.datetime.fromisoformat(obj["datetime"])
+    return obj
+
+
+def _to_parquet_frame(df):
+    """
+    Parquet으로 저장할 수 있도록 변환합니다.
+    - 컬럼 이름은 문자열이어야 하므로 header=None으로 읽은 정수 컬럼은 문자열로 바꿉니다.
+    - 문자열이 아닌 값이 있는 object 컬럼(CE 시트의 지분율 숫자와 구분 문자 등)은
+      값의 타입을 그대로 되살리도록 JSON으로 따로 저장합니다.
+    반환: (DataFrame, {컬럼: 값 목록})
+    """
+    out = df.copy()
+    out.columns = [str(c) for c in out.columns]
+    mixed = {}
+    for col in out.columns[out.dtypes.values == object]:
+        values = out[col]
+        if not values.dropna().map(type).eq(str).all():
+            mixed[col] = values.tolist()
+            out[col] = None
+    return out, mixed
+
+
+def _from_parquet_frame(df, int_columns, mixed):
+    # 문자열 컬럼의 빈 칸은 None으로 복원되므로 엑셀에서 읽은 것과 같이 NaN으로 맞춤
+    obj_cols = df.columns[df.dtypes.values == object]
+    if len(obj_cols):
+        df[obj_cols] = df[obj_cols].where(df[obj_cols].notna(), np.nan)
+    for col, values in mixed.items():
+        df[col] = pd.Series(values, index=df.index, dtype=object)
+    if int_columns:
+        df.columns = [int(c) for c in df.columns]
+    return df
+
+
+class ParsedFSCache:
+    """
+    정제된 시트를 <root>/<버전>/<엔진>/<해시>/<시트>.parquet 에 보관합니다.
+    - 전체 크기가 max_bytes를 넘으면 가장 오래 사용하지 않은 항목(해시)부터 삭제합니다.
+      이전 파서 버전의 캐시는 저장할 때 함께 삭제합니다.
+    - 읽기/쓰기 실패(권한, 손상된 파일, Arrow 변환 불가 등)는 캐시 미스로 처리합니다.
+    - 쓰기는 임시 디렉터리에 먼저 기록한 뒤 교체하므로 중간에 중단돼도 반쪽 캐시가 남지 않습니다.
+    """
+
+    def __init__(self, root, version, enabled=True, max_bytes=DEFAULT_MAX_BYTES):
+        self.root = root
+        self.version = str(version)
+        self.enabled = enabled
+        self.max_bytes = max_bytes
+
+    def _entry_dir(self, digest, engine):
+        return os.path.join(self.root, self.version, engine, digest)
+
+    def has(self, digest, engine):
+        return self.enabled and os.path.isdir(self._entry_dir(digest, engine))
+
+    def load(self, digest, names, engine):
+        """{시트: DataFrame}을 반환합니다. 하나라도 없으면 None."""
+        if not self.has(digest, engine):
+            return None
+        entry_dir = self._entry_dir(digest, engine)
+        frames = {}
+        try:
+            for name in names:
+                path = os.path.join(entry_dir, f"{name}.parquet")
+                if not os.path.exists(path):
+                    return None
+                df = pd.read_parquet(path)
+                int_columns = os.path.exists(os.path.join(entry_dir, f"{name}.intcols"))
+                mixed_path = os.path.join(entry_dir, f"{name}.mixed.json")
+                mixed = {}
+                if os.path.exists(mixed_path):
+                    with open(mixed_path, encoding="utf-8") as f:
+                        mixed = json.load(f, object_hook=_from_json_value)
+                frames[name] = _from_parquet_frame(df, int_columns, mixed)
+            os.utime(entry_dir)  # 최근 사용 시각 갱신
+        except Exception:
+            return None
+        return frames
+
+    def store(self, digest, frames, engine):
+        """{시트: DataFrame}을 저장합니다. 저장에 실패하면 조용히 건너뜁니다."""
+        if not self.enabled:
+            return False
+        entry_dir = self._entry_dir(digest, engine)
+        tmp_dir = f"{entry_dir}.{uuid.uuid4().hex}.tmp"
+        try:
+            os.makedirs(tmp_dir)
+            for name, df in frames.items():
+                out, mixed = _to_parquet_frame(df)
+                out.to_parquet(os.path.join(tmp_dir, f"{name}.parquet"))
+                if mixed:
+                    with open(
+                        os.path.join(tmp_dir, f"{name}.mixed.json"), "w", encoding="utf-8"
+                    ) as f:
+                        json.dump(mixed, f, ensure_ascii=False, default=_json_value)
+                if len(df.columns) and all(
+                    isinstance(c, (int, np.integer)) for c in df.columns
+                ):
+                    open(os.path.join(tmp_dir, f"{name}.intcols"), "w").close()
+            if os.path.isdir(entry_dir):
+                shutil.rmtree(entry_dir, ignore_errors=True)
+            os.replace(tmp_dir, entry_dir)
+        except Exception:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            return False
+        self.prune()
+        return True
+
+    def prune(self):
+        """
+        이전 파서 버전의 캐시를 지우고, 전체 크기가 max_bytes 이하가 되도록
+        가장 오래 사용하지 않은 항목부터 삭제합니다.
+        """
+        try:
+            for entry in os.scandir(self.root):
+                # 숫자 이름의 폴더만 파서 버전 (같은 루트의 다른 캐시는 건드리지 않음)
+                if entry.is_dir() and entry.name.isdigit() and entry.name != self.version:
+                    shutil.rmtree(entry.path, ignore_errors=True)
+            entries = []
+            for engine_dir in os.scandir(os.path.join(self.root, self.version)):
+                if not engine_dir.is_dir():
+                    continue
+                for entry in os.scandir(engine_dir.path):
+                    if entry.is_dir() and not entry.name.endswith(".tmp"):
+                        size = sum(f.stat().st_size for f in os.scandir(entry.path))
+                        entries.append((entry.stat().st_mtime, size, entry.path))
+        except OSError:
+            return
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
+
+    def clear(self):
+        """모든 버전의 캐시를 삭제합니다."""
+        shutil.rmtree(self.root, ignore_errors=True)
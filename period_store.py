@@ -0,0 +1,314 @@
+"""
+보고 기간별 로컬 저장소 (SQLite, 표준 라이브러리 sqlite3).
+
+세션이 끝나도 남도록 기간(예: '2025-12')별로 다음을 저장합니다.
+- 조정명세 시트 원본 (adjustment_sheets): 차기이월에서 AdjustmentLedger를 다시 만들 때 사용
+  (Parquet BLOB, 숫자/문자가 섞인 열은 값의 타입을 보존하도록 JSON으로 따로 저장)
+- 연결 결과 (results): BS/PL/CF 결과의 (계정코드, 금액 열) long format
+  (회사명 열에는 결과의 금액 열 이름(모회사/자회사/단순합계/연결조정/연결금액)이,
+  계정코드 열에는 BS/PL은 계정코드(소계 행은 레벨 코드), CF는 CF_code가 들어갑니다)
+
+results는 (기간, 회사명, 계정코드) 인덱스로 조회하므로 전기 비교 열과 자본변동표 기초 잔액 검증을
+지난해 엑셀을 다시 읽지 않고 가져올 수 있습니다.
+같은 기간을 다시 저장하면 그 기간의 기존 행을 모두 교체합니다.
+
+스키마 버전은 PRAGMA user_version에 기록합니다.
+- 조회는 DB를 읽기 전용으로 열고 바꾸지 않습니다. (테이블이 아직 없으면 빈 결과)
+- 저장할 때만 없는 테이블을 만들고, 이전 버전의 DB는 MIGRATIONS 순서대로 올립니다.
+- 이 앱이 만들지 않은 테이블은 건드리지 않으며, 이 앱보다 새 버전이거나 알 수 없는 버전의 DB는
+  읽지도 쓰지도 않습니다. (schema_error()로 이유 확인)
+"""
+import io
+import json
+import os
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+from adjustment_ledger import AdjustmentLedger
+
+# 테이블 구조를 바꾸면 올리고, 이전 버전 DB를 올리는 SQL을 MIGRATIONS에 추가
+STORE_SCHEMA_VERSION = 1
+APP_TABLES = ("adjustment_sheets", "results")
+
+RESULT_COLUMNS = ["결과", "회사명", "계정코드", "계정명", "금액"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS adjustment_sheets (
+    period TEXT NOT NULL, sheet_no INTEGER NOT NULL, 시트 TEXT NOT NULL, data BLOB NOT NULL, mixed TEXT,
+    PRIMARY KEY (period, sheet_no)
+);
+CREATE TABLE IF NOT EXISTS results (
+    period TEXT NOT NULL, 결과 TEXT NOT NULL, 회사명 TEXT, 계정코드 TEXT, 계정명 TEXT, 금액 REAL
+);
+CREATE INDEX IF NOT EXISTS results_key ON results (period, 회사명, 계정코드);
+"""
+
+# user_version -> 다음 버전으로 올리는 SQL (0 = 저장소 테이블이 아직 없는 DB)
+MIGRATIONS = {0: SCHEMA}
+
+
+def default_store_path():
+    """저장소 기본 위치 (CONSOLLAB_DB_PATH 환경변수로 변경 가능)."""
+    return os.environ.get(
+        "CONSOLLAB_DB_PATH",
+        os.path.join(os.path.expanduser("~"), ".consollab", "consollab.db"),
+    )
+
+
+def _text(values):
+    """SQLite TEXT 열 값 (빈 칸은 None, 나머지는 문자열)"""
+    values = pd.Series(values, dtype=object)
+    return values.astype(str).where(values.notna(), None).tolist()
+
+
+def _json_value(value):
+    """JSON으로 바로 바꿀 수 없는 값 (numpy 스칼라는 파이썬 값, 그 외는 문자열)"""
+    return value.item() if isinstance(value, np.generic) else str(value)
+
+
+def _sheet_blob(df):
+    """시트 -> (Parquet bytes, 타입이 섞인 열의 JSON {열: 값 목록})"""
+    frame = df.copy()
+    frame.columns = [str(c) for c in frame.columns]
+    mixed = {}
+    for col in frame.columns[frame.dtypes.values == object]:
+        values = frame[col]
+        if values.dropna().map(type).nunique() > 1:
+            mixed[col] = values.tolist()
+            frame[col] = None
+    return frame.to_parquet(), json.dumps(mixed, ensure_ascii=False, default=_json_value)
+
+
+def _sheet_frame(data, mixed):
+    """_sheet_blob의 역변환 (문자열 열의 빈 칸은 엑셀에서 읽은 것과 같이 NaN)"""
+    frame = pd.read_parquet(io.BytesIO(data))
+    obj_cols = frame.columns[frame.dtypes.values == object]
+    if len(obj_cols):
+        frame[obj_cols] = frame[obj_cols].where(frame[obj_cols].notna(), np.nan)
+    for col, values in json.loads(mixed or "{}").items():
+        frame[col] = pd.Series(values, index=frame.index, dtype=object)
+    return frame
+
+
+def _filters(period, company=None, code=None):
+    """(WHERE 절, 파라미터) - 인덱스 (period, 회사명, 계정코드) 순서의 조건"""
+    clauses, params = ["period = ?"], [str(period)]
+    if company is not None:
+        clauses.append("회사명 = ?")
+        params.append(str(company))
+    if code is not None:
+        clauses.append("계정코드 = ?")
+        params.append(str(code))
+    return " AND ".join(clauses), params
+
+
+class PeriodStore:
+    """
+    기간별 조정명세/결과를 SQLite 파일 하나에 보관합니다.
+    - enabled=False이면 저장은 건너뛰고 조회는 빈 결과를 반환합니다.
+    - 저장은 기간 단위 트랜잭션이므로 중간에 실패해도 그 기간의 이전 내용이 그대로 남습니다.
+    - 저장 실패(권한, 디스크 부족, 손상된 DB 등)는 False를 반환합니다.
+    """
+
+    def __init__(self, path, enabled=True):
+        self.path = path
+        self.enabled = enabled
+
+    def schema_error(self):
+        """이 앱에서 저장소 DB를 쓸 수 없으면 그 이유 (쓸 수 있거나 아직 파일이 없으면 None)"""
+        if not self.enabled or not os.path.exists(self.path):
+            return None
+        try:
+            conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True)
+            try:
+                version = conn.execute("PRAGMA user_version").fetchone()[0]
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            return f"기간 저장소 DB를 열 수 없습니다: {e}"
+        if version > STORE_SCHEMA_VERSION:
+            return (
+                f"기간 저장소 DB({self.path})의 스키마 버전({version})이 이 앱({STORE_SCHEMA_VERSION})보다 높습니다. "
+                "ConsolLab을 업데이트하거나 CONSOLLAB_DB_PATH로 다른 파일을 지정하세요."
+            )
+        if version != STORE_SCHEMA_VERSION and version not in MIGRATIONS:
+            return (
+                f"기간 저장소 DB({self.path})의 스키마 버전({version})을 알 수 없습니다. "
+                "CONSOLLAB_DB_PATH로 다른 파일을 지정하세요."
+            )
+        return None
+
+    def _connect(self, write=False):
+        """
+        DB 연결. write=False이면 읽기 전용 (현재 버전이 아니면 None)
+        write=True이면 이전 버전을 MIGRATIONS로 올린 뒤 연결을 반환합니다.
+        쓸 수 없는 버전이면 sqlite3.DatabaseError (schema_error 메시지)
+        """
+        error = self.schema_error()
+        if error:
+            raise sqlite3.DatabaseError(error)
+        if not write:
+            conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True)
+            if conn.execute("PRAGMA user_version").fetchone()[0] != STORE_SCHEMA_VERSION:
+                conn.close()
+                return None
+            return conn
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(self.path)
+        try:
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            while version < STORE_SCHEMA_VERSION:
+                # executescript는 자체적으로 커밋하므로 버전 기록도 같은 스크립트에 넣음
+                version += 1
+                conn.executescript(
+                    MIGRATIONS[version - 1] + f"\nPRAGMA user_version = {version};"
+                )
+        except sqlite3.Error:
+            conn.close()
+            raise
+        return conn
+
+    def _query(self, sql, params=()):
+        """조회 결과 DataFrame (저장소를 쓰지 않거나 DB/테이블이 없거나 읽을 수 없으면 None)"""
+        if not self.enabled or not os.path.exists(self.path):
+            return None
+        try:
+            conn = self._connect()
+        except (sqlite3.Error, OSError):
+            return None
+        if conn is None:
+            return None
+        try:
+            return pd.read_sql_query(sql, conn, params=list(params))
+        except (sqlite3.Error, pd.errors.DatabaseError):
+            return None
+        finally:
+            conn.close()
+
+    def _replace_period(self, period, tables, inserts):
+        """tables의 period 행을 지우고 inserts [(sql, rows)]를 한 트랜잭션으로 기록합니다."""
+        if not self.enabled:
+            return False
+        try:
+            conn = self._connect(write=True)
+        except (sqlite3.Error, OSError):
+            return False
+        try:
+            with conn:
+                for table in tables:
+                    conn.execute(f"DELETE FROM {table} WHERE period = ?", (str(period),))
+                for sql, rows in inserts:
+                    conn.executemany(sql, rows)
+            return True
+        except sqlite3.Error:
+            return False
+        finally:
+            conn.close()
+
+    def periods(self):
+        """조정명세 또는 결과가 저장된 기간 목록 (최근 기간이 먼저)"""
+        df = self._query(
+            "SELECT period FROM adjustment_sheets UNION SELECT period FROM results "
+            "ORDER BY period DESC"
+        )
+        return [] if df is None else df["period"].tolist()
+
+    # --- 조정명세 ---
+    def store_adjustments(self, period, ledger):
+        """AdjustmentLedger의 시트 원본을 기간으로 저장합니다."""
+        sheet_rows = [
+            (str(period), sheet_no, str(name), *_sheet_blob(df))
+            for sheet_no, (name, df) in enumerate(ledger.workbook().items())
+        ]
+        return self._replace_period(
+            period,
+            ("adjustment_sheets",),
+            [("INSERT INTO adjustment_sheets VALUES (?, ?, ?, ?, ?)", sheet_rows)],
+        )
+
+    def load_ledger(self, period):
+        """저장된 시트 원본으로 AdjustmentLedger를 다시 만듭니다. (저장된 기간이 아니면 None)"""
+        df = self._query(
+            "SELECT 시트, data, mixed FROM adjustment_sheets WHERE period = ? ORDER BY sheet_no",
+            (str(period),),
+        )
+        if df is None or df.empty:
+            return None
+        sheets = {
+            name: _sheet_frame(data, mixed)
+            for name, data, mixed in zip(df["시트"], df["data"], df["mixed"])
+        }
+        return AdjustmentLedger(sheets)
+
+    # --- 연결 결과 ---
+    def store_results(self, period, frames, amount_columns):
+        """
+        {결과 이름: DataFrame}의 금액 열(amount_columns 중 있는 열)을 기간으로 저장합니다.
+        행의 코드는 CF_code 열이 있으면 CF_code, 없으면 계정코드이며 코드가 없는 행은 계정명으로만 남습니다.
+        """
+        rows = []
+        for name, df in frames.items():
+            if df is None or df.empty:
+                continue
+            columns = [c for c in amount_columns if c in df.columns]
+            if not columns:
+                continue
+            code_col = "CF_code" if "CF_code" in df.columns else "계정코드"
+            codes = _text(df[code_col]) if code_col in df.columns else [None] * len(df)
+            names = _text(df["계정명"]) if "계정명" in df.columns else [None] * len(df)
+            for column in columns:
+                amounts = pd.to_numeric(df[column], errors="coerce").astype(float)
+                amounts = amounts.where(amounts.notna(), None)
+                rows.extend(
+                    zip(
+                        [str(period)] * len(df),
+                        [str(name)] * len(df),
+                        [str(column)] * len(df),
+                        codes,
+                        names,
+                        amounts,
+                    )
+                )
+        return self._replace_period(
+            period, ("results",), [("INSERT INTO results VALUES (?, ?, ?, ?, ?, ?)", rows)]
+        )
+
+    def result_amounts(self, period, company=None, code=None, result=None):
+        """기간의 결과 금액 (회사명 = 결과의 금액 열 이름, 계정코드(CF는 CF_code)로 인덱스 조회)"""
+        where, params = _filters(period, company, code)
+        if result is not None:
+            where += " AND 결과 = ?"
+            params.append(str(result))
+        df = self._query(
+            f"SELECT {', '.join(RESULT_COLUMNS)} FROM results WHERE {where}", params
+        )
+        return pd.DataFrame(columns=RESULT_COLUMNS) if df is None else df
+
+    def comparative(self, period, column="연결금액", result=None):
+        """전기 비교 열: 계정코드(CF는 CF_code) -> 금액 Series (코드가 있는 행만, 소계 행은 레벨 코드)"""
+        df = self.result_amounts(period, company=column, result=result)
+        df = df[df["계정코드"].notna() & (df["계정코드"] != "")]
+        return df.groupby("계정코드", sort=False)["금액"].sum()
+
+    def clear(self):
+        """저장소 테이블(APP_TABLES)을 삭제합니다. (같은 DB 파일의 다른 테이블은 그대로 둠)"""
+        if not os.path.exists(self.path) or self.schema_error():
+            return
+        try:
+            conn = sqlite3.connect(self.path)
+        except sqlite3.Error:
+            return
+        try:
+            with conn:
+                for table in APP_TABLES:
+                    conn.execute(f"DROP TABLE IF EXISTS {table}")
+                conn.execute("PRAGMA user_version = 0")
+        except sqlite3.Error:
+            pass
+        finally:
+            conn.close()
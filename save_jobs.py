@@ -0,0 +1,109 @@
+"""
+백그라운드 파일 저장 작업.
+
+저장 위치를 정한 뒤의 직렬화와 디스크 기록을 스크립트 스레드 밖의 작업 스레드에서 실행해,
+큰 파일을 저장하는 동안에도 화면이 멈추지 않도록 합니다.
+작업 함수는 Streamlit API(st.*)를 호출하지 않고, 진행 상태는 SaveJob에 기록합니다.
+"""
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+SAVE_WORKERS = 2
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_save_executor():
+    """저장 작업용 스레드 풀 (프로세스당 하나)"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=SAVE_WORKERS, thread_name_prefix="consollab-save"
+            )
+        return _executor
+
+
+class SaveJob:
+    """
+    저장 작업 하나의 상태.
+    - status: "queued" → "running" → "done" 또는 "error"
+    - progress: 0~1, error: 실패 메시지
+    - result_key: (결과 이름, 결과 버전) — 같은 버전을 다시 저장할 때 재사용 판단용
+    - dismissed: 진행 상황 패널에서 숨김 여부
+    """
+
+    def __init__(self, label, path, result_key=None):
+        self.label = label
+        self.path = path
+        self.result_key = result_key
+        self.status = "queued"
+        self.progress = 0.0
+        self.error = None
+        self.saved_stat = None
+        self.started_at = time.time()
+        self.finished_at = None
+        self.future = None
+        self.dismissed = False
+
+    @property
+    def done(self):
+        return self.status in ("done", "error")
+
+    def set_progress(self, progress):
+        self.progress = min(1.0, max(0.0, progress))
+
+    def run(self, write):
+        self.status = "running"
+        try:
+            write(self.set_progress)
+            if os.path.isfile(self.path):
+                stat = os.stat(self.path)
+                self.saved_stat = (stat.st_mtime_ns, stat.st_size)
+            self.progress = 1.0
+            self.status = "done"
+        except Exception as e:
+            self.error = str(e)
+            self.status = "error"
+        finally:
+            self.finished_at = time.time()
+
+    def file_unchanged(self):
+        """저장한 파일이 그대로 남아 있는지 (수정시각, 크기 비교)"""
+        if self.status != "done" or self.saved_stat is None:
+            return False
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return False
+        return (stat.st_mtime_ns, stat.st_size) == self.saved_stat
+
+
+def submit_save(label, path, write, result_key=None):
+    """
+    write(progress)를 작업 스레드에서 실행하는 SaveJob을 만들어 반환합니다.
+    write는 path에 파일을 쓰고, 진행률(0~1)을 progress로 알립니다.
+    """
+    job = SaveJob(label, path, result_key)
+    job.future = get_save_executor().submit(job.run, write)
+    return job
+
+
+def write_bytes_file(data, path, progress=None):
+    """이미 만든 bytes를 같은 폴더의 임시 파일에 쓴 뒤 교체합니다."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=".consollab_", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    if progress is not None:
+        progress(1.0)
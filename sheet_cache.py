@@ -0,0 +1,114 @@
+"""
+엑셀 시트 XML의 로컬 디스크 캐시.
+
+excel_export가 만든 시트 XML(xl/worksheets/sheetN.xml)을 시트 내용 해시를 키로 보관해 두고,
+같은 내용의 시트가 다시 내보내질 때 행 변환/XML 생성 없이 그대로 워크북에 넣습니다.
+(조정 파일만 바꿔 다시 실행하면 CAJE 시트만 새로 만들고 BS/PL/CF 시트는 재사용)
+
+시트 XML은 문자열을 인라인으로 담고 스타일 번호가 워크북마다 고정되어 있어
+(excel_export.new_workbook) 다른 워크북에 그대로 넣어도 됩니다.
+"""
+import hashlib
+import os
+import shutil
+import uuid
+
+import pandas as pd
+
+# excel_export의 시트 출력 형식(스타일, 열 너비, 유효성 검사 등)을 바꾸면 올려서 기존 캐시를 무효화
+SHEET_CACHE_VERSION = 1
+DEFAULT_MAX_BYTES = 1024 ** 3
+
+
+def sheet_fingerprint(sheet_name, df, validation_formula=None):
+    """
+    시트 XML을 결정하는 모든 입력(시트 이름, 열 이름/타입, 값, 유효성 검사 수식)의 해시.
+    해시할 수 없는 값(리스트 등)이 있으면 None (캐시하지 않음)
+    """
+    digest = hashlib.sha1()
+    digest.update(repr((str(sheet_name), validation_formula)).encode("utf-8"))
+    digest.update(repr([(str(c), str(t)) for c, t in df.dtypes.items()]).encode("utf-8"))
+    try:
+        digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+        # object 열은 값을 문자열로 해시하므로, 숫자 1과 문자 "1"을 구분하도록 타입도 해시
+        for _, values in df.select_dtypes(include="object").items():
+            types = values.map(lambda v: type(v).__name__)
+            digest.update(pd.util.hash_pandas_object(types, index=False).to_numpy().tobytes())
+    except Exception:
+        return None
+    return digest.hexdigest()
+
+
+class SheetXMLCache:
+    """
+    시트 XML을 <root>/<버전>/<해시>.xml 에 보관합니다.
+    - 전체 크기가 max_bytes를 넘으면 가장 오래 사용하지 않은 파일부터 삭제합니다.
+    - 읽기/쓰기 실패는 캐시 미스로 처리하고, 쓰기는 임시 파일에 먼저 기록한 뒤 교체합니다.
+    - 여러 프로세스(마감 패키지 작업)가 같은 폴더를 함께 사용할 수 있습니다.
+    """
+
+    def __init__(self, root, version=SHEET_CACHE_VERSION, max_bytes=DEFAULT_MAX_BYTES, enabled=True):
+        self.root = root
+        self.version = str(version)
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+
+    def _dir(self):
+        return os.path.join(self.root, self.version)
+
+    def key(self, sheet_name, df, validation_formula=None):
+        if not self.enabled:
+            return None
+        return sheet_fingerprint(sheet_name, df, validation_formula)
+
+    def get(self, key):
+        """캐시된 시트 XML 파일 경로 (없으면 None)"""
+        if not (self.enabled and key):
+            return None
+        path = os.path.join(self._dir(), f"{key}.xml")
+        try:
+            os.utime(path)  # 최근 사용 시각 갱신
+        except OSError:
+            return None
+        return path
+
+    def put(self, key, src_path):
+        """src_path의 시트 XML을 저장합니다. 저장에 실패하면 조용히 건너뜁니다."""
+        if not (self.enabled and key):
+            return False
+        path = os.path.join(self._dir(), f"{key}.xml")
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        try:
+            os.makedirs(self._dir(), exist_ok=True)
+            shutil.copyfile(src_path, tmp_path)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return False
+        self.prune()
+        return True
+
+    def prune(self):
+        """전체 크기가 max_bytes 이하가 되도록 오래된 파일부터 삭제합니다."""
+        try:
+            entries = []
+            for entry in os.scandir(self._dir()):
+                if entry.name.endswith(".xml"):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+        except OSError:
+            return
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+
+    def clear(self):
+        """모든 버전의 캐시를 삭제합니다."""
+        shutil.rmtree(self.root, ignore_errors=True)
@@ -1,6 +1,7 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 import threading
+import multiprocessing
 import sys
 import os
 import time
@@ -176,6 +177,8 @@ def on_closed():
     os._exit(0)
 
 if __name__ == '__main__':
+    # 엑셀 병렬 읽기(프로세스 풀)용: 패키징된 exe에서 자식 프로세스가 앱을 다시 띄우지 않도록 함
+    multiprocessing.freeze_support()
     show_splash()
     
     # 2. 스플래시가 닫히면 바로 네이티브 창 실행
@@ -8,8 +8,37 @@ from openpyxl.utils import get_column_letter
 from contextlib import redirect_stdout
 import warnings
 import os
+import shutil
 import sys
 from version_info import VERSION
+from workbook_io import (
+    WorkbookRegistry,
+    available_excel_engines,
+    default_excel_engine,
+    default_ingest_workers,
+    file_digest,
+    remember_digest,
+)
+from fs_cache import ParsedFSCache, default_cache_dir
+from coa_model import CoAModel
+from excel_export import export_excel, export_excel_file
+from sheet_cache import SheetXMLCache
+from columnar_export import COLUMNAR_FORMATS, write_columnar
+from save_jobs import submit_save, write_bytes_file
+from close_package import PackageItem, write_close_package
+from adjustment_ledger import AdjustmentLedger
+from adjustment_effects import ce_nci_effects, tax_nci_effects
+from caje_rules import caje_entries
+from ce_layout import parse_ce_sheet
+from balance_check import balance_issues
+from carryover import roll_forward
+from period_store import PeriodStore, default_store_path
+from consolidation import (
+    balance_differences,
+    consolidation_frame,
+    entity_matrix,
+    subtotal_statement,
+)
 import tkinter as tk
 import tkinter.filedialog as fd
 
@@ -18,11 +47,8 @@ warnings.filterwarnings('ignore', category=UserWarning, module='openpyxl')
 
 
 # 파일 저장 함수
-def save_excel_native(excel_bytes, default_filename="result.xlsx"):
-    """
-    이미 생성된 엑셀 바이너리 데이터(bytes)를 받아서
-    윈도우 '다른 이름으로 저장' 창을 통해 저장합니다.
-    """
+def ask_excel_save_path(default_filename="result.xlsx"):
+    """윈도우 '다른 이름으로 저장' 창으로 저장 경로를 선택받습니다. (취소하면 빈 문자열)"""
     # 1. Tkinter 숨겨진 창 생성
     root = tk.Tk()
     root.withdraw()
@@ -39,15 +65,204 @@ def save_excel_native(excel_bytes, default_filename="result.xlsx"):
     
     # 3. 창 닫기
     root.destroy()
+    return file_path
+
+
+def ask_directory():
+    """폴더 선택 창으로 저장할 폴더를 선택받습니다. (취소하면 빈 문자열)"""
+    root = tk.Tk()
+    root.withdraw()
+    root.wm_attributes('-topmost', 1)
+    directory = fd.askdirectory(parent=root, title="저장할 폴더 선택")
+    root.destroy()
+    return directory
+
+
+def start_save_job(label, path, write, result_key=None):
+    """
+    저장 작업을 백그라운드 스레드에서 시작합니다.
+    진행 상황은 사이드바의 '저장 작업' 패널에 표시됩니다.
+    """
+    job = submit_save(label, path, write, result_key)
+    st.session_state.save_jobs.append(job)
+    st.toast(f"💾 저장을 시작했습니다: {os.path.basename(path)}")
+    return job
+
 
-    # 4. 파일 쓰기 (바이너리 모드 'wb' 중요!)
+def save_excel_native(excel_bytes, default_filename="result.xlsx"):
+    """
+    이미 생성된 엑셀 바이너리 데이터(bytes)를 받아서
+    윈도우 '다른 이름으로 저장' 창을 통해 저장합니다. (파일 쓰기는 백그라운드)
+    """
+    file_path = ask_excel_save_path(default_filename)
     if file_path:
-        try:
-            with open(file_path, "wb") as f:
-                f.write(excel_bytes) # 받아온 데이터를 파일로 씀
-            st.success(f"엑셀 파일이 저장되었습니다!\n경로: {file_path}")
-        except Exception as e:
-            st.error(f"저장 중 오류 발생: {e}")
+        start_save_job(
+            default_filename,
+            file_path,
+            lambda progress: write_bytes_file(excel_bytes, file_path, progress),
+        )
+
+
+def find_saved_export(name, version):
+    """같은 결과/버전을 이미 저장했고 그 파일이 그대로 남아 있는 저장 작업 (없으면 None)"""
+    for job in reversed(st.session_state.save_jobs):
+        if job.result_key == (name, version) and job.file_unchanged():
+            return job
+    return None
+
+
+def save_excel_streaming(name, build_sheets, default_filename="result.xlsx"):
+    """
+    대용량 결과(연결정산표, 취합 주석, CAJE 원장)용 저장 함수.
+    엑셀 bytes를 메모리에 만들지 않고, 선택한 위치에 행 단위로 바로 기록합니다.
+    (직렬화와 디스크 기록은 백그라운드 스레드에서 실행)
+    같은 버전의 결과를 이미 저장한 파일이 그대로 있으면 다시 만들지 않고 복사합니다.
+    build_sheets: {시트: DataFrame}을 반환하는 함수 (저장할 때만 호출)
+    """
+    file_path = ask_excel_save_path(default_filename)
+    if not file_path:
+        return
+    version = st.session_state.result_versions.get(name, 0)
+    previous = find_saved_export(name, version)
+    if previous is not None:
+        if os.path.exists(file_path) and os.path.samefile(previous.path, file_path):
+            st.success(f"엑셀 파일이 이미 저장되어 있습니다!\n경로: {file_path}")
+            return
+        source = previous.path
+
+        def write(progress):
+            shutil.copyfile(source, file_path)
+    else:
+        # 시트 목록은 스크립트 스레드에서 확정하고, 작업 스레드는 파일 쓰기만 수행
+        sheets = build_sheets()
+        cache = sheet_cache
+
+        def write(progress):
+            export_excel_file(sheets, file_path, progress, cache)
+
+    start_save_job(default_filename, file_path, write, (name, version))
+
+
+def save_result_columnar(build_sheets, default_filename, fmt):
+    """
+    결과를 컬럼형 파일(Parquet/Arrow IPC/CSV)로 저장합니다.
+    선택한 폴더 아래 <파일명>/ 폴더에 시트별 파일 하나씩 씁니다. (백그라운드)
+    """
+    directory = ask_directory()
+    if not directory:
+        return
+    target = os.path.join(directory, Path(default_filename).stem)
+    sheets = build_sheets()
+    start_save_job(
+        f"{Path(default_filename).stem} ({fmt})",
+        target,
+        lambda progress: write_columnar(sheets, target, fmt, progress),
+    )
+
+
+def save_result(name, build_sheets, default_filename):
+    """사이드바에서 선택한 저장 형식으로 결과를 저장합니다. (Excel은 스트리밍 저장)"""
+    fmt = st.session_state.get("result_format", "xlsx")
+    if fmt in COLUMNAR_FORMATS:
+        save_result_columnar(build_sheets, default_filename, fmt)
+    else:
+        save_excel_streaming(name, build_sheets, default_filename)
+
+
+# 저장할 수 있는 결과 (결과 이름 -> 기본 파일 이름)
+RESULT_FILES = {
+    "consolidation": "consolidated_fs_results.xlsx",
+    "combined_footnotes": "combined_footnotes.xlsx",
+    "caje": "CAJE_generated.xlsx",
+    "fcfs": "FCFS_translated.xlsx",
+}
+
+
+def result_sheets(name):
+    """결과(name)의 {시트: DataFrame}. 아직 만들어지지 않았으면 None"""
+    results = st.session_state.results
+    if name == "consolidation":
+        if results.get("consolidation_wp_bs") is None or results["consolidation_wp_bs"].empty:
+            return None
+        return {
+            "Consol_BS": results["consolidation_wp_bs"],
+            "Consol_PL": results["consolidation_wp_pl"],
+            "Consol_CF": results["consolidation_wp_cf"],
+            "Consol_SCE": results.get("consolidation_wp_sce", pd.DataFrame()),
+        }
+    if name == "combined_footnotes":
+        return results.get("combined_footnotes") or None
+    if name == "caje":
+        if not st.session_state.caje_generated:
+            return None
+        return {
+            "CAJE_BSPL": results.get("caje_bspl_df", pd.DataFrame()),
+            "CAJE_CF": results.get("caje_cf_df", pd.DataFrame()),
+        }
+    if name == "fcfs":
+        fcfs = st.session_state.fcfs_results
+        if fcfs.get("translated_df") is None:
+            return None
+        return {"translated": fcfs["translated_df"], "summary": fcfs["summary_df"]}
+    raise KeyError(name)
+
+
+def close_package_items():
+    """마감 패키지에 넣을 수 있는 결과 목록 (같은 버전으로 저장해 둔 엑셀 파일은 복사해 재사용)"""
+    items = []
+    for name, filename in RESULT_FILES.items():
+        sheets = result_sheets(name)
+        if sheets is None:
+            continue
+        previous = find_saved_export(name, st.session_state.result_versions.get(name, 0))
+        items.append(PackageItem(name, filename, previous.path if previous else sheets, sheets))
+    workflow = st.session_state.adj_workflow
+    for key, filename in [
+        ("intermediate_data", "조정명세_입력템플릿_TaxNci.xlsx"),
+        ("carryover_file", "조정명세_입력템플릿_carryover.xlsx"),
+    ]:
+        if workflow.get(key):
+            items.append(PackageItem(key, filename, workflow[key]))
+    for period, data in carryover_period_files()[1:]:
+        items.append(
+            PackageItem(f"carryover_file_{period}", f"조정명세_입력템플릿_carryover_{period}.xlsx", data)
+        )
+    return items
+
+
+def carryover_period_files():
+    """차기이월 결과 [(이월 기간, 엑셀 bytes)] (1기간 = carryover_file)"""
+    files = st.session_state.adj_workflow.get("carryover_files") or []
+    return list(enumerate(files, start=1))
+
+
+def save_close_package(items, max_workers):
+    """
+    준비된 결과 워크북을 한 번에 만들어 선택한 폴더에 zip(+manifest.json)으로 저장합니다.
+    워크북은 여러 프로세스에서 동시에 만듭니다. (백그라운드)
+    """
+    directory = ask_directory()
+    if not directory:
+        return
+    target = os.path.join(
+        directory, f"consollab_close_package_{pd.Timestamp.now():%Y%m%d_%H%M%S}.zip"
+    )
+    metadata = {
+        "app": "ConsolLab",
+        "version": VERSION,
+        "result_versions": {
+            item.result: st.session_state.result_versions.get(item.result, 0)
+            for item in items
+            if item.result in RESULT_FILES
+        },
+    }
+    start_save_job(
+        "마감 패키지",
+        target,
+        lambda progress: write_close_package(
+            items, target, max_workers, metadata, progress, sheet_cache
+        ),
+    )
 
 
 # ----------------------------------------------------------------
@@ -111,7 +326,12 @@ if "results" not in st.session_state:
         "validation_log": [],
         "caje_bspl_df": None,
         "caje_cf_df": None,
+        "caje_balance_issues": None,
     }
+if "result_versions" not in st.session_state:
+    # 결과별 버전 (결과가 새로 만들어질 때마다 +1) 및 백그라운드 저장 작업 목록
+    st.session_state.result_versions = {}
+    st.session_state.save_jobs = []
 if "caje_generated" not in st.session_state:
     st.session_state.caje_generated = False
 if "fcfs_results" not in st.session_state:
@@ -127,6 +347,7 @@ if "adj_workflow" not in st.session_state:
         "final_file": None,
         "validation_log": [],
         "carryover_file": None,
+        "carryover_files": [],
     }
 
     # --- Session State for Tab 3 ---
@@ -135,124 +356,166 @@ if "adj_workflow" not in st.session_state:
 # =================================================================================================
 # --- Helper Functions ---
 # =================================================================================================
-@st.cache_data
-def to_excel(df_dict):
+@st.cache_resource
+def get_workbook_registry(engine="openpyxl"):
+    """업로드 파일의 파싱 결과를 내용 해시 기준으로 공유하는 레지스트리를 반환합니다. (엔진별)"""
+    return WorkbookRegistry(engine=engine)
+
+
+workbook_registry = get_workbook_registry(default_excel_engine())
+
+# read_fs_sheets의 정제 로직(또는 CE 읽기 방식, 캐시 저장 형식)을 바꾸면 올려서 기존 디스크 캐시를 무효화
+FS_PARSER_VERSION = 3
+
+
+@st.cache_resource
+def get_parsed_fs_cache(enabled=True):
+    """정제된 BSPL/CF/CE 시트의 디스크 캐시(Parquet)를 반환합니다."""
+    return ParsedFSCache(default_cache_dir(), FS_PARSER_VERSION, enabled=enabled)
+
+
+@st.cache_resource
+def get_sheet_cache(enabled=True):
+    """결과 엑셀의 시트 XML 디스크 캐시를 반환합니다. (내용이 같은 시트는 다시 만들지 않음)"""
+    return SheetXMLCache(os.path.join(default_cache_dir(), "sheets"), enabled=enabled)
+
+
+@st.cache_resource
+def get_period_store(enabled=False):
+    """기간별 조정명세/연결 결과의 로컬 SQLite 저장소를 반환합니다."""
+    return PeriodStore(default_store_path(), enabled=enabled)
+
+
+def report_period():
+    """저장소에 기록할 보고 기간 (저장소를 쓰지 않거나 기간을 입력하지 않았으면 None)"""
+    period = str(st.session_state.get("report_period") or "").strip()
+    if not period_store.enabled or not period:
+        return None
+    return period
+
+
+# 기간 저장소에서 가져온 비교 기간 연결금액 열
+COMPARATIVE_COLUMN = "전기연결금액"
+
+
+def comparative_period():
+    """전기 비교 열을 가져올 저장소 기간 (저장소를 쓰지 않거나 선택하지 않았으면 None)"""
+    period = st.session_state.get("comparative_period") or None
+    if not period_store.enabled:
+        return None
+    return period
+
+
+def with_comparative(df, period, result):
     """
-    여러 데이터프레임을 하나의 Excel 파일 버퍼에 시트로 저장하고, 스타일을 적용합니다.
-    df_dict: {'sheet_name': DataFrame} 형태의 딕셔너리
+    연결 결과 표에 비교 기간의 연결금액 열(COMPARATIVE_COLUMN)을 연결금액 바로 뒤에 붙인 복사본
+    (저장소의 (기간, 연결금액, 계정코드) 인덱스 조회, 저장된 값이 없는 행은 0)
     """
-    output = io.BytesIO()
-    with pd.ExcelWriter(output, engine="openpyxl") as writer:
-        # 데이터 유효성 검사 준비
-        validation_formula = None
-        if "Info" in df_dict and not df_dict["Info"].empty:
-            info_df = df_dict["Info"]
-            num_companies = len(info_df)
-            if num_companies > 0:
-                validation_formula = f"='Info'!$A$2:$A${num_companies + 1}"
-
-        for sheet_name, df in df_dict.items():
-            if df is None:  # df.empty 조건 제거하여 빈 시트도 생성
-                continue
+    code_col = "CF_code" if "CF_code" in df.columns else "계정코드"
+    if df.empty or code_col not in df.columns or "연결금액" not in df.columns:
+        return df
+    prior = period_store.comparative(period, result=result)
+    df = df.copy()
+    df.insert(
+        df.columns.get_loc("연결금액") + 1,
+        COMPARATIVE_COLUMN,
+        df[code_col].map(prior).fillna(0).round().astype("int64"),
+    )
+    return df
 
-            # 소계 행 정보 추출 후, 'is_subtotal' 열은 엑셀에서 제외
-            is_subtotal_col = df["is_subtotal"] if "is_subtotal" in df.columns else None
-            df_to_write = (
-                df.drop(columns=["is_subtotal"]) if is_subtotal_col is not None else df
-            )
-            df_to_write.to_excel(writer, sheet_name=sheet_name, index=False)
 
-            ws = writer.sheets[sheet_name]
+def read_entity_ce(file):
+    """모회사/자회사 파일의 CE 시트(header=None)를 디스크 캐시 우선으로 읽습니다."""
+    cached = parsed_fs_cache.load(file_digest(file), ("CE",), workbook_registry.engine)
+    if cached is not None:
+        return cached["CE"]
+    return workbook_registry.read_sheet(file, "CE", optional=True, header=None)
 
-            # 헤더 스타일 정의
-            header_font = Font(bold=True, color="FFFFFF")
-            header_fill = PatternFill(
-                start_color="4F81BD", end_color="4F81BD", fill_type="solid"
-            )
-            header_alignment = Alignment(
-                horizontal="center", vertical="center", wrap_text=True
-            )
 
-            # 헤더 스타일 적용
-            for cell in ws[1]:
-                cell.font = header_font
-                cell.fill = header_fill
-                cell.alignment = header_alignment
+@st.cache_resource(max_entries=32, show_spinner=False)
+def get_entity_ce(ce_key, _file):
+    """
+    모회사/자회사 파일(upload_key, 읽기 엔진)당 한 번 CE 시트를 읽어 CEBlock으로 파싱합니다. (CE 시트가 없으면 None)
+    자본변동표와 NCI 자동계산이 같은 블록을 공유하므로 반환된 블록은 수정하지 않습니다.
+    """
+    df = read_entity_ce(_file)
+    return None if df.empty else parse_ce_sheet(df)
 
-            # 소계 행에 볼드체 적용
-            if is_subtotal_col is not None:
-                bold_font = Font(bold=True)
-                for row_idx, is_sub in enumerate(is_subtotal_col):
-                    if is_sub:
-                        # openpyxl 행은 1-based, 헤더가 있으므로 +2
-                        for cell in ws[row_idx + 2]:
-                            cell.font = bold_font
-
-            # 열 너비 및 숫자 서식 적용
-            for i, column_name in enumerate(
-                df_to_write.columns, 1
-            ):  # openpyxl은 1-based index
-                column_letter = get_column_letter(i)
-                ws.column_dimensions[column_letter].width = 17
-
-                if pd.api.types.is_numeric_dtype(
-                    df_to_write[df_to_write.columns[i - 1]]
-                ):
-                    # 시트 이름에 따라 다른 숫자 서식 적용
-                    number_format = "0.000" if sheet_name == "Info" else "#,##0"
-                    for cell in ws[column_letter][1:]:
-                        if isinstance(cell.value, (int, float)):
-                            cell.number_format = number_format
-                            cell.alignment = Alignment(
-                                horizontal="right", vertical="center"
-                            )
-            
-            # 데이터 유효성 검사 적용
-            if validation_formula and sheet_name.startswith("CAJE") and "회사명" in df_to_write.columns:
-                dv = DataValidation(
-                    type="list", formula1=validation_formula, allow_blank=True
-                )
-                dv.error = "목록에 있는 값만 입력할 수 있습니다."
-                dv.errorTitle = "잘못된 입력"
-                dv.prompt = "목록에서 회사명을 선택하세요."
-                dv.promptTitle = "회사명 선택"
-                
-                company_col_idx = list(df_to_write.columns).index("회사명") + 1
-                company_col_letter = get_column_letter(company_col_idx)
-                target_range = f"{company_col_letter}2:{company_col_letter}10000"
-                ws.add_data_validation(dv)
-                dv.add(target_range)
 
+def load_entity_ce(file):
+    """업로드된 재무제표 파일의 (캐시된) CEBlock을 반환합니다."""
+    return get_entity_ce((upload_key(file), workbook_registry.engine), file)
 
-    return output.getvalue()
 
-def parse_percent(s):
+def to_excel(df_dict):
     """
-    다양한 형태의 퍼센트 값을 소수점 형태로 변환합니다.
-    - '60%': 0.6
-    - 60: 0.6 (1보다 크므로 퍼센트로 간주)
-    - 0.6: 0.6 (1보다 작거나 같으므로 소수점으로 간주)
+    여러 데이터프레임을 하나의 Excel 파일 버퍼에 시트로 저장하고, 스타일을 적용합니다.
+    df_dict: {'sheet_name': DataFrame} 형태의 딕셔너리
+    (서식은 excel_export에서 열/행 단위로 일괄 지정, 내용이 같은 시트는 시트 캐시에서 재사용)
     """
-    # 1. 입력값이 문자열일 경우
-    if isinstance(s, str):
-        try:
-            # 문자열은 항상 '%'가 있거나 퍼센트 숫자로 간주하고 100으로 나눔
-            return float(s.strip().strip('%')) / 100
-        except (ValueError, TypeError):
-            # "hello" 같이 변환 불가능한 문자열은 0.0 처리
-            return 0.
-    # 2. 입력값이 숫자(int, float)일 경우
-    elif isinstance(s, (int, float)):
-        # 숫자의 절댓값이 1보다 크면 (e.g., 60, -50) 퍼센트로 간주하고 100으로 나눔
-        if abs(s) > 1:
-            return float(s) / 100
-        # 숫자의 절댓값이 1보다 작거나 같으면 (e.g., 0.6, -0.5, 1) 이미 변환된 소수점으로 간주하고 그대로 반환
-        else:
-            return float(s)
+    return export_excel(df_dict, sheet_cache)
+
 
-    # 3. 그 외 타입은 0.0 반환
+def bump_result_version(name):
+    """결과(name)가 새로 만들어질 때 호출합니다. 이전 버전으로 저장한 파일은 더 이상 재사용하지 않습니다."""
+    versions = st.session_state.result_versions
+    versions[name] = versions.get(name, 0) + 1
+
+
+def upload_key(file):
+    """
+    업로드 파일의 캐시 키 (파일명, 크기, SHA-1)를 반환합니다.
+    해시는 업로드(file_id)당 한 번만 계산해 세션 상태에 보관합니다.
+    """
+    if file is None:
+        return None
+    memo = st.session_state.setdefault("upload_keys", {})
+    file_id = getattr(file, "file_id", None)
+    key = memo.get(file_id)
+    if key is None:
+        key = (file.name, file.size, file_digest(file))
+        if file_id is not None:
+            memo[file_id] = key
     else:
-        return 0.0
+        remember_digest(file, key[2])
+    return key
+
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def get_coa_model(coa_key, _coa_file):
+    """CoA 업로드(upload_key)당 한 번 CoAModel을 만들어 모든 단계에서 공유합니다."""
+    sheet_names = workbook_registry.sheet_names(_coa_file)
+    coa_df = workbook_registry.read_sheet(_coa_file, "CoA", normalize=True, dtype=str)
+    cf_coa_df = None
+    if "CF" in sheet_names:
+        cf_coa_df = workbook_registry.read_sheet(
+            _coa_file, "CF", normalize=True, dtype=str
+        )
+    aje_code = None
+    if "AJE" in sheet_names:
+        aje_code = workbook_registry.read_sheet(
+            _coa_file, "AJE", normalize=True, dtype=str
+        )
+    return CoAModel(coa_df, cf_coa_df, aje_code)
+
+
+def load_coa_model(coa_file):
+    """업로드된 CoA 파일의 (캐시된) CoAModel을 반환합니다."""
+    return get_coa_model(upload_key(coa_file), coa_file)
+
+
+@st.cache_resource(max_entries=8, show_spinner=False)
+def get_adjustment_ledger(adj_key, _adj_file):
+    """조정명세 파일(upload_key)당 한 번 모든 시트를 읽어 통합 원장을 만듭니다."""
+    return AdjustmentLedger(
+        workbook_registry.read_workbook(_adj_file, normalize=True, dtype={"계정코드": str})
+    )
+
+
+def load_adjustment_ledger(adj_file):
+    """업로드된 조정명세 파일의 (캐시된) AdjustmentLedger를 반환합니다."""
+    return get_adjustment_ledger(upload_key(adj_file), adj_file)
+
 
 def log_validation(message):
     """검증 결과를 세션 상태에 기록합니다."""
@@ -286,7 +549,7 @@ def _find_col(df, candidates):
 
 
 def read_rates_and_table(xlsx_path):
-    all_df = pd.read_excel(xlsx_path, header=0)
+    all_df = workbook_registry.read_sheet(xlsx_path, 0, header=0)
     closing_rate = _first_numeric_in_row(all_df.iloc[0])
     average_rate = _first_numeric_in_row(all_df.iloc[1])
     if closing_rate is None or average_rate is None:
@@ -438,6 +701,80 @@ with st.sidebar:
     st.session_state.files["adjustment"] = st.file_uploader(
         "4. 연결 조정 분개 (CAJE 업로드)", type="xlsx", key="adj_uploader"
     )
+    with st.expander("⚙️ 고급 설정"):
+        workbook_registry = get_workbook_registry(
+            st.selectbox(
+                "엑셀 읽기 엔진",
+                available_excel_engines(),
+                help="calamine(기본)은 openpyxl보다 빠르게 엑셀을 읽습니다.",
+                key="excel_engine",
+            )
+        )
+        ingest_workers = st.number_input(
+            "엑셀 병렬 처리 프로세스 수 (1 = 순차 처리)",
+            min_value=1,
+            max_value=max(1, os.cpu_count() or 1),
+            value=default_ingest_workers(),
+            help="자회사 파일이 많을 때 여러 프로세스에서 동시에 엑셀을 읽고, 마감 패키지의 워크북을 동시에 만듭니다.",
+            key="ingest_workers",
+        )
+        parsed_fs_cache = get_parsed_fs_cache(
+            st.checkbox(
+                "파싱 결과 디스크 캐시 사용",
+                value=True,
+                help="변경되지 않은 재무제표 파일은 다음 실행부터 엑셀을 다시 읽지 않습니다.",
+                key="use_fs_cache",
+            )
+        )
+        sheet_cache = get_sheet_cache(
+            st.checkbox(
+                "엑셀 시트 캐시 사용",
+                value=True,
+                help="결과를 엑셀로 저장할 때 이전과 내용이 같은 시트는 다시 만들지 않고 재사용합니다.",
+                key="use_sheet_cache",
+            )
+        )
+        st.selectbox(
+            "결과 저장 형식",
+            ["xlsx", "parquet", "arrow", "csv"],
+            format_func={
+                "xlsx": "Excel (서식 포함)",
+                "parquet": "Parquet",
+                "arrow": "Arrow IPC",
+                "csv": "CSV",
+            }.get,
+            help="Parquet/Arrow IPC/CSV는 서식 없이 시트별 파일로 저장합니다. (BI·웨어하우스 적재용)",
+            key="result_format",
+        )
+        period_store = get_period_store(
+            st.checkbox(
+                "기간 저장소(SQLite) 사용",
+                value=False,
+                help="최종 조정명세와 연결 결과를 보고 기간별로 로컬 DB에 저장해 두고, 다음 기간의 차기이월 등에서 엑셀을 다시 읽지 않고 사용합니다.",
+                key="use_period_store",
+            )
+        )
+        if period_store.enabled:
+            st.text_input(
+                "보고 기간",
+                placeholder="예: 2025-12",
+                help="이 기간으로 결과를 저장합니다. 같은 기간을 다시 저장하면 기존 내용을 교체합니다.",
+                key="report_period",
+            )
+            st.selectbox(
+                "전기 비교 기간",
+                [""] + [p for p in period_store.periods() if p != report_period()],
+                format_func=lambda p: p or "사용 안 함",
+                help="선택한 기간에 저장된 연결금액을 연결 결과의 비교 열로 붙이고, 자본변동표 기초 잔액을 검증합니다.",
+                key="comparative_period",
+            )
+            store_error = period_store.schema_error()
+            if store_error:
+                st.error(store_error)
+        if st.button("디스크 캐시 비우기", key="clear_fs_cache"):
+            parsed_fs_cache.clear()
+            sheet_cache.clear()
+            st.success("디스크 캐시를 비웠습니다.")
     st.divider()
     
     # ★ 여기서 VERSION 변수를 사용!
@@ -459,8 +796,16 @@ with tab1:
         "CoA, 모회사, 자회사 재무제표와 연결 조정 데이터를 통합하여 연결 재무상태표, 손익계산서, 현금흐름표, 자본변동표를 생성합니다."
     )
 
-    def generate_sce_df(coa_df, parent_ce_df, subs_ce_dfs, parent_name, subs_names, adjustment_file, merged_bspl_df):
-        """사용자 정의 양식의 CE 시트를 파싱하여 연결 자본변동표(SCE)를 생성합니다."""
+    def generate_sce_df(coa, entity_ce_files, caje_bspl_df, merged_bspl_df, prior_period=None):
+        """
+        사용자 정의 양식의 CE 시트를 파싱하여 연결 자본변동표(SCE)를 생성합니다.
+        entity_ce_files: [(회사명, 재무제표 파일)] (CE 파싱은 파일별로 캐시)
+        caje_bspl_df: load_and_clean_data가 읽은 CAJE_BSPL에 CoA의 FS_Element/L3_code를 붙인 표
+        (조정분개 파일을 다시 읽지 않음)
+        prior_period: 기간 저장소의 비교 기간 (선택). 그 기간 연결 BS의 자본 레벨(L3) 금액을
+        검증 행으로 붙이고 기초 잔액과 다르면 경고합니다.
+        """
+        coa_df = coa.coa_df
         # 1. CoA 기반 동적 컬럼 정의
         e_element_df = coa_df[coa_df['FS_Element'] == 'E'].dropna(axis=1).copy()
         if e_element_df.shape[1] < 4:
@@ -471,10 +816,8 @@ with tab1:
         equity_groups = e_element_df[[level_code_col, level_name_col]].dropna().drop_duplicates().sort_values(by=level_code_col)
         l3_codes_map = pd.Series(equity_groups[level_name_col].values, index=equity_groups[level_code_col]).to_dict()
 
-        nci_equity_row = coa_df[coa_df["FS_Element"] == "CE"]
-        if not nci_equity_row.empty:
-            nci_code = nci_equity_row.iloc[0]["계정코드"]
-            nci_name = nci_equity_row.iloc[0]["계정명"]
+        if coa.nci_equity is not None:
+            nci_code, nci_name = coa.nci_equity
             l3_codes_map[nci_code] = nci_name
         else:
             log_validation("⚠️ [자본변동표] CoA에서 비지배지분(CE) 계정을 찾을 수 없습니다.")
@@ -482,32 +825,17 @@ with tab1:
         sce_cols = list(l3_codes_map.values())
         col_to_l3_map = {v: k for k, v in l3_codes_map.items()}
 
-        # 2. 입력된 CE 시트 파싱 (위치 기반으로 수정)
+        # 2. 입력된 CE 시트 파싱 (위치 기반, 파일별 캐시)
         all_parsed_dfs = []
-        all_input_dfs = [(parent_name, parent_ce_df)] + list(zip(subs_names, subs_ce_dfs))
-
-        for name, df in all_input_dfs:
-            if df.empty:
-                continue
+        for name, file in entity_ce_files:
             try:
-                code_row_index = df[df.iloc[:, 2] == '계정코드'].index[0]
-                codes = df.iloc[code_row_index, 3:].astype(str).str.strip().tolist()
-                data_start_row = code_row_index + 1
-                
-                data_df = df.iloc[data_start_row:].copy()
-                
-                num_desc_cols = 3
-                num_data_cols = len(codes)
-                data_df = data_df.iloc[:, :(num_desc_cols + num_data_cols)]
-
-                # 위치를 기준으로 컬럼 이름을 명시적으로 지정
-                desc_names = ['_col_company', '구분', '계정코드'] 
-                data_df.columns = desc_names + codes
-                data_df['회사명'] = name
-                all_parsed_dfs.append(data_df)
+                block = load_entity_ce(file)
             except (IndexError, KeyError) as e:
                 log_validation(f"⚠️ [자본변동표] {name}의 CE 시트 양식을 파싱할 수 없습니다: {e}")
                 continue
+            if block is None:
+                continue
+            all_parsed_dfs.append(block.frame().assign(회사명=name))
 
         if not all_parsed_dfs:
             log_validation("⚠️ [자본변동표] 유효한 CE 시트 데이터를 찾을 수 없습니다.")
@@ -526,30 +854,17 @@ with tab1:
         # 3. 기초자본 계산
         beginning_simple_sum = combined_ce_df[combined_ce_df['계정코드'] == 'Beginning'][sce_cols].sum()
 
-        adj_xls = pd.ExcelFile(adjustment_file)
-
-        if "CAJE_BSPL" in adj_xls.sheet_names:
-            full_adj_df = pd.read_excel(adj_xls, "CAJE_BSPL", dtype={'계정코드': str})
-        else:
-            full_adj_df = pd.DataFrame()
-
+        full_adj_df = caje_bspl_df
         beginning_adjustments = pd.Series(dtype='float64')
         if not full_adj_df.empty:
             full_adj_df = full_adj_df.dropna(subset=['계정코드'])
 
             if not full_adj_df.empty:
-                full_adj_df['계정코드'] = full_adj_df['계정코드'].astype(str).str.strip().str.split('.').str[0]
-                if 'FS_Element' in full_adj_df.columns:
-                    full_adj_df = full_adj_df.drop(columns=['FS_Element'])
-                full_adj_df = full_adj_df.merge(coa_df[['계정코드', 'FS_Element', 'L3_code']], on='계정코드', how='left')
-
                 # FIX: L3_code가 없는 자본/비지배지분 항목은 계정코드를 L3_code로 사용
                 is_equity_like = full_adj_df['FS_Element'].isin(['E', 'CE'])
                 is_l3_missing = full_adj_df['L3_code'].isna()
                 full_adj_df.loc[is_equity_like & is_l3_missing, 'L3_code'] = full_adj_df.loc[is_equity_like & is_l3_missing, '계정코드']
 
-                full_adj_df['금액'] = pd.to_numeric(full_adj_df['금액'], errors='coerce').fillna(0)
-
                 beg_adj_df = full_adj_df[full_adj_df['당기전기'] != '당기'].copy()
                 beg_equity_adjs = beg_adj_df[beg_adj_df['FS_Element'].isin(['E', 'CE'])].copy()
 
@@ -623,9 +938,8 @@ with tab1:
         final_sce = pd.concat([final_sce, ending_row_df], ignore_index=True)
 
         # 6. 검증 행 추가
-        l3_map = dict(zip(coa_df['계정코드'], coa_df['L3_code']))
         if 'L3_code' not in merged_bspl_df.columns:
-             merged_bspl_df['L3_code'] = merged_bspl_df['계정코드'].map(l3_map)
+             merged_bspl_df['L3_code'] = merged_bspl_df['계정코드'].map(coa.l3_map)
 
         is_ce = merged_bspl_df['FS_Element'] == 'CE'
         is_l3_missing = merged_bspl_df['L3_code'].isna()
@@ -642,9 +956,28 @@ with tab1:
         verification_row_data['계정코드'] = 'Verification'
         verification_row_df = pd.DataFrame([verification_row_data])
         final_sce = pd.concat([final_sce, verification_row_df], ignore_index=True)
+
+        # 7. 전기 연결 BS 대비 기초 잔액 검증 (기간 저장소, (기간, 연결금액, 계정코드) 인덱스 조회)
+        if prior_period:
+            prior_bs = period_store.comparative(prior_period, result="BS")
+            if prior_bs.empty:
+                log_validation(f"⚠️ [자본변동표] 기간 저장소에 {prior_period} 연결 재무상태표가 없습니다.")
+            else:
+                prior_row = {col: prior_bs.get(code, 0) for col, code in col_to_l3_map.items()}
+                differences = [
+                    col for col in sce_cols if abs(beginning_row[col] - prior_row[col]) > 1
+                ]
+                if differences:
+                    log_validation(
+                        f"⚠️ [자본변동표] 기초 잔액이 {prior_period} 연결 재무상태표와 다릅니다: {', '.join(differences)}"
+                    )
+                else:
+                    log_validation(f"✅ [자본변동표] 기초 잔액이 {prior_period} 연결 재무상태표와 일치합니다.")
+                prior_row.update({'구분': f'검증(전기 연결BS {prior_period})', '계정코드': 'PriorVerification'})
+                final_sce = pd.concat([final_sce, pd.DataFrame([prior_row])], ignore_index=True)
         
         # 계정코드로 정렬. '기초', '기말', '검증' 행의 순서는 유지.
-        is_special = final_sce['계정코드'].isin(['Beginning', 'Ending', 'Verification'])
+        is_special = final_sce['계정코드'].isin(['Beginning', 'Ending', 'Verification', 'PriorVerification'])
         data_rows = final_sce[~is_special].sort_values(by='계정코드')
         
         final_sce = pd.concat([
@@ -652,10 +985,130 @@ with tab1:
             data_rows,
             final_sce[final_sce['계정코드'] == 'Ending'],
             final_sce[final_sce['계정코드'] == 'Verification'],
+            final_sce[final_sce['계정코드'] == 'PriorVerification'],
         ], ignore_index=True)
         
         return final_sce
 
+    @st.cache_data(max_entries=8, ttl=60 * 60, show_spinner=False)
+    def load_and_clean_data(
+        file_keys, parent_name, subs_names, engine,
+        _parent_file, _subs_files, _adj_file, _ingest_workers=1,
+    ):
+        """
+        모회사/자회사/조정분개 파일을 읽어 정제합니다. (CoA는 load_coa_model 사용)
+        캐시 키는 file_keys(업로드 파일별 upload_key), 회사명, 엑셀 읽기 엔진만 사용하고,
+        밑줄(_)로 시작하는 파일 객체 인자는 해시하지 않습니다.
+        """
+        parent_file, subs_files, adj_file = _parent_file, _subs_files, _adj_file
+
+        def read_fs_sheets(file, file_name=""):
+            try:
+                digest = file_digest(file)
+                cached = parsed_fs_cache.load(
+                    digest, ("BSPL", "CF"), engine
+                )
+                if cached is not None:
+                    return cached["BSPL"], cached["CF"]
+
+                # 계정코드/CF_code 정규화와 금액 숫자 변환은 적재 스키마에서 처리
+                bspl_df = workbook_registry.read_sheet(
+                    file,
+                    "BSPL",
+                    optional=True,
+                    normalize=True,
+                    drop_blank_rows=True,
+                    dtype={"계정코드": str},
+                )
+                cf_df = workbook_registry.read_sheet(
+                    file,
+                    "CF",
+                    optional=True,
+                    normalize=True,
+                    drop_blank_rows=True,
+                    dtype={"계정코드": str, "CF_code": str},
+                )
+                if "CF_code" not in cf_df.columns and "계정코드" in cf_df.columns:
+                    cf_df = cf_df.rename(columns={"계정코드": "CF_code"})
+
+                # 다음 실행부터 엑셀 파싱을 건너뛰도록 정제 결과를 디스크에 저장
+                parsed_fs_cache.store(
+                    digest,
+                    {
+                        "BSPL": bspl_df,
+                        "CF": cf_df,
+                        "CE": workbook_registry.read_sheet(
+                            file, "CE", optional=True, header=None
+                        ),
+                    },
+                    engine,
+                )
+                return bspl_df, cf_df
+            except Exception as e:
+                st.error(f"'{file_name}' 파일 처리 중 오류: {e}")
+                return pd.DataFrame(), pd.DataFrame()
+
+        # 디스크 캐시에 없는 모회사/자회사 파일만 병렬로 미리 파싱 (설정된 경우)
+        workbook_registry.prefetch(
+            [
+                f
+                for f in [parent_file] + list(subs_files)
+                if not parsed_fs_cache.has(file_digest(f), engine)
+            ],
+            max_workers=_ingest_workers,
+        )
+
+        parent_bspl_df, parent_cf_df = read_fs_sheets(
+            parent_file, parent_name
+        )
+        parent_bspl_df = parent_bspl_df.rename(
+            columns={"금액": parent_name}
+        )
+        parent_cf_df = parent_cf_df.rename(columns={"금액": parent_name})
+
+        subs_bspl_dfs, subs_cf_dfs = [], []
+        for f, sub_name in zip(subs_files, subs_names):
+            bspl, cf = read_fs_sheets(f, sub_name)
+            subs_bspl_dfs.append(bspl.rename(columns={"금액": sub_name}))
+            subs_cf_dfs.append(cf.rename(columns={"금액": sub_name}))
+
+        caje_bspl_df, caje_cf_df = pd.DataFrame(), pd.DataFrame()
+        if adj_file:
+            try:
+                adj_sheet_names = workbook_registry.sheet_names(adj_file)
+                if "CAJE_BSPL" in adj_sheet_names:
+                    caje_bspl_df = workbook_registry.read_sheet(
+                        adj_file,
+                        "CAJE_BSPL",
+                        normalize=True,
+                        drop_blank_rows=True,
+                        dtype={"계정코드": str},
+                    )
+
+                if "CAJE_CF" in adj_sheet_names:
+                    caje_cf_df = workbook_registry.read_sheet(
+                        adj_file,
+                        "CAJE_CF",
+                        normalize=True,
+                        drop_blank_rows=True,
+                        dtype={"계정코드": str},
+                    )
+
+            except Exception as e:
+                log_validation(
+                    f"🚨 오류: 조정분개 파일({adj_file.name}) 처리 중 오류 발생: {e}"
+                )
+
+        return (
+            parent_bspl_df,
+            parent_cf_df,
+            subs_bspl_dfs,
+            subs_cf_dfs,
+            caje_bspl_df,
+            caje_cf_df,
+        )
+
+
     if st.button(
         "🚀 연결 재무제표 생성 실행",
         key="run_consolidation",
@@ -670,6 +1123,7 @@ with tab1:
             st.session_state.results["consolidation_wp_pl"] = None
             st.session_state.results["consolidation_wp_cf"] = None
             st.session_state.results["consolidation_wp_sce"] = None
+            bump_result_version("consolidation")
 
 
             # 파일명에서 회사 이름 추출
@@ -682,165 +1136,36 @@ with tab1:
                 # ----------------------------------------------------------------
                 # 1. 데이터 준비 (파일 읽기 및 전처리)
                 # ----------------------------------------------------------------
-                @st.cache_data
-                def load_and_clean_data(
-                    coa_file, parent_file, parent_name, subs_files, subs_names, adj_file
-                ):
-                    def clean_df(df, key_col="계정코드"):
-                        if key_col in df.columns:
-                            df[key_col] = (
-                                df[key_col]
-                                .astype(str)
-                                .str.strip()
-                                .str.split(".")
-                                .str[0]
-                            )
-                            df = df.dropna(subset=[key_col])
-                        return df
-
-                    def read_fs_sheets(file, file_name=""):
-                        try:
-                            file.seek(0)
-                            xls = pd.ExcelFile(file)
-                            bspl_df = (
-                                pd.read_excel(
-                                    xls, sheet_name="BSPL", dtype={"계정코드": str}
-                                )
-                                if "BSPL" in xls.sheet_names
-                                else pd.DataFrame()
-                            )
-                            cf_df = (
-                                pd.read_excel(
-                                    xls,
-                                    sheet_name="CF",
-                                    dtype={"계정코드": str, "CF_code": str},
-                                )
-                                if "CF" in xls.sheet_names
-                                else pd.DataFrame()
-                            )
-
-                            bspl_df = clean_df(bspl_df, "계정코드")
-                            if "CF_code" in cf_df.columns:
-                                cf_df = clean_df(cf_df, "CF_code")
-                            elif "계정코드" in cf_df.columns:
-                                cf_df = clean_df(cf_df, "계정코드").rename(
-                                    columns={"계정코드": "CF_code"}
-                                )
-
-                            for df in [bspl_df, cf_df]:
-                                if "금액" in df.columns:
-                                    df["금액"] = pd.to_numeric(
-                                        df["금액"], errors="coerce"
-                                    ).fillna(0)
-
-                            return bspl_df, cf_df
-                        except Exception as e:
-                            st.error(f"'{file_name}' 파일 처리 중 오류: {e}")
-                            return pd.DataFrame(), pd.DataFrame()
-                    
-                    coa_file.seek(0)
-                    coa_df = clean_df(
-                        pd.read_excel(coa_file, sheet_name="CoA", dtype=str), "계정코드"
-                    )
-                    xls_coa = pd.ExcelFile(coa_file)
-                    cf_coa_df = pd.DataFrame()
-                    if "CF" in xls_coa.sheet_names:
-                        cf_coa_df = pd.read_excel(xls_coa, sheet_name="CF", dtype=str)
-                        if "CF_code" in cf_coa_df.columns:
-                            cf_coa_df = clean_df(cf_coa_df, "CF_code")
-                    else:
-                        log_validation(
-                            "경고: CoA 파일에 'CF' 시트가 없습니다. 현금흐름표 집계가 제한될 수 있습니다."
-                        )
-
-                    aje_code = pd.read_excel(coa_file, sheet_name="AJE", dtype=str)
-
-                    parent_bspl_df, parent_cf_df = read_fs_sheets(
-                        parent_file, parent_name
-                    )
-                    parent_bspl_df = parent_bspl_df.rename(
-                        columns={"금액": parent_name}
-                    )
-                    parent_cf_df = parent_cf_df.rename(columns={"금액": parent_name})
-
-                    subs_bspl_dfs, subs_cf_dfs = [], []
-                    for f, sub_name in zip(subs_files, subs_names):
-                        bspl, cf = read_fs_sheets(f, sub_name)
-                        subs_bspl_dfs.append(bspl.rename(columns={"금액": sub_name}))
-                        subs_cf_dfs.append(cf.rename(columns={"금액": sub_name}))
-
-                    caje_bspl_df, caje_cf_df, re_code = (
-                        pd.DataFrame(),
-                        pd.DataFrame(),
-                        None,
-                    )
-                    if adj_file:
-                        try:
-                            adj_file.seek(0)
-                            xls_adj = pd.ExcelFile(adj_file)
-                            if "CAJE_BSPL" in xls_adj.sheet_names:
-                                caje_bspl_df = pd.read_excel(
-                                    xls_adj,
-                                    sheet_name="CAJE_BSPL",
-                                    dtype={"계정코드": str},
-                                )
-                                caje_bspl_df = clean_df(caje_bspl_df, "계정코드")
-                                if "금액" in caje_bspl_df.columns:
-                                    caje_bspl_df["금액"] = pd.to_numeric(
-                                        caje_bspl_df["금액"], errors="coerce"
-                                    ).fillna(0)
-
-                            if "CAJE_CF" in xls_adj.sheet_names:
-                                caje_cf_df = pd.read_excel(
-                                    xls_adj,
-                                    sheet_name="CAJE_CF",
-                                    dtype={"계정코드": str},
-                                )
-                                caje_cf_df = clean_df(caje_cf_df, "계정코드")
-                                if "조정금액" in caje_cf_df.columns:
-                                    caje_cf_df["조정금액"] = pd.to_numeric(
-                                        caje_cf_df["조정금액"], errors="coerce"
-                                    ).fillna(0)
-
-
-
-
-                        except Exception as e:
-                            log_validation(
-                                f"🚨 오류: 조정분개 파일({adj_file.name}) 처리 중 오류 발생: {e}"
-                            )
-
-                    return (
-                        coa_df,
-                        cf_coa_df,
-                        parent_bspl_df,
-                        parent_cf_df,
-                        subs_bspl_dfs,
-                        subs_cf_dfs,
-                        caje_bspl_df,
-                        caje_cf_df,
-                        re_code,
-                        aje_code,
+                coa = load_coa_model(st.session_state.files["coa"])
+                coa_df, cf_coa_df = coa.coa_df, coa.cf_coa_df
+                if not coa.has_cf:
+                    log_validation(
+                        "경고: CoA 파일에 'CF' 시트가 없습니다. 현금흐름표 집계가 제한될 수 있습니다."
                     )
 
                 (
-                    coa_df,
-                    cf_coa_df,
                     parent_bspl_df,
                     parent_cf_df,
                     subs_bspl_dfs,
                     subs_cf_dfs,
                     caje_bspl_df,
                     caje_cf_df_from_file,
-                    re_code,
-                    aje_code
                 ) = load_and_clean_data(
-                    st.session_state.files["coa"],
-                    st.session_state.files["parent"],
+                    (
+                        upload_key(st.session_state.files["parent"]),
+                        tuple(
+                            upload_key(f)
+                            for f in st.session_state.files["subsidiaries"]
+                        ),
+                        upload_key(st.session_state.files["adjustment"]),
+                    ),
                     parent_name,
-                    st.session_state.files["subsidiaries"],
                     tuple(subs_names),  # 리스트는 해시 불가능하므로 튜플로 변환
+                    workbook_registry.engine,
+                    st.session_state.files["parent"],
+                    st.session_state.files["subsidiaries"],
                     st.session_state.files["adjustment"],
+                    ingest_workers,
                 )
 
                 # ----------------------------------------------------------------
@@ -854,42 +1179,21 @@ with tab1:
                                 f"⚠️ **[{name}]** 중복 계정코드 발견: {', '.join(dups.index)}"
                             )
 
-                def check_missing_in_coa(df, coa_codes, name):
-                    if "계정코드" in df.columns:
-                        missing = set(df["계정코드"]) - coa_codes
-                        if missing:
-                            log_validation(
-                                f"🚨 **[{name}]** CoA에 없는 계정코드 발견: {', '.join(sorted(list(missing)))}"
-                            )
-
-                def check_balance_sheet_equation(df, coa_df, column_name):
-                    """재무상태표 차대 검증 (자산 = 부채 + 자본)"""
-                    if "계정코드" in df.columns and column_name in df.columns:
-                        if "FS_Element" in df.columns:
-                            merged = df
-                        elif "FS_Element" in coa_df.columns:
-                            merged = df.merge(
-                                coa_df[["계정코드", "FS_Element"]],
-                                on="계정코드",
-                                how="left",
-                            )
-                        else:
-                            return  # Cannot perform check
-
-                        total_assets = pd.to_numeric(
-                            merged[merged["FS_Element"].isin(["A", "CA"])][column_name],
-                            errors="coerce",
-                        ).sum()
-                        total_liabilities = pd.to_numeric(
-                            merged[merged["FS_Element"] == "L"][column_name],
-                            errors="coerce",
-                        ).sum()
-                        total_equity = pd.to_numeric(
-                            merged[merged["FS_Element"].isin(["E", "CE"])][column_name],
-                            errors="coerce",
-                        ).sum()
-                        difference = total_assets - (total_liabilities + total_equity)
+                def log_missing_in_coa(missing, name):
+                    if missing:
+                        log_validation(
+                            f"🚨 **[{name}]** CoA에 없는 계정코드 발견: {', '.join(missing)}"
+                        )
 
+                def check_balance_sheet_equation(df, column_names):
+                    """재무상태표 차대 검증 (자산 = 부채 + 자본), 여러 열을 한 번에 계산"""
+                    column_names = [c for c in column_names if c in df.columns]
+                    if "FS_Element" not in df.columns or not column_names:
+                        return  # Cannot perform check
+                    differences = balance_differences(
+                        df["FS_Element"], df[column_names].to_numpy()
+                    )
+                    for column_name, difference in zip(column_names, differences):
                         if abs(difference) > 1:  # 사소한 반올림 오류는 무시
                             log_validation(
                                 f"❌ **[{column_name}]** 재무상태표 차대 불일치: {difference:,.0f}"
@@ -903,52 +1207,40 @@ with tab1:
                 for name, df in zip(subs_names, subs_bspl_dfs):
                     check_duplicates(df, name)
 
-                coa_codes = set(coa_df["계정코드"])
-                check_missing_in_coa(parent_bspl_df, coa_codes, parent_name)
-                for name, df in zip(subs_names, subs_bspl_dfs):
-                    check_missing_in_coa(df, coa_codes, name)
-
                 # ----------------------------------------------------------------
                 # 3. BS/PL 데이터 통합 및 계산
                 # ----------------------------------------------------------------
-                merged_bspl_df = coa_df.merge(parent_bspl_df[["계정코드", parent_name]], on="계정코드", how="left", sort=False)
-                for name, df in zip(subs_names, subs_bspl_dfs):
-                    merged_bspl_df = merged_bspl_df.merge(df[["계정코드", name]], on="계정코드", how="left", sort=False)
-
-                bspl_val_cols = [parent_name] + subs_names
-                merged_bspl_df[bspl_val_cols] = merged_bspl_df[bspl_val_cols].fillna(0)
-                merged_bspl_df["단순합계"] = merged_bspl_df[bspl_val_cols].sum(axis=1)
-
-                check_balance_sheet_equation(merged_bspl_df, coa_df, parent_name)
-                for name in subs_names:
-                    check_balance_sheet_equation(merged_bspl_df, coa_df, name)
-                check_balance_sheet_equation(merged_bspl_df, coa_df, "단순합계")
+                # 모든 회사 금액을 CoA 순서의 계정 × 회사 행렬 하나로 집계
+                # (계정코드는 정수 위치로 변환, CoA에 없는 코드는 같은 단계에서 보고)
+                entity_names = [parent_name] + subs_names
+                bspl_index = coa.account_index
+                bspl_matrix, bspl_missing = entity_matrix(
+                    bspl_index,
+                    [
+                        (df["계정코드"], df[name])
+                        if "계정코드" in df.columns and name in df.columns
+                        else None
+                        for name, df in zip(entity_names, [parent_bspl_df] + subs_bspl_dfs)
+                    ],
+                )
+                for name, missing in zip(entity_names, bspl_missing):
+                    log_missing_in_coa(missing, name)
 
+                bspl_adjustments = None
                 if not caje_bspl_df.empty and "계정코드" in caje_bspl_df.columns:
-                    adj_bspl_grouped = caje_bspl_df.groupby("계정코드")["금액"].sum().reset_index()
-                    adj_with_fs = adj_bspl_grouped.merge(coa_df[["계정코드", "FS_Element"]], on="계정코드", how="left")
-                    is_ler = adj_with_fs["FS_Element"].isin(["L", "E", "R", "CE", "CR"])
-                    adj_with_fs.loc[is_ler, "금액"] *= -1
-                    merged_bspl_df = merged_bspl_df.merge(adj_with_fs[["계정코드", "금액"]].rename(columns={"금액": "연결조정"}), on="계정코드", how="left", sort=False)
-                    merged_bspl_df["연결조정"] = merged_bspl_df["연결조정"].fillna(0)
-                else:
-                    merged_bspl_df["연결조정"] = 0
+                    adj_sums, _ = bspl_index.aggregate(caje_bspl_df["계정코드"], caje_bspl_df["금액"])
+                    adj_rows = bspl_index.to_rows(adj_sums)
+                    bspl_adjustments = coa.adjustment_sign * adj_rows
 
-                
-                nci_equity_row = coa_df[coa_df["FS_Element"] == "CE"]
-                if not nci_equity_row.empty:
-                    nci_code = nci_equity_row.iloc[0]["계정코드"]
-                    nci_name = nci_equity_row.iloc[0]["계정명"]
-                
-                nci_pl_row = coa_df[coa_df["FS_Element"] == "CR"]
-                if not nci_pl_row.empty:
-                    NCI_PL_CODE = nci_pl_row.iloc[0]["계정코드"]
-                    NCI_PL_NAME = nci_pl_row.iloc[0]["계정명"]
+                merged_bspl_df = consolidation_frame(
+                    coa_df, bspl_index, entity_names, bspl_matrix, bspl_adjustments
+                )
+                check_balance_sheet_equation(merged_bspl_df, entity_names + ["단순합계"])
 
                 nci_pl_sum = merged_bspl_df.loc[merged_bspl_df["FS_Element"] == "CR", "연결조정"].sum()
 
-                if not nci_pl_row.empty and not nci_equity_row.empty:
-                    nci_equity_code = nci_equity_row.iloc[0]['계정코드']
+                if coa.nci_pl is not None and coa.nci_equity is not None:
+                    nci_equity_code = coa.nci_equity[0]
                     if (merged_bspl_df['계정코드'] == nci_equity_code).any():
                         merged_bspl_df.loc[merged_bspl_df['계정코드'] == nci_equity_code, '연결조정'] += nci_pl_sum
                 
@@ -956,203 +1248,73 @@ with tab1:
                 x_adj_sum = merged_bspl_df.loc[merged_bspl_df["FS_Element"] == "X", "연결조정"].sum()
                 pl_adj_sum = r_adj_sum - x_adj_sum
 
-                aje_code = pd.read_excel(
-                    st.session_state.files["coa"], sheet_name="AJE", dtype=str
-                )
-                re_code = aje_code.loc[aje_code["FS_Element"] == "E", "계정코드"].iloc[0]
+                re_code, _ = coa.aje_account("E")
                 merged_bspl_df.loc[merged_bspl_df["계정코드"] == re_code, "연결조정"] += pl_adj_sum
                         
                 merged_bspl_df["연결금액"] = merged_bspl_df["단순합계"] + merged_bspl_df["연결조정"]
                 log_validation("--- 연결금액 기준 차대 검증 ---")
-                check_balance_sheet_equation(merged_bspl_df, coa_df, "연결금액")
+                check_balance_sheet_equation(merged_bspl_df, ["연결금액"])
 
                 # ----------------------------------------------------------------
                 # 4. CF 데이터 통합 및 계산
                 # ----------------------------------------------------------------
                 CF_KEY = "CF_code"
                 merged_cf_df = pd.DataFrame()
-                if not cf_coa_df.empty and CF_KEY in cf_coa_df.columns:
-                    merged_cf_df = cf_coa_df.merge(parent_cf_df[[CF_KEY, parent_name]], on=CF_KEY, how="left", sort=False)
-                    for name, df in zip(subs_names, subs_cf_dfs):
-                        if CF_KEY in df.columns:
-                            merged_cf_df = merged_cf_df.merge(df[[CF_KEY, name]], on=CF_KEY, how="left", sort=False)
-                    
-                    cf_val_cols = [parent_name] + subs_names
-                    merged_cf_df[cf_val_cols] = merged_cf_df[cf_val_cols].fillna(0)
-                    merged_cf_df["단순합계"] = merged_cf_df[cf_val_cols].sum(axis=1)
+                if coa.has_cf:
+                    cf_index = coa.cf_index
+                    cf_matrix, _ = entity_matrix(
+                        cf_index,
+                        [
+                            (df[CF_KEY], df[name])
+                            if CF_KEY in df.columns and name in df.columns
+                            else None
+                            for name, df in zip(entity_names, [parent_cf_df] + subs_cf_dfs)
+                        ],
+                    )
 
+                    cf_adjustments = None
                     if not caje_cf_df_from_file.empty and "계정코드" in caje_cf_df_from_file.columns and "조정금액" in caje_cf_df_from_file.columns:
-                        adj_cf_grouped = caje_cf_df_from_file.groupby("계정코드")["조정금액"].sum().reset_index()
-                        merged_cf_df = merged_cf_df.merge(adj_cf_grouped.rename(columns={"조정금액": "연결조정"}), on="계정코드", how="left")
-                    else:
-                        merged_cf_df["연결조정"] = 0
-                    
-                    merged_cf_df["연결조정"] = merged_cf_df["연결조정"].fillna(0)
-                    merged_cf_df["연결금액"] = merged_cf_df["단순합계"] + merged_cf_df["연결조정"]
+                        # CF 조정은 CF CoA의 계정코드(BSPL 계정) 기준으로 집계
+                        cf_account_index = coa.cf_account_index
+                        adj_sums, _ = cf_account_index.aggregate(
+                            caje_cf_df_from_file["계정코드"], caje_cf_df_from_file["조정금액"]
+                        )
+                        cf_adjustments = cf_account_index.to_rows(adj_sums)
+
+                    merged_cf_df = consolidation_frame(
+                        cf_coa_df, cf_index, entity_names, cf_matrix, cf_adjustments
+                    )
 
                 # ----------------------------------------------------------------
                 # 5. 소계 및 최종 FS 생성
                 # ----------------------------------------------------------------
-                def generate_fs_with_subtotals(
-                    df,
-                    name_cols,
-                    amount_cols,
-                    name_code_map,
-                    desc_col="계정명",
-                    code_col="계정코드",
-                ):
-                    df = df.copy()
-
-                    # Sign 로직 적용
-                    apply_sign_logic = "sign" in df.columns
-                    if apply_sign_logic:
-                        df["sign"] = pd.to_numeric(df["sign"], errors="coerce").fillna(
-                            1
-                        )
-                        for col in amount_cols:
-                            if col in df.columns:
-                                df[col] = df[col] * df["sign"]
-
-                    # 소계 계산을 위한 재귀 함수
-                    def recursive_subtotal(data, current_name_cols, level=0):
-                        if not current_name_cols or data.empty:
-                            return data
-
-                        current_col, remaining_cols = (
-                            current_name_cols[0],
-                            current_name_cols[1:],
-                        )
-                        all_sub_dfs = []
-
-                        # 레벨 정보가 있는 그룹 먼저 처리
-                        for key, group in data.dropna(subset=[current_col]).groupby(
-                            current_col, sort=False
-                        ):
-                            sub_df = recursive_subtotal(
-                                group, remaining_cols, level + 1
-                            )
-
-                            # 합계 행 생성
-                            sum_data = {col: "" for col in data.columns}
-                            sum_data.update(group[amount_cols].sum())
-                            sum_data[desc_col] = f"{'' * level}{key}"  # 들여쓰기
-                            sum_data[code_col] = name_code_map.get(key, "")
-
-                            # FS_Element, sign 등 메타데이터 복사
-                            if not group.empty:
-                                for col in ["FS_Element", "sign"]:
-                                    if col in group.columns:
-                                        sum_data[col] = group.iloc[0][col]
-
-                            sum_row = pd.DataFrame([sum_data])
-                            all_sub_dfs.append(
-                                pd.concat([sub_df, sum_row], ignore_index=True)
-                            )
-
-                        # 레벨 정보가 없는(NaN) 그룹을 나중에 처리하여 아래로 보냄
-                        nan_group = data[data[current_col].isna()]
-                        if not nan_group.empty:
-                            all_sub_dfs.append(
-                                recursive_subtotal(nan_group, remaining_cols, level + 1)
-                            )
-
-                        # all_sub_dfs가 비어있는 경우 에러 방지
-                        if not all_sub_dfs:
-                            return pd.DataFrame(columns=data.columns)
-
-                        return pd.concat(all_sub_dfs, ignore_index=True)
-
-                    final_df = recursive_subtotal(df, name_cols)
-
-                    # Sign 원복
-                    if apply_sign_logic and not final_df.empty:
-                        final_df["sign"] = (
-                            pd.to_numeric(final_df["sign"], errors="coerce")
-                            .fillna(1)
-                            .replace(0, 1)
-                        )
-                        final_df[amount_cols] = final_df[amount_cols].divide(
-                            final_df["sign"], axis=0
-                        )
-
-                    return final_df
-
                 # BS, PL, CF 데이터 분리 및 소계 생성
-                df_bs = merged_bspl_df[
-                    merged_bspl_df["FS_Element"].isin(["A", "L", "E", "CA", "CE"])
-                ].copy()
-                df_bs["sign"] = (
-                    df_bs["FS_Element"]
-                    .map({"A": -1, "CA": -1, "L": 1, "E": 1, "CE": 1})
-                    .fillna(1)
-                )
-
-                df_pl = merged_bspl_df[
-                    merged_bspl_df["FS_Element"].isin(["R", "X", "CR"])
-                ].copy()
-                df_pl["sign"] = df_pl["FS_Element"].map({"R": 1, "X": -1, "CR": 1}).fillna(1)
+                # (FS_Element 구분과 표시 부호는 CoA 모델에 미리 계산된 배열 사용)
+                signed_bspl_df = merged_bspl_df.assign(sign=coa.statement_sign)
+                df_bs = signed_bspl_df[coa.bs_mask].copy()
+                df_pl = signed_bspl_df[coa.pl_mask].copy()
 
                 df_cf = merged_cf_df.copy()
-                if "FS_Element" in df_cf.columns:  # CF의 FS_Element는 부호로 사용
-                    df_cf["sign"] = pd.to_numeric(
-                        df_cf["FS_Element"], errors="coerce"
-                    ).fillna(1)
+                if coa.has_cf:  # CF의 FS_Element는 부호로 사용
+                    df_cf["sign"] = coa.cf_sign
 
                 # 소계 생성을 위한 설정
                 con_amtcols = (
                     [parent_name] + subs_names + ["단순합계", "연결조정", "연결금액"]
                 )
-                bspl_name_cols = [
-                    c
-                    for c in coa_df.columns
-                    if c.startswith("L") and not c.endswith("code")
-                ]
-                cf_name_cols = [
-                    c
-                    for c in cf_coa_df.columns
-                    if c.startswith("L") and not c.endswith("code")
-                ]
 
-                # 이름-코드 매핑 생성
-                bspl_name_code_map = {
-                    row[name]: row[code]
-                    for code, name in zip(
-                        [
-                            c
-                            for c in coa_df.columns
-                            if c.startswith("L") and c.endswith("code")
-                        ],
-                        bspl_name_cols,
-                    )
-                    for _, row in coa_df.iterrows()
-                    if pd.notna(row.get(name))
-                }
-                cf_name_code_map = {
-                    row[name]: row[code]
-                    for code, name in zip(
-                        [
-                            c
-                            for c in cf_coa_df.columns
-                            if c.startswith("L") and c.endswith("code")
-                        ],
-                        cf_name_cols,
-                    )
-                    for _, row in cf_coa_df.iterrows()
-                    if pd.notna(row.get(name))
-                }
-
-                # 최종 FS 생성
-                bs_final = generate_fs_with_subtotals(
-                    df_bs, bspl_name_cols, con_amtcols, bspl_name_code_map
+                # 최종 FS 생성 (레벨 트리와 이름-코드 매핑은 CoA 모델에서 한 번만 계산)
+                bs_final = subtotal_statement(
+                    df_bs, coa.level_tree, con_amtcols, coa.name_code_map
                 )
-                pl_final = generate_fs_with_subtotals(
-                    df_pl, bspl_name_cols, con_amtcols, bspl_name_code_map
+                pl_final = subtotal_statement(
+                    df_pl, coa.level_tree, con_amtcols, coa.name_code_map
                 )
-                cf_final = generate_fs_with_subtotals(
+                cf_final = subtotal_statement(
                     df_cf,
-                    cf_name_cols,
+                    coa.cf_level_tree,
                     con_amtcols,
-                    cf_name_code_map,
+                    coa.cf_name_code_map,
                     desc_col="현금흐름표",
                     code_col="CF_code",
                 )
@@ -1175,35 +1337,6 @@ with tab1:
                     inplace=True,
                 )
 
-                # 소계 행 식별 및 'is_subtotal' 컬럼 추가
-                bspl_name_cols = [
-                    c
-                    for c in coa_df.columns
-                    if c.startswith("L") and not c.endswith("code")
-                ]
-                if bspl_name_cols:
-                    bspl_subtotal_names = set(coa_df[bspl_name_cols].stack().unique())
-                    if not bs_final.empty:
-                        bs_final["is_subtotal"] = bs_final["계정명"].isin(
-                            bspl_subtotal_names
-                        )
-                    if not pl_final.empty:
-                        pl_final["is_subtotal"] = pl_final["계정명"].isin(
-                            bspl_subtotal_names
-                        )
-
-                cf_name_cols = [
-                    c
-                    for c in cf_coa_df.columns
-                    if c.startswith("L") and not c.endswith("code")
-                ]
-                if not cf_coa_df.empty and cf_name_cols:
-                    cf_subtotal_names = set(cf_coa_df[cf_name_cols].stack().unique())
-                    if not cf_final.empty:
-                        cf_final["is_subtotal"] = cf_final["현금흐름표"].isin(
-                            cf_subtotal_names
-                        )
-
                 # 0에 가까운 값 정리 및 정수 변환
                 processed_dfs = []
                 for df in [bs_final, pl_final, cf_final]:
@@ -1252,29 +1385,38 @@ with tab1:
 
                 # CF 두번째 행(당기순이익 부분합) 제거
                 cf_final = cf_final.drop(cf_final.index[1])
+                # 전기 비교 열 (기간 저장소에서 선택한 비교 기간의 연결금액, 저장 대상 금액 열은 아님)
+                if comparative_period():
+                    bs_final, pl_final, cf_final = (
+                        with_comparative(df, comparative_period(), result)
+                        for df, result in ((bs_final, "BS"), (pl_final, "PL"), (cf_final, "CF"))
+                    )
                 # 세션 상태에 결과 저장
                 st.session_state.results["consolidation_wp_bs"] = bs_final
                 st.session_state.results["consolidation_wp_pl"] = pl_final
                 st.session_state.results["consolidation_wp_cf"] = cf_final
+                if report_period() and not period_store.store_results(
+                    report_period(),
+                    {"BS": bs_final, "PL": pl_final, "CF": cf_final},
+                    con_amtcols,
+                ):
+                    log_validation("⚠️ [기간 저장소] 연결 결과를 저장하지 못했습니다.")
 
                 # --- 6. 자본변동표 생성 ---
                 sce_final = pd.DataFrame()
                 try:
-                    parent_file = st.session_state.files["parent"]
-                    parent_file.seek(0)
-                    xls_parent = pd.ExcelFile(parent_file)
-                    parent_ce_df = pd.read_excel(xls_parent, sheet_name="CE", header=None) if "CE" in xls_parent.sheet_names else pd.DataFrame()
-
-                    subs_ce_dfs = []
-                    for f in st.session_state.files["subsidiaries"]:
-                        f.seek(0)
-                        xls_sub = pd.ExcelFile(f)
-                        subs_ce_dfs.append(pd.read_excel(xls_sub, sheet_name="CE", header=None) if "CE" in xls_sub.sheet_names else pd.DataFrame())
-                    
+                    entity_ce_files = [(parent_name, st.session_state.files["parent"])] + list(
+                        zip(subs_names, st.session_state.files["subsidiaries"])
+                    )
+
                     adj_file = st.session_state.files["adjustment"]
                     if adj_file:
-                        adj_file.seek(0)
-                        sce_final = generate_sce_df(coa_df, parent_ce_df, subs_ce_dfs, parent_name, subs_names, adj_file, merged_bspl_df)
+                        sce_caje_df = caje_bspl_df
+                        if "계정코드" in sce_caje_df.columns:
+                            sce_caje_df = coa.with_account_info(sce_caje_df)
+                        sce_final = generate_sce_df(
+                            coa, entity_ce_files, sce_caje_df, merged_bspl_df, comparative_period()
+                        )
                     else:
                         log_validation("⚠️ [자본변동표] 조정분개 파일이 없어 자본변동표를 생성할 수 없습니다.")
 
@@ -1312,14 +1454,12 @@ with tab1:
             st.dataframe(st.session_state.results["consolidation_wp_sce"].style.format(precision=0, thousands=","))
 
         # --- 다운로드 버튼 ---
-        excel_data = to_excel({
-                "Consol_BS": st.session_state.results["consolidation_wp_bs"],
-                "Consol_PL": st.session_state.results["consolidation_wp_pl"],
-                "Consol_CF": st.session_state.results["consolidation_wp_cf"],
-                "Consol_SCE": st.session_state.results.get("consolidation_wp_sce", pd.DataFrame()),
-            })
-        if st.button("📥 전체 결과 저장 (Excel)"):
-            save_excel_native(excel_data, "consolidated_fs_results.xlsx")
+        if st.button("📥 전체 결과 저장"):
+            save_result(
+                "consolidation",
+                lambda: result_sheets("consolidation"),
+                RESULT_FILES["consolidation"],
+            )
         
     elif not (st.session_state.files["coa"] and st.session_state.files["parent"]):
         st.info("사이드바에서 CoA와 모회사 자회사 연결조정분개 파일을 업로드한 후 '생성 실행' 버튼을 눌러주세요.")
@@ -1345,11 +1485,12 @@ with tab2:
         with st.spinner("주석 파일을 취합하고 대사하고 있습니다..."):
             try:
                 st.session_state.results["combined_footnotes"] = {}
-                parent_sheets = pd.read_excel(
-                    footnote_parent_file, sheet_name=None, dtype=str
+                bump_result_version("combined_footnotes")
+                parent_sheets = workbook_registry.read_workbook(
+                    footnote_parent_file, dtype=str
                 )
                 subs_files_data = [
-                    (Path(f.name).stem, pd.read_excel(f, sheet_name=None, dtype=str))
+                    (Path(f.name).stem, workbook_registry.read_workbook(f, dtype=str))
                     for f in footnote_subs_files
                 ]
 
@@ -1460,9 +1601,12 @@ with tab2:
         for sheet_name, df in st.session_state.results["combined_footnotes"].items():
             with st.expander(f"시트: {sheet_name}", expanded=False):
                 st.dataframe(df)
-        footnote_excel_data = to_excel(st.session_state.results["combined_footnotes"])
-        if st.button("📥 취합된 주석 다운로드 (Excel)"):
-            save_excel_native(footnote_excel_data, "combined_footnotes.xlsx")
+        if st.button("📥 취합된 주석 다운로드"):
+            save_result(
+                "combined_footnotes",
+                lambda: result_sheets("combined_footnotes"),
+                RESULT_FILES["combined_footnotes"],
+            )
 
 
 with tab3:
@@ -1908,434 +2052,77 @@ with tab3:
                     dv.add(target_range)
         return output.getvalue()
 
-    def generate_intermediate_adjustments(adj_file, coa_df, subs_files, subs_names, aje_code):
-        adj_file.seek(0)
-        xls = pd.ExcelFile(adj_file)
-        original_sheets = {
-            sheet_name: pd.read_excel(xls, sheet_name, dtype={"계정코드": str}) for sheet_name in xls.sheet_names
-        }
+    def generate_intermediate_adjustments(adj_file, coa, subs_files, subs_names):
+        ledger = load_adjustment_ledger(adj_file)
+        original_sheets = ledger.workbook()
 
-        if "Info" not in original_sheets:
+        if ledger.info is None:
             st.error("'Info' 시트가 조정분개 파일에 없습니다.")
             return None
+        if ledger.tax_rates is None or ledger.nci_rates is None:
+            st.error("'Info' 시트에 '당기세율' 또는 '당기지분율' 열이 없습니다.")
+            return None
+        nci_rates = ledger.nci_rates
 
-        info_df = original_sheets["Info"].set_index(original_sheets["Info"].columns[0])
-
-        info_df["당기세율_num"] = info_df["당기세율"].apply(parse_percent)
-        info_df["당기지분율_num"] = info_df["당기지분율"].apply(parse_percent)
-        tax_rates = info_df["당기세율_num"].to_dict()
-        nci_rates = (1 - info_df["당기지분율_num"]).to_dict()
-
-        # Create maps for faster lookups
-        fs_map = dict(zip(coa_df["계정코드"].astype(str), coa_df["FS_Element"]))
-        name_map = dict(zip(coa_df["계정코드"].astype(str), coa_df["계정명"]))
-        tax_adj_entries, nci_adj_entries = [], []
+        # 계정코드 조회용 매핑은 CoA 모델에 미리 계산되어 있음
+        fs_map, name_map = coa.fs_map, coa.name_map
+        nci_adj_entries = []
 
-        # Get special account codes from aje_code DataFrame and CoA
-        nci_pl_row = coa_df[coa_df["FS_Element"] == "CR"]
-        if not nci_pl_row.empty:
-            NCI_PL_CODE = nci_pl_row.iloc[0]["계정코드"]
-            NCI_PL_NAME = nci_pl_row.iloc[0]["계정명"]
+        # Get special account codes from the CoA model (CoA / AJE sheets)
+        if coa.nci_pl is not None:
+            NCI_PL_CODE, NCI_PL_NAME = coa.nci_pl
         else:
             NCI_PL_CODE = "302000"  # Fallback
             NCI_PL_NAME = "비지배지분순손익"
             st.warning("CoA 파일에서 'CR' FS_Element를 가진 비지배지분순손익 계정을 찾을 수 없습니다. 기본값('302000')을 사용합니다.")
 
-        nci_equity_row = coa_df[coa_df["FS_Element"] == "CE"]
-        if not nci_equity_row.empty:
-            NCI_EQUITY_CODE = nci_equity_row.iloc[0]["계정코드"]
-            NCI_EQUITY_NAME = nci_equity_row.iloc[0]["계정명"]
+        if coa.nci_equity is not None:
+            NCI_EQUITY_CODE, NCI_EQUITY_NAME = coa.nci_equity
         else:
             NCI_EQUITY_CODE = "201100"  # Fallback
             NCI_EQUITY_NAME = "비지배지분"
             st.warning("CoA 파일에서 'CE' FS_Element를 가진 비지배지분 계정을 찾을 수 없습니다. 기본값('201100')을 사용합니다.")
 
-        IT_EXPENSE_CODE = aje_code.loc[aje_code["FS_Element"] == "X", "계정코드"].iloc[0]
-        IT_EXPENSE_NAME = aje_code.loc[aje_code["FS_Element"] == "X", "계정명"].iloc[0]
-        DTA_CODE = aje_code.loc[aje_code["FS_Element"] == "L", "계정코드"].iloc[0]
-        DTA_NAME = aje_code.loc[aje_code["FS_Element"] == "L", "계정명"].iloc[0]
-        RE_CODE = aje_code.loc[aje_code["FS_Element"] == "E", "계정코드"].iloc[0]
-        RE_NAME = aje_code.loc[aje_code["FS_Element"] == "E", "계정명"].iloc[0]
+        IT_EXPENSE_CODE, IT_EXPENSE_NAME = coa.aje_account("X")
+        DTA_CODE, DTA_NAME = coa.aje_account("L")
+        RE_CODE, RE_NAME = coa.aje_account("E")
 
         # --- 1. Tax and NCI on P/L adjustments from CAJE sheets ---
-        for sheet_name, df_orig in original_sheets.items():
-            sheet_name_upper = sheet_name.upper()
-            if not sheet_name_upper.startswith("CAJE"):
-                continue
-            
-            if "금액" in df_orig.columns:
-                df_orig["금액"] = pd.to_numeric(df_orig["금액"], errors="coerce").fillna(0)
-
-            caje_type = sheet_name_upper.split("_")[0]
-            if caje_type in ["CAJE97", "CAJE98"]:
-                continue
-
-            df = df_orig[df_orig["당기전기"] == "당기"].copy()
-            if df.empty:
-                continue
-
-            df["금액"] = pd.to_numeric(df.get("금액"), errors="coerce")
-            df = df.dropna(subset=["금액", "계정코드", "회사명"])
-            if df.empty:
-                continue
-            df["계정코드"] = df["계정코드"].astype(str).str.strip()
-            df["FS_Element"] = df["계정코드"].map(fs_map)
-
-            if caje_type == "CAJE02":
-                pl_rows = df[df["FS_Element"].isin(["R", "X"])]
-
-                df_orig_with_fs = df_orig.copy()
-                df_orig_with_fs["계정코드"] = (
-                    df_orig_with_fs["계정코드"].astype(str).str.strip()
-                )
-                df_orig_with_fs["FS_Element"] = df_orig_with_fs["계정코드"].map(fs_map)
-                asset_rows = df_orig_with_fs[df_orig_with_fs["FS_Element"] == "A"]
-
-                if asset_rows.empty or pl_rows.empty:
-                    continue
-
-                asset_corp = asset_rows.iloc[0]["회사명"]
-                tax_rate = tax_rates.get(asset_corp, 0.0)
-
-                # Tax effect
-                unrealized_profit_amount = asset_rows["금액"].sum()
-                tax_effect = unrealized_profit_amount * tax_rate
-                if abs(tax_effect) > 1:
-                    desc = f"[{sheet_name}] 미실현이익 법인세효과"
-                    tax_adj_entries.append(
-                        {
-                            "회사명": asset_corp,
-                            "계정코드": IT_EXPENSE_CODE,
-                            "계정명": IT_EXPENSE_NAME,
-                            "당기전기": "당기",
-                            "금액": tax_effect,
-                            "설명": desc,
-                        }
-                    )
-                    tax_adj_entries.append(
-                        {
-                            "회사명": asset_corp,
-                            "계정코드": DTA_CODE,
-                            "계정명": DTA_NAME,
-                            "당기전기": "당기",
-                            "금액": tax_effect,
-                            "설명": desc,
-                        }
-                    )
-
-                # NCI effect
-                for _, pl_row in pl_rows.iterrows():
-                    pl_corp = pl_row["회사명"]
-                    nci_rate = nci_rates.get(pl_corp, 0.0)
-                    if nci_rate > 0:
-                        amount = pl_row["금액"]
-                        nci_effect = -amount * (1 - tax_rate) * nci_rate
-                        if abs(nci_effect) > 1:
-                            desc = f"[{sheet_name}] {pl_row.get('설명', '')} 관련"
-                            nci_adj_entries.append(
-                                {
-                                    "회사명": asset_corp,
-                                    "계정코드": RE_CODE,
-                                    "계정명": RE_NAME,
-                                    "당기전기": "당기",
-                                    "금액": -nci_effect,
-                                    "설명": f"{desc} 비지배지분효과",
-                                }
-                            )
-                            nci_adj_entries.append(
-                                {
-                                    "회사명": asset_corp,
-                                    "계정코드": NCI_PL_CODE,
-                                    "계정명": NCI_PL_NAME,
-                                    "당기전기": "당기",
-                                    "금액": nci_effect,
-                                    "설명": f"{desc} 비지배지분효과",
-                                }
-                            )
-
-            elif caje_type == "CAJE03":
-                pl_rows = df[df["FS_Element"].isin(["R", "X"])]
-
-                df_orig_with_fs = df_orig.copy()
-                df_orig_with_fs["계정코드"] = (
-                    df_orig_with_fs["계정코드"].astype(str).str.strip()
-                )
-                df_orig_with_fs["FS_Element"] = df_orig_with_fs["계정코드"].map(fs_map)
-                asset_rows = df_orig_with_fs[df_orig_with_fs["FS_Element"] == "A"]
-
-                if asset_rows.empty or pl_rows.empty:
-                    continue
-
-                asset_corp = asset_rows.iloc[0]["회사명"]
-
-                for _, pl_row in pl_rows.iterrows():
-                    pl_corp = pl_row["회사명"]
-                    amount = pl_row["금액"]
-                    tax_rate = tax_rates.get(asset_corp, 0.0)
-                    desc = f"[{sheet_name}] {pl_row.get('설명', '')} 관련"
-
-                    # Tax effect
-                    if pl_row["FS_Element"] == "X": 
-                        tax_effect = -amount * tax_rate
-                    else:
-                        tax_effect = amount * tax_rate
-                    
-                    if abs(tax_effect) > 1:
-                        tax_adj_entries.append(
-                            {
-                                "회사명": asset_corp,
-                                "계정코드": IT_EXPENSE_CODE,
-                                "계정명": IT_EXPENSE_NAME,
-                                "당기전기": "당기",
-                                "금액": tax_effect,
-                                "설명": f"{desc} 법인세효과",
-                            }
-                        )
-                        tax_adj_entries.append(
-                            {
-                                "회사명": asset_corp,
-                                "계정코드": DTA_CODE,
-                                "계정명": DTA_NAME,
-                                "당기전기": "당기",
-                                "금액": tax_effect,
-                                "설명": f"{desc} 법인세효과",
-                            }
-                        )
-                        
-                    nci_rate = nci_rates.get(pl_corp, 0.0)
-
-                    # NCI effect
-                    if nci_rate > 0:
-                        nci_effect = -amount * (1 - tax_rate) * nci_rate
-                        if abs(nci_effect) > 1:
-                            nci_adj_entries.append(
-                                {
-                                    "회사명": asset_corp,
-                                    "계정코드": RE_CODE,
-                                    "계정명": RE_NAME,
-                                    "당기전기": "당기",
-                                    "금액": -nci_effect,
-                                    "설명": f"{desc} 비지배지분효과",
-                                }
-                            )
-                            nci_adj_entries.append(
-                                {
-                                    "회사명": asset_corp,
-                                    "계정코드": NCI_PL_CODE,
-                                    "계정명": NCI_PL_NAME,
-                                    "당기전기": "당기",
-                                    "금액": nci_effect,
-                                    "설명": f"{desc} 비지배지분효과",
-                                }
-                            )
-
-            elif caje_type == "CAJE96":
-                pl_rows = df[df["FS_Element"].isin(["R", "X"])]
-                for _, pl_row in pl_rows.iterrows():
-                    corp = pl_row["회사명"]
-                    amount = pl_row["금액"]
-                    tax_rate = tax_rates.get(corp, 0.0)
-                    nci_rate = nci_rates.get(corp, 0.0)
-                    desc = f"[{sheet_name}] {pl_row.get('설명', '')} 관련"
-
-                    # Tax effect
-                    if pl_row["FS_Element"] == "X": 
-                        tax_effect = -amount * tax_rate
-                    else:
-                        tax_effect = amount * tax_rate
-                        
-                    if abs(tax_effect) > 1:
-                        tax_adj_entries.append(
-                            {
-                                "회사명": corp,
-                                "계정코드": IT_EXPENSE_CODE,
-                                "계정명": IT_EXPENSE_NAME,
-                                "당기전기": "당기",
-                                "금액": tax_effect,
-                                "설명": f"{desc} 법인세효과",
-                            }
-                        )
-                        tax_adj_entries.append(
-                            {
-                                "회사명": corp,
-                                "계정코드": DTA_CODE,
-                                "계정명": DTA_NAME,
-                                "당기전기": "당기",
-                                "금액": tax_effect,
-                                "설명": f"{desc} 법인세효과",
-                            }
-                        )
-
-                    # NCI effect
-                    if nci_rate > 0:
-                        nci_effect = -amount * (1 - tax_rate) * nci_rate
-                        if abs(nci_effect) > 1:
-                            nci_adj_entries.append(
-                                {
-                                    "회사명": corp,
-                                    "계정코드": RE_CODE,
-                                    "계정명": RE_NAME,
-                                    "당기전기": "당기",
-                                    "금액": -nci_effect,
-                                    "설명": f"{desc} 비지배지분효과",
-                                }
-                            )
-                            nci_adj_entries.append(
-                                {
-                                    "회사명": corp,
-                                    "계정코드": NCI_PL_CODE,
-                                    "계정명": NCI_PL_NAME,
-                                    "당기전기": "당기",
-                                    "금액": nci_effect,
-                                    "설명": f"{desc} 비지배지분효과",
-                                }
-                            )
-
-            elif caje_type == "CAJE05":
-                pl_rows = df[df["FS_Element"].isin(["R", "X"])]
-                for _, pl_row in pl_rows.iterrows():
-                    corp = pl_row["회사명"]
-                    amount = pl_row["금액"]
-                    tax_rate = tax_rates.get(corp, 0.0)
-                    nci_rate = nci_rates.get(corp, 0.0)
-                    desc = f"[{sheet_name}] {pl_row.get('설명', '')} 관련"
-                    
-                    # Tax effect
-                    if pl_row["FS_Element"] == "X": 
-                        tax_effect = -amount * tax_rate
-                    else:
-                        tax_effect = amount * tax_rate
-                    
-                    if abs(tax_effect) > 1:
-                        tax_adj_entries.append(
-                            {
-                                "회사명": corp,
-                                "계정코드": IT_EXPENSE_CODE,
-                                "계정명": IT_EXPENSE_NAME,
-                                "당기전기": "당기",
-                                "금액": tax_effect,
-                                "설명": f"{desc} 법인세효과",
-                            }
-                        )
-                        tax_adj_entries.append(
-                            {
-                                "회사명": corp,
-                                "계정코드": DTA_CODE,
-                                "계정명": DTA_NAME,
-                                "당기전기": "당기",
-                                "금액": tax_effect,
-                                "설명": f"{desc} 법인세효과",
-                            }
-                        )
-                        
-                    # NCI effect
-                    if nci_rate > 0:
-                        nci_effect = -amount * (1 - tax_rate) * nci_rate
-                        if abs(nci_effect) > 1:
-                            nci_adj_entries.append(
-                                {
-                                    "회사명": corp,
-                                    "계정코드": RE_CODE,
-                                    "계정명": RE_NAME,
-                                    "당기전기": "당기",
-                                    "금액": -nci_effect,
-                                    "설명": f"{desc} 비지배지분효과",
-                                }
-                            )
-                            nci_adj_entries.append(
-                                {
-                                    "회사명": corp,
-                                    "계정코드": NCI_PL_CODE,
-                                    "계정명": NCI_PL_NAME,
-                                    "당기전기": "당기",
-                                    "금액": nci_effect,
-                                    "설명": f"{desc} 비지배지분효과",
-                                }
-                            )
+        # CAJE02/03/05/96 시트를 한 번에 계산 (adjustment_effects.TAX_NCI_RULES)
+        tax_adj_df, caje_nci_df = tax_nci_effects(
+            ledger,
+            fs_map,
+            {
+                "it": (IT_EXPENSE_CODE, IT_EXPENSE_NAME),
+                "dta": (DTA_CODE, DTA_NAME),
+                "re": (RE_CODE, RE_NAME),
+                "nci_pl": (NCI_PL_CODE, NCI_PL_NAME),
+            },
+        )
 
-                        
         # --- 2. NCI on subsidiary's total equity change from 'CE' sheet ---
         for sub_file, sub_name in zip(subs_files, subs_names):
             try:
-                sub_file.seek(0)
-                sub_xls = pd.ExcelFile(sub_file)
-                if "CE" in sub_xls.sheet_names:
-                    sce_df = pd.read_excel(sub_xls, sheet_name="CE", header=None)
-
-                    if sce_df.shape[0] < 5 or sce_df.shape[1] < 4:
-                        continue
-
+                if "CE" in workbook_registry.sheet_names(sub_file):
                     nci_rate = nci_rates.get(sub_name, 0.0)
                     if nci_rate <= 0:
                         continue
 
-                    for r in range(3, len(sce_df)):
-                        data_row = sce_df.iloc[r]
-                        row_desc = str(data_row.iloc[1])
-
-                        if "기말" in row_desc or "Ending" in row_desc:
-                            break
-                        if "기초" in row_desc or "Beginning" in row_desc:
-                            continue
-
-                        ce_adj_code = str(data_row.iloc[2])
-                        is_ni_item = "_NI" in ce_adj_code
-                        nci_contra_code = NCI_PL_CODE if is_ni_item else NCI_EQUITY_CODE
-                        nci_contra_name = NCI_PL_NAME if is_ni_item else NCI_EQUITY_NAME
-
-                        # Get the numeric values for the current row
-                        change_values = pd.to_numeric(
-                            data_row.iloc[3:-1], errors="coerce"
-                        ).fillna(0)
-
-                        # Calculate the sum for the row (안분 대상 합계)
-                        row_sum = change_values.sum()
-
-                        # If there's no significant change in the row, skip to the next row
-                        if abs(row_sum) <= 1:
-                            continue
-
-                        # Calculate the total NCI amount for the row
-                        total_nci_per_row = row_sum * nci_rate
-
-                        # Create a safe divisor to avoid ZeroDivisionError
-                        safe_row_sum = row_sum if row_sum != 0 else 1
-
-                        # Calculate the weight of each column's value relative to the row sum
-                        weights = change_values / safe_row_sum
-
-                        # Distribute the total NCI amount across the columns based on weights
-                        nci_distribution = weights * total_nci_per_row
-
-                        # Create adjustment entries for each distributed NCI amount
-                        header_row = sce_df.iloc[1]
-                        equity_acct_codes = header_row.iloc[3:-1]
-                        for i, nci_effect in enumerate(nci_distribution):
-                            if abs(nci_effect) > 1:
-                                equity_acct_code = str(equity_acct_codes.iloc[i])
-
-                                # Debit entry to the specific equity account
-                                nci_adj_entries.append(
-                                    {
-                                        "회사명": sub_name,
-                                        "계정코드": equity_acct_code,
-                                        "계정명": name_map.get(equity_acct_code, ""),
-                                        "당기전기": "당기",
-                                        "금액": nci_effect,
-                                        "설명": f"{sub_name} 자본변동 ({row_desc})",
-                                    }
-                                )
-                                # Credit entry to the NCI contra account
-                                nci_adj_entries.append(
-                                    {
-                                        "회사명": sub_name,
-                                        "계정코드": nci_contra_code,
-                                        "계정명": nci_contra_name,
-                                        "당기전기": "당기",
-                                        "금액": -nci_effect,
-                                        "설명": f"{sub_name} 자본변동 ({row_desc})",
-                                    }
-                                )
+                    # CE 시트 파싱은 자본변동표와 공유 (파일별 캐시)
+                    block = load_entity_ce(sub_file)
+                    if block is None or block.shape[0] < 5 or block.shape[1] < 4:
+                        continue
+
+                    nci_adj_entries.append(
+                        ce_nci_effects(
+                            block,
+                            sub_name,
+                            nci_rate,
+                            (NCI_PL_CODE, NCI_PL_NAME),
+                            (NCI_EQUITY_CODE, NCI_EQUITY_NAME),
+                            name_map,
+                        )
+                    )
 
                 else:
                     log_adj_validation(f"⚠️ **[{sub_name}]** 자본변동표(CE) 시트가 없어 자본변동에 따른 비지배지분 조정을 계산할 수 없습니다.")
@@ -2354,7 +2141,7 @@ with tab3:
 
         # Handle Tax Adjustments (CAJE97)
         caje97_sheet_name = find_sheet_name_by_prefix("CAJE97")
-        new_tax_df = pd.DataFrame(tax_adj_entries)
+        new_tax_df = tax_adj_df if not tax_adj_df.empty else pd.DataFrame()
         if caje97_sheet_name in final_sheets and not final_sheets[caje97_sheet_name].empty:
             original_tax_df = final_sheets[caje97_sheet_name].dropna(how="all")
             final_sheets[caje97_sheet_name] = pd.concat(
@@ -2365,7 +2152,8 @@ with tab3:
 
         # Handle NCI Adjustments (CAJE98)
         caje98_sheet_name = find_sheet_name_by_prefix("CAJE98")
-        new_nci_df = pd.DataFrame(nci_adj_entries)
+        nci_parts = [df for df in [caje_nci_df] + nci_adj_entries if not df.empty]
+        new_nci_df = pd.concat(nci_parts, ignore_index=True) if nci_parts else pd.DataFrame()
         if caje98_sheet_name in final_sheets and not final_sheets[caje98_sheet_name].empty:
             original_nci_df = final_sheets[caje98_sheet_name].dropna(how="all")
             final_sheets[caje98_sheet_name] = pd.concat(
@@ -2382,9 +2170,10 @@ with tab3:
     st.write(
         "템플릿을 다운로드하여 기본 조정 명세서 시트를 작성합니다."
     )
-    template_data = create_adjustment_template()
     if st.button("📥 조정명세 입력 템플릿 다운로드 (Excel)"):
-        save_excel_native(template_data, "조정명세_입력템플릿_BeforeTaxNci.xlsx")
+        save_excel_native(
+            create_adjustment_template(), "조정명세_입력템플릿_BeforeTaxNci.xlsx"
+        )
 
     # --- Step 2: Upload Initial Adjustments ---
     st.subheader("Step 2: 기본 조정 파일 업로드")
@@ -2413,19 +2202,14 @@ with tab3:
 
         with st.spinner("자동 조정 분개를 생성 중입니다..."):
             try:
-                coa_df = pd.read_excel(
-                    st.session_state.files["coa"], sheet_name="CoA", dtype=str
-                )
+                coa = load_coa_model(st.session_state.files["coa"])
                 subs_names = [f.name.split("_")[0] for f in subs_files]
-                aje_code = pd.read_excel(
-                    st.session_state.files["coa"], sheet_name="AJE", dtype=str
-                )
+                workbook_registry.prefetch(subs_files, max_workers=ingest_workers)
                 intermediate_excel_data = generate_intermediate_adjustments(
                     st.session_state.adj_workflow["initial_file"],
-                    coa_df,
+                    coa,
                     subs_files,
                     subs_names,
-                    aje_code,
                 )
                 if intermediate_excel_data:
                     st.session_state.adj_workflow["intermediate_data"] = (
@@ -2465,405 +2249,12 @@ with tab3:
     # --- Step 5 & 6: Generate Final CAJE and Display ---
     st.subheader("Step 5: 최종 분개 생성 및 결과 확인")
 
-    def build_caje_from_template(adjustment_file, coa_df_internal):
-        fs_map = dict(zip(coa_df_internal["계정코드"], coa_df_internal["FS_Element"]))
-
-        def get_bspl_sign(fs_element):
-            return -1 if fs_element in ["A", "X", "CA"] else 1
-
-        ni_code = None
-        try:
-            r_rows = coa_df_internal[coa_df_internal["FS_Element"] == "R"]
-            if not r_rows.empty:
-                ni_code = r_rows.iloc[0].get("L1_code")
-        except (IndexError, KeyError):
-            ni_code = None
-
-        xls = pd.ExcelFile(adjustment_file)
-        all_bspl_entries, all_cf_entries = [], []
-
-        for sheet_name in xls.sheet_names:
-            if not sheet_name.upper().startswith("CAJE"):
-                continue
-            caje_type = sheet_name.split("_")[0].upper()
-            df = pd.read_excel(xls, sheet_name, dtype={"계정코드": str}).fillna("")
-
-            # --- A. BS/PL Adjustment Logic ---
-            df_for_bspl = df.copy()
-            if caje_type in ["CAJE01", "CAJE04"]:
-                df_for_bspl = df[df["당기전기"] == "당기"]
-
-            for _, row in df_for_bspl.iterrows():
-                acc_code = str(row.get("계정코드", "")).strip()
-                if not acc_code:
-                    continue
-                fs_element = fs_map.get(acc_code, "")
-                amount = pd.to_numeric(row.get("금액"), errors="coerce")
-                if pd.isna(amount) or amount == 0:
-                    continue
-
-                final_amount = amount * get_bspl_sign(fs_element)
-                all_bspl_entries.append(
-                    {
-                        "조정유형": caje_type,
-                        "회사명": row.get("회사명"),
-                        "계정코드": acc_code,
-                        "금액": final_amount,
-                        "설명": row.get("설명"),
-                        "당기전기": row.get("당기전기"),
-                        "FS_Element": fs_element,
-                    }
-                )
-
-            # --- B. CF Adjustment Logic ---
-            if caje_type == "CAJE02":
-                if ni_code is None:
-                    st.warning(
-                        f"[{sheet_name}] CF조정 건너뜀: 당기순이익 계정 코드를 CoA에서 찾을 수 없습니다."
-                    )
-                    continue
-                df_with_fs = df.merge(
-                    coa_df_internal[["계정코드", "FS_Element"]],
-                    on="계정코드",
-                    how="left",
-                )
-                pl_rows = df_with_fs[df_with_fs["FS_Element"].isin(["R", "X"])].copy()
-                bs_rows = df_with_fs[
-                    df_with_fs["FS_Element"].isin(["A", "L", "E"])
-                ].copy()
-                if pl_rows.empty or bs_rows.empty:
-                    st.warning(
-                        f"[{sheet_name}] CF조정 건너뜀: 시트에서 손익(R/X) 또는 재무상태(A/L/E) 계정을 찾을 수 없습니다."
-                    )
-                    continue
-
-                pl_pivot = pl_rows.pivot_table(
-                    index=["계정코드", "FS_Element"],
-                    columns="당기전기",
-                    values="금액",
-                    aggfunc="sum",
-                ).fillna(0)
-                if "당기" not in pl_pivot.columns:
-                    pl_pivot["당기"] = 0
-                if "전기" not in pl_pivot.columns:
-                    pl_pivot["전기"] = 0
-                pl_pivot["change"] = pl_pivot["당기"] + pl_pivot["전기"]
-                pl_pivot["impact"] = pl_pivot.apply(
-                    lambda r: r["change"] if r.name[1] == "X" else -r["change"], axis=1
-                )
-                total_pl_impact = pl_pivot["impact"].sum()
-
-                inventory_acc_code = bs_rows.iloc[0]["계정코드"]
-                corp_name = df.iloc[0]["회사명"]
-
-                # Line 1: NI Entry (+)
-                all_cf_entries.append(
-                    {
-                        "조정유형": caje_type,
-                        "회사명": corp_name,
-                        "계정코드": ni_code,
-                        "조정금액": total_pl_impact,
-                        "설명": "[비현금손익] 미실현이익(NI)",
-                    }
-                )
-                # Line 2: Inventory Entry (-)
-                all_cf_entries.append(
-                    {
-                        "조정유형": caje_type,
-                        "회사명": corp_name,
-                        "계정코드": inventory_acc_code,
-                        "조정금액": -total_pl_impact,
-                        "설명": "[비현금손익] 미실현이익(재고)",
-                    }
-                )
-            elif caje_type == "CAJE03":
-                if ni_code is None:
-                    st.warning(
-                        f"[{sheet_name}] CF조정 건너뜀: 당기순이익 계정 코드를 CoA에서 찾을 수 없습니다."
-                    )
-                    continue
-                df_with_fs = df.merge(
-                    coa_df_internal[["계정코드", "FS_Element"]],
-                    on="계정코드",
-                    how="left",
-                )
-                pl_rows = df_with_fs[df_with_fs["FS_Element"].isin(["X", "R"])].copy()
-                bs_rows = df_with_fs[
-                    df_with_fs["FS_Element"].isin(["A", "L", "E"])
-                ].copy()
-                if pl_rows.empty or bs_rows.empty:
-                    st.warning(
-                        f"[{sheet_name}] CF조정 건너뜀: 시트에서 손익(R/X) 또는 재무상태(A/L/E) 계정을 찾을 수 없습니다."
-                    )
-                    continue
-
-                pl_pivot = pl_rows.pivot_table(
-                    index=["계정코드", "FS_Element"],
-                    columns="당기전기",
-                    values="금액",
-                    aggfunc="sum",
-                ).fillna(0)
-                if "당기" not in pl_pivot.columns:
-                    pl_pivot["당기"] = 0
-                if "전기" not in pl_pivot.columns:
-                    pl_pivot["전기"] = 0
-                pl_pivot["change"] = pl_pivot["당기"] + pl_pivot["전기"]
-                pl_pivot["impact"] = pl_pivot.apply(
-                    lambda r: r["change"] if r.name[1] == "X" else -r["change"], axis=1
-                )
-                total_pl_impact = pl_pivot["impact"].sum()
-
-                pl_acc_code = pl_rows.iloc[0]["계정코드"]
-                corp_name = df.iloc[0]["회사명"]
-
-                # Line 1: NI Entry (+)
-                all_cf_entries.append(
-                    {
-                        "조정유형": caje_type,
-                        "회사명": corp_name,
-                        "계정코드": ni_code,
-                        "조정금액": total_pl_impact,
-                        "설명": "[비현금손익] 미실현이익(NI)",
-                    }
-                )
-                # Line 2: PL Entry (-)
-                all_cf_entries.append(
-                    {
-                        "조정유형": caje_type,
-                        "회사명": corp_name,
-                        "계정코드": pl_acc_code,
-                        "조정금액": -total_pl_impact,
-                        "설명": "[비현금손익] 미실현이익(손익)",
-                    }
-                )
-            elif caje_type == "CAJE04":
-                if ni_code is None:
-                    st.warning(
-                        f"[{sheet_name}] CF조정 건너뜀: 당기순이익 계정 코드를 CoA에서 찾을 수 없습니다."
-                    )
-                    continue
-                df_with_fs = df.merge(
-                    coa_df_internal[["계정코드", "FS_Element"]],
-                    on="계정코드",
-                    how="left",
-                )
-                pl_rows = df_with_fs[df_with_fs["FS_Element"].isin(["X", "R"])].copy()
-                bs_rows = df_with_fs[
-                    df_with_fs["FS_Element"].isin(["A", "L", "E"])
-                ].copy()
-                if pl_rows.empty or bs_rows.empty:
-                    st.warning(
-                        f"[{sheet_name}] CF조정 건너뜀: 시트에서 손익(R/X) 또는 재무상태(A/L/E) 계정을 찾을 수 없습니다."
-                    )
-                    continue
-
-                pl_pivot = pl_rows.pivot_table(
-                    index=["계정코드", "FS_Element"],
-                    columns="당기전기",
-                    values="금액",
-                    aggfunc="sum",
-                ).fillna(0)
-                if "당기" not in pl_pivot.columns:
-                    pl_pivot["당기"] = 0
-                if "전기" not in pl_pivot.columns:
-                    pl_pivot["전기"] = 0
-                pl_pivot["change"] = pl_pivot["당기"] + pl_pivot["전기"]
-                pl_pivot["impact"] = pl_pivot.apply(
-                    lambda r: r["change"] if r.name[1] == "X" else -r["change"], axis=1
-                )
-                total_pl_impact = pl_pivot["impact"].sum()
-
-                pl_acc_code = pl_rows.iloc[0]["계정코드"]
-                corp_name = df.iloc[0]["회사명"]
-
-                # Line 1: NI Entry (+)
-                all_cf_entries.append(
-                    {
-                        "조정유형": caje_type,
-                        "회사명": corp_name,
-                        "계정코드": ni_code,
-                        "조정금액": total_pl_impact,
-                        "설명": "[손익/재무활동] 미실현이익(NI)",
-                    }
-                )
-                # Line 2: RE/PL Entry (-)
-                all_cf_entries.append(
-                    {
-                        "조정유형": caje_type,
-                        "회사명": corp_name,
-                        "계정코드": pl_acc_code,
-                        "조정금액": total_pl_impact,
-                        "설명": "[손익/재무활동] 미실현이익(손익)",
-                    }
-                )
-            elif caje_type == "CAJE05":
-                if ni_code is None:
-                    st.warning(
-                        f"[{sheet_name}] CF조정 건너뜀: 당기순이익 계정 코드를 CoA에서 찾을 수 없습니다."
-                    )
-                    continue
-                df_with_fs = df.merge(
-                    coa_df_internal[["계정코드", "FS_Element"]],
-                    on="계정코드",
-                    how="left",
-                )
-                pl_rows = df_with_fs[df_with_fs["FS_Element"].isin(["X", "R"])].copy()
-                bs_rows = df_with_fs[
-                    df_with_fs["FS_Element"].isin(["A", "L", "E"])
-                ].copy()
-                if pl_rows.empty or bs_rows.empty:
-                    st.warning(
-                        f"[{sheet_name}] CF조정 건너뜀: 시트에서 손익(R/X) 또는 재무상태(A/L/E) 계정을 찾을 수 없습니다."
-                    )
-                    continue
-
-                pl_pivot = pl_rows.pivot_table(
-                    index=["계정코드", "FS_Element"],
-                    columns="당기전기",
-                    values="금액",
-                    aggfunc="sum",
-                ).fillna(0)
-                if "당기" not in pl_pivot.columns:
-                    pl_pivot["당기"] = 0
-                if "전기" not in pl_pivot.columns:
-                    pl_pivot["전기"] = 0
-                pl_pivot["change"] = pl_pivot["당기"] + pl_pivot["전기"]
-                pl_pivot["impact"] = pl_pivot.apply(
-                    lambda r: r["change"] if r.name[1] == "X" else -r["change"], axis=1
-                )
-                total_pl_impact = pl_pivot["impact"].sum()
-
-                pl_acc_code = pl_rows.iloc[0]["계정코드"]
-                corp_name = df.iloc[0]["회사명"]
-
-                # Line 1: NI Entry (+)
-                all_cf_entries.append(
-                    {
-                        "조정유형": caje_type,
-                        "회사명": corp_name,
-                        "계정코드": ni_code,
-                        "조정금액": total_pl_impact,
-                        "설명": "[손익] 기타손익조정(NI)",
-                    }
-                )
-                # Line 2: RE/PL Entry (-)
-                all_cf_entries.append(
-                    {
-                        "조정유형": caje_type,
-                        "회사명": corp_name,
-                        "계정코드": pl_acc_code,
-                        "조정금액": total_pl_impact,
-                        "설명": "[손익] 기타손익조정(손익)",
-                    }
-                )
-            elif caje_type == "CAJE97":
-                if ni_code is None:
-                    st.warning(
-                        f"[{sheet_name}] CF조정 건너뜀: 당기순이익 계정 코드를 CoA에서 찾을 수 없습니다."
-                    )
-                    continue
-                df_with_fs = df.merge(
-                    coa_df_internal[["계정코드", "FS_Element"]],
-                    on="계정코드",
-                    how="left",
-                )
-                pl_rows = df_with_fs[df_with_fs["FS_Element"].isin(["X", "R"])].copy()
-                bs_rows = df_with_fs[
-                    df_with_fs["FS_Element"].isin(["A", "L", "E"])
-                ].copy()
-                if pl_rows.empty or bs_rows.empty:
-                    st.warning(
-                        f"[{sheet_name}] CF조정 건너뜀: 시트에서 손익(R/X) 또는 재무상태(A/L/E) 계정을 찾을 수 없습니다."
-                    )
-                    continue
-
-                pl_pivot = pl_rows.pivot_table(
-                    index=["계정코드", "FS_Element"],
-                    columns="당기전기",
-                    values="금액",
-                    aggfunc="sum",
-                ).fillna(0)
-                if "당기" not in pl_pivot.columns:
-                    pl_pivot["당기"] = 0
-                if "전기" not in pl_pivot.columns:
-                    pl_pivot["전기"] = 0
-                pl_pivot["change"] = pl_pivot["당기"] + pl_pivot["전기"]
-                pl_pivot["impact"] = pl_pivot.apply(
-                    lambda r: r["change"] if r.name[1] == "X" else -r["change"], axis=1
-                )
-                total_pl_impact = pl_pivot["impact"].sum()
-
-                pl_acc_code = pl_rows.iloc[0]["계정코드"]
-                corp_name = df.iloc[0]["회사명"]
-
-                # Line 1: NI Entry (+)
-                all_cf_entries.append(
-                    {
-                        "조정유형": caje_type,
-                        "회사명": corp_name,
-                        "계정코드": ni_code,
-                        "조정금액": total_pl_impact,
-                        "설명": "[비현금손익] 법인세 당기손익 효과(NI)",
-                    }
-                )
-                # Line 2: PL Entry (-)
-                all_cf_entries.append(
-                    {
-                        "조정유형": caje_type,
-                        "회사명": corp_name,
-                        "계정코드": pl_acc_code,
-                        "조정금액": -total_pl_impact,
-                        "설명": "[비현금손익] 법인세바용",
-                    }
-                )
-            else:
-                grouped = df.groupby(["회사명", "계정코드", "설명"])
-                for (corp, acc_code, desc), group in grouped:
-                    pivot_df = group.pivot_table(
-                        columns="당기전기", values="금액", aggfunc="sum"
-                    )
-                    current_amt = (
-                        pivot_df["당기"].item() if "당기" in pivot_df.columns else 0
-                    )
-                    prior_amt = (
-                        pivot_df["전기"].item() if "전기" in pivot_df.columns else 0
-                    )
-                    fs_element = fs_map.get(acc_code, "")
-
-                    cf_adj_amt, cf_desc = 0, desc
-                    if caje_type == "CAJE01":
-                        change_amt = current_amt - prior_amt
-                        if fs_element == "L":
-                            cf_adj_amt = change_amt
-                        else:  # For 'A' and others
-                            cf_adj_amt = -change_amt
-                        cf_desc = f"[운전자본] {desc}"
-
-                    if abs(cf_adj_amt) > 1e-6:
-                        all_cf_entries.append(
-                            {
-                                "조정유형": caje_type,
-                                "회사명": corp,
-                                "계정코드": acc_code,
-                                "조정금액": cf_adj_amt,
-                                "설명": cf_desc,
-                            }
-                        )
-
-        bspl_cols = ["조정유형", "회사명", "계정코드", "금액", "설명", "당기전기", "FS_Element"]
-        cf_cols = ["조정유형", "회사명", "계정코드", "조정금액", "설명"]
-
-        caje_bspl_df = (
-            pd.DataFrame(all_bspl_entries, columns=bspl_cols)
-            if all_bspl_entries
-            else pd.DataFrame(columns=bspl_cols)
+    def build_caje_from_template(adjustment_file, coa):
+        caje_bspl_df, caje_cf_df, messages = caje_entries(
+            load_adjustment_ledger(adjustment_file), coa
         )
-        caje_cf_df = (
-            pd.DataFrame(all_cf_entries, columns=cf_cols)
-            if all_cf_entries
-            else pd.DataFrame(columns=cf_cols)
-        )
-
+        for message in messages:
+            st.warning(message)
         return caje_bspl_df, caje_cf_df
 
     if st.button(
@@ -2875,14 +2266,22 @@ with tab3:
     ):
         with st.spinner("최종 조정 분개를 생성하고 있습니다..."):
             try:
-                coa_df = pd.read_excel(
-                    st.session_state.files["coa"], sheet_name="CoA", dtype=str
-                )
+                coa = load_coa_model(st.session_state.files["coa"])
                 caje_bspl_df, caje_cf_df = build_caje_from_template(
-                    st.session_state.adj_workflow["final_file"], coa_df
+                    st.session_state.adj_workflow["final_file"], coa
                 )
                 st.session_state.results["caje_bspl_df"] = caje_bspl_df
+                bump_result_version("caje")
                 st.session_state.results["caje_cf_df"] = caje_cf_df
+                final_ledger = load_adjustment_ledger(st.session_state.adj_workflow["final_file"])
+                st.session_state.results["caje_balance_issues"] = balance_issues(
+                    final_ledger, coa.fs_map
+                )
+                if report_period():
+                    if period_store.store_adjustments(report_period(), final_ledger):
+                        st.info(f"💾 최종 조정명세를 기간 저장소에 저장했습니다. ({report_period()})")
+                    else:
+                        st.warning("기간 저장소에 최종 조정명세를 저장하지 못했습니다.")
                 st.session_state.caje_generated = True
                 st.success("✅ 최종 조정 분개 생성이 완료되었습니다!")
 
@@ -2909,16 +2308,23 @@ with tab3:
         st.dataframe(st.session_state.results.get("caje_bspl_df"))
         st.markdown("#### 🌊 현금흐름표 조정 분개 (CF CAJE)")
         st.dataframe(st.session_state.results.get("caje_cf_df"))
-        caje_excel_data = to_excel(
-            {
-                "CAJE_BSPL": st.session_state.results.get(
-                    "caje_bspl_df", pd.DataFrame()
-                ),
-                "CAJE_CF": st.session_state.results.get("caje_cf_df", pd.DataFrame()),
-            }
-        )
-        if st.button("📥 생성된 조정 분개(CAJE) 다운로드 (Excel)"):
-            save_excel_native(caje_excel_data, "CAJE_generated.xlsx")
+        balance_issues_df = st.session_state.results.get("caje_balance_issues")
+        if balance_issues_df is not None:
+            st.markdown("#### ⚖️ 차대 검증 (시트 / 회사 / 당기전기 / 분개별)")
+            if balance_issues_df.empty:
+                st.success("✅ 모든 시트/회사/당기전기/분개 그룹의 차변과 대변이 일치합니다.")
+            else:
+                st.warning(
+                    f"⚠️ 차대가 맞지 않는 그룹 {len(balance_issues_df):,}개 "
+                    "(회사 간 거래 제거 분개는 회사별로 차대가 맞지 않을 수 있습니다)"
+                )
+                st.dataframe(balance_issues_df)
+        if st.button("📥 생성된 조정 분개(CAJE) 다운로드"):
+            save_result(
+                "caje",
+                lambda: result_sheets("caje"),
+                RESULT_FILES["caje"],
+            )
         st.info(
             "생성된 BS/PL CAJE 데이터는 '연결 재무제표' 탭의 '연결 조정' 데이터로 사용할 수 있습니다."
         )
@@ -2968,6 +2374,7 @@ with tab4:
                 )
                 summary_df["값"] = summary_df["값"].astype(str)
                 st.session_state.fcfs_results["translated_df"] = translated_df
+                bump_result_version("fcfs")
                 st.session_state.fcfs_results["summary_df"] = summary_df
                 st.success("🎉 외화 재무제표 환산이 완료되었습니다!")
             except Exception as e:
@@ -2982,234 +2389,28 @@ with tab4:
         st.dataframe(st.session_state.fcfs_results["translated_df"])
         st.markdown("#### 📊 환산 요약")
         st.dataframe(st.session_state.fcfs_results["summary_df"])
-        translated = to_excel(
-            {
-                "translated": st.session_state.fcfs_results["translated_df"],
-                "summary": st.session_state.fcfs_results["summary_df"],
-            }
-        )
-        if st.button("📥 환산 결과 다운로드 (Excel)"):
-            save_excel_native(translated, "FCFS_translated.xlsx")
+        if st.button("📥 환산 결과 다운로드"):
+            save_result(
+                "fcfs",
+                lambda: result_sheets("fcfs"),
+                RESULT_FILES["fcfs"],
+            )
         
 
 # =================================================================================================
 # --- 조정명세 차기이월 기능 ---
 # =================================================================================================
 
-def generate_carryover_adjustments(adj_file, coa_df, aje_code):
+def generate_carryover_adjustments(ledger, coa, periods=1):
     """
-    당기 조정명세 데이터를 기반으로 차기 이월 조정명세를 생성합니다.
+    당기 조정명세 원장(업로드 파일 또는 기간 저장소)을 기반으로 차기 이월 조정명세를 생성합니다.
+    periods > 1이면 이월 결과를 다시 이월해 기간별 템플릿(엑셀 bytes) 목록을 반환합니다.
     """
-    adj_file.seek(0)
-    xls = pd.ExcelFile(adj_file)
-    input_sheets = {sheet_name: pd.read_excel(xls, sheet_name, dtype={"계정코드": str}) for sheet_name in xls.sheet_names}
-    output_sheets = {}
-    caje97_new_entries = []
-
-    # --- 데이터 준비 ---
-    if "Info" not in input_sheets:
+    if ledger.info is None:
         raise ValueError("'Info' 시트가 조정명세 파일에 없습니다.")
-    info_df = input_sheets["Info"].copy()
-    if '회사명' in info_df.columns:
-        info_df = info_df.set_index('회사명')
-    else: # 첫번째 열을 인덱스로 사용
-        info_df = info_df.set_index(info_df.columns[0])
-
-    # '당기세율' 사용
-    info_df["세율_num"] = info_df["당기세율"].apply(parse_percent)
-    tax_rates = info_df["세율_num"].to_dict()
-
-    fs_map = dict(zip(coa_df["계정코드"].astype(str), coa_df["FS_Element"]))
-    name_map = dict(zip(coa_df["계정코드"].astype(str), coa_df["계정명"]))
-
-    # AJE 시트에서 계정코드/명칭 가져오기
-    RE_CODE = aje_code.loc[aje_code["FS_Element"] == "E", "계정코드"].iloc[0]
-    RE_NAME = aje_code.loc[aje_code["FS_Element"] == "E", "계정명"].iloc[0]
-    DTL_CODE = aje_code.loc[aje_code["FS_Element"] == "L", "계정코드"].iloc[0]
-    DTL_NAME = aje_code.loc[aje_code["FS_Element"] == "L", "계정명"].iloc[0]
-    
-    # CoA에서 비지배지분 관련 계정코드/명칭 가져오기
-    nci_pl_row = coa_df[coa_df["FS_Element"] == "CR"]
-    NCI_PL_CODE = nci_pl_row.iloc[0]["계정코드"] if not nci_pl_row.empty else "302000" # Fallback
-    
-    nci_equity_row = coa_df[coa_df["FS_Element"] == "CE"]
-    NCI_EQUITY_CODE = nci_equity_row.iloc[0]["계정코드"] if not nci_equity_row.empty else "201100" # Fallback
-    NCI_EQUITY_NAME = nci_equity_row.iloc[0]["계정명"] if not nci_equity_row.empty else "비지배지분"
-
-    original_sheet_names = list(input_sheets.keys())
-
-    # --- 시트별 차기 이월 로직 적용 ---
-    for sheet_name in original_sheet_names:
-        if not sheet_name.upper().startswith("CAJE"):
-            if sheet_name not in output_sheets:
-                 output_sheets[sheet_name] = input_sheets[sheet_name]
-            continue
-
-        caje_type = sheet_name.split("_")[0].upper()
-        df = input_sheets[sheet_name].copy().dropna(how='all')
-        if df.empty:
-            output_sheets[sheet_name] = df
-            continue
-        
-        df['금액'] = pd.to_numeric(df['금액'], errors='coerce').fillna(0)
-        df['계정코드'] = df['계정코드'].astype(str).str.strip()
-        df["FS_Element"] = df["계정코드"].map(fs_map)
-        df_columns = df.columns.drop("FS_Element") if "FS_Element" in df.columns else df.columns
-
-        # 1. CAJE00: 그대로 유지
-        if caje_type == "CAJE00":
-            output_sheets[sheet_name] = df.reindex(columns=df_columns)
-
-        # 2. CAJE01: 전기 행 삭제, 당기 -> 전기
-        elif caje_type == "CAJE01":
-            new_df = df[df["당기전기"] == "당기"].copy()
-            new_df["당기전기"] = "전기"
-            output_sheets[sheet_name] = new_df.reindex(columns=df_columns)
-
-        # 3. CAJE02: 기존 데이터 삭제 후 재작성
-        elif caje_type == "CAJE02":
-            new_entries = []
-            df_columns = df.columns.drop("FS_Element") if "FS_Element" in df.columns else df.columns
-            current_year_df = df[df["당기전기"] == "당기"].copy()
-
-            if not current_year_df.empty:
-                a_rows = current_year_df[current_year_df["FS_Element"] == "A"]
-                x_rows = current_year_df[current_year_df["FS_Element"] == "X"]
-
-                # A항목과 X항목이 모두 존재해야 로직 수행
-                if not a_rows.empty and not x_rows.empty:
-                    total_a_amount = a_rows["금액"].sum()
-
-                    # A항목의 첫번째 회사명을 기준으로 사용
-                    corp = a_rows.iloc[0]["회사명"]
-                    
-                    # X항목의 첫번째 계정코드를 사용
-                    x_code = x_rows.iloc[0]["계정코드"]
-                    x_name = x_rows.iloc[0]["계정명"]
-                    
-                    # 설명은 A항목의 첫번째 설명을 기반으로 생성
-                    desc = a_rows.iloc[0].get("설명", "미실현이익")
-
-                    # Main Adjustment
-                    new_entries.append({'회사명': corp, '계정코드': x_code, '계정명': x_name, '당기전기': '전기', '금액': total_a_amount, '설명': f'{desc}'})
-                    new_entries.append({'회사명': corp, '계정코드': RE_CODE, '계정명': RE_NAME, '당기전기': '전기', '금액': total_a_amount, '설명': f'{desc}'})
-                    
-                    # Tax Adjustment
-                    tax_rate = tax_rates.get(corp, 0.0)
-                    tax_effect = total_a_amount * tax_rate
-                    if abs(tax_effect) > 1:
-                        caje97_new_entries.append({'회사명': corp, '계정코드': RE_CODE, '계정명': RE_NAME, '당기전기': '전기', '금액': -tax_effect, '설명': f'전기 미실현이익 법인세효과 ({desc})'})
-                        caje97_new_entries.append({'회사명': corp, '계정코드': DTL_CODE, '계정명': DTL_NAME, '당기전기': '전기', '금액': -tax_effect, '설명': f'전기 미실현이익 법인세효과 ({desc})'})
-
-            output_sheets[sheet_name] = pd.DataFrame(new_entries).reindex(columns=df_columns)
-
-        # 4. CAJE03: 모든 행 유지, X계정 -> 이익잉여금 대체
-        elif caje_type == "CAJE03":
-            new_df = df.copy()
-            # Main Adjustment
-            is_x = new_df["FS_Element"] == "X"
-            new_df.loc[is_x, "금액"] = -new_df.loc[is_x, "금액"]
-            new_df.loc[is_x, "계정코드"] = RE_CODE
-            new_df.loc[is_x, "계정명"] = RE_NAME
-            new_df.loc[is_x, "FS_Element"] = "E"
-            new_df["당기전기"] = "전기"
-            output_sheets[sheet_name] = new_df.reindex(columns=df_columns)
-            # Tax Adjustment
-            tax_effect_rows = new_df[new_df["FS_Element"].isin(["E"])].copy()
-            asset_rows = new_df[new_df["FS_Element"].isin(["A"])].copy()
-            if asset_rows.empty:
-                continue
-            asset_corp = asset_rows.iloc[0]["회사명"]
-            for _, row in tax_effect_rows.iterrows():
-                amount, desc = row["금액"], row.get('설명', '')
-                tax_rate = tax_rates.get(asset_corp, 0.0)
-                tax_effect = amount * tax_rate
-                if abs(tax_effect) > 1:
-                    caje97_new_entries.append({'회사명': asset_corp, '계정코드': RE_CODE, '계정명': RE_NAME, '당기전기': '전기', '금액': tax_effect, '설명': f'법인세효과 ({desc})'})
-                    caje97_new_entries.append({'회사명': asset_corp, '계정코드': DTL_CODE, '계정명': DTL_NAME, '당기전기': '전기', '금액': -tax_effect, '설명': f'법인세효과 ({desc})'})
-
-        # 5. CAJE04: 비지배지분 이월
-        elif caje_type == "CAJE04":
-            new_entries = []
-            new_df = df.copy()
-            ce_rows = new_df[new_df["FS_Element"] == "CE"]
-            total_ce_amount = ce_rows["금액"].sum()
-            for desc, group in ce_rows.groupby('계정코드'):
-                corp = group['회사명'].iloc[0]
-                ce_row = ce_rows[ce_rows['설명'] == desc]
-                ce_code = ce_rows.iloc[0]["계정코드"]
-                ce_name = ce_rows.iloc[0]["계정명"]
-                # Main Adjustment
-                new_entries.append({'회사명': corp, '계정코드': ce_code, '계정명': ce_name, '당기전기': '전기', '금액': total_ce_amount, '설명': f'배당금 조정 ({desc})'})
-                new_entries.append({'회사명': corp, '계정코드': RE_CODE, '계정명': RE_NAME, '당기전기': '전기', '금액': -total_ce_amount, '설명': f'배당금 조정 ({desc})'})
-            output_sheets[sheet_name] = pd.DataFrame(new_entries).reindex(columns=df_columns)
-
-        # 6. CAJE96: X계정 -> 이익잉여금 대체
-        elif caje_type == "CAJE96":
-            new_df = df.copy()
-            is_x = new_df["FS_Element"] == "X"
-            new_df.loc[is_x, "금액"] = -new_df.loc[is_x, "금액"]
-            new_df.loc[is_x, "계정코드"] = RE_CODE
-            new_df.loc[is_x, "계정명"] = RE_NAME
-            new_df.loc[is_x, "FS_Element"] = "E"
-            new_df["당기전기"] = "전기"
-            output_sheets[sheet_name] = new_df.reindex(columns=df_columns)
-            # Tax Adjustment
-            tax_effect_rows = new_df[new_df["FS_Element"].isin(["E"])].copy()
-            for _, row in tax_effect_rows.iterrows():
-                corp, amount, desc = row["회사명"], row["금액"], row.get('설명', '')
-                tax_rate = tax_rates.get(corp, 0.0)
-                tax_effect = amount * tax_rate
-                if abs(tax_effect) > 1:
-                    caje97_new_entries.append({'회사명': corp, '계정코드': RE_CODE, '계정명': RE_NAME, '당기전기': '전기', '금액': tax_effect, '설명': f'법인세효과 ({desc})'})
-                    caje97_new_entries.append({'회사명': corp, '계정코드': DTL_CODE, '계정명': DTL_NAME, '당기전기': '전기', '금액': -tax_effect, '설명': f'법인세효과 ({desc})'})
-
-        # 8. CAJE98: 당기->전기, 비지배순이익->비지배지분
-        elif caje_type == "CAJE98":
-            new_df = df.copy()
-            is_nci_pl = new_df["계정코드"] == NCI_PL_CODE
-            new_df.loc[is_nci_pl, "계정코드"] = NCI_EQUITY_CODE
-            new_df.loc[is_nci_pl, "계정명"] = NCI_EQUITY_NAME
-            new_df["당기전기"] = "전기"
-            output_sheets[sheet_name] = new_df.reindex(columns=df_columns)
-            
-        # 7. CAJE97: '취득일' 등 유지, 신규 법인세 효과 추가
-        elif caje_type == "CAJE97":
-            preserved_rows = df[~df["당기전기"].isin(["당기", "전기"])].copy()
-            output_sheets[sheet_name] = preserved_rows # 임시 저장, 나중에 신규 분개와 합침
-
-        # 기타 조정 (CAJE05, CAJE99 등)
-        else:
-            output_sheets[sheet_name] = df.reindex(columns=df_columns)
-
-
-    # --- CAJE97 최종 처리 ---
-    def find_sheet_name_by_prefix(prefix):
-        for name in original_sheet_names:
-            if name.upper().startswith(prefix):
-                return name
-        return None # 찾지 못한 경우
-
-    caje97_sheet_name = find_sheet_name_by_prefix("CAJE97")
-    if caje97_sheet_name:
-        caje97_df = output_sheets.get(caje97_sheet_name, pd.DataFrame())
-        caje97_cols = input_sheets.get(caje97_sheet_name, pd.DataFrame()).columns
-        if caje97_cols.empty:
-            caje97_cols = ['회사명', '계정코드', '계정명', '당기전기', '금액', '설명']
-
-        new_tax_df = pd.DataFrame(caje97_new_entries)
-        final_caje97_df = pd.concat([caje97_df, new_tax_df], ignore_index=True).reindex(columns=caje97_cols)
-        output_sheets[caje97_sheet_name] = final_caje97_df
-    elif caje97_new_entries: # 시트는 없지만 새로 추가할 항목이 있는 경우
-        caje97_sheet_name = "CAJE97_법인세조정"
-        caje97_cols = ['회사명', '계정코드', '계정명', '당기전기', '금액', '설명']
-        output_sheets[caje97_sheet_name] = pd.DataFrame(caje97_new_entries).reindex(columns=caje97_cols)
-
-
-    # 누락된 시트가 없도록 원본 시트명 순서대로 정렬하여 반환
-    final_ordered_sheets = {name: output_sheets.get(name, pd.DataFrame(columns=input_sheets.get(name, pd.DataFrame()).columns)) for name in original_sheet_names}
-
-    return to_excel(final_ordered_sheets)
+    if ledger.tax_rates is None:
+        raise ValueError("'Info' 시트에 '당기세율' 열이 없습니다.")
+    return [to_excel(template) for template in roll_forward(ledger, coa, periods)]
 
 with tab3:
     st.markdown("---" )
@@ -3225,23 +2426,48 @@ with tab3:
         type="xlsx",
         key="carryover_uploader"
     )
+    stored_periods = period_store.periods() if period_store.enabled else []
+    carryover_source = None
+    if stored_periods:
+        carryover_source = st.selectbox(
+            "이월할 조정명세",
+            [None] + stored_periods,
+            format_func=lambda p: "업로드한 파일" if p is None else f"기간 저장소: {p}",
+            help="기간 저장소에 저장된 기간을 고르면 조정명세 파일을 다시 업로드하지 않고 이월합니다.",
+            key="carryover_source",
+        )
+    carryover_periods = st.number_input(
+        "이월 기간 수",
+        min_value=1,
+        max_value=10,
+        value=1,
+        step=1,
+        key="carryover_periods",
+        help="2 이상이면 이월 결과를 다시 이월해 기간별 템플릿을 한 번에 만듭니다. (재작성 후 여러 기간 재생성용)",
+    )
 
     if st.button("🚀 차기이월 조정명세 생성 실행", key="run_carryover"):
-        if not carryover_adj_file:
+        if not carryover_adj_file and carryover_source is None:
             st.warning("차기이월 할 조정명세 파일을 먼저 업로드해주세요.")
         elif not st.session_state.files["coa"]:
             st.warning("사이드바에서 CoA 파일을 먼저 업로드해주세요.")
         else:
             with st.spinner("차기이월 데이터를 생성하고 있습니다..."):
                 try:
-                    coa_df = pd.read_excel(st.session_state.files["coa"], sheet_name="CoA", dtype=str)
-                    aje_code = pd.read_excel(st.session_state.files["coa"], sheet_name="AJE", dtype=str)
-
-                    carryover_excel_data = generate_carryover_adjustments(
-                        carryover_adj_file, coa_df, aje_code
+                    if carryover_source is not None:
+                        carryover_ledger = period_store.load_ledger(carryover_source)
+                        if carryover_ledger is None:
+                            raise ValueError(f"기간 저장소에서 '{carryover_source}' 조정명세를 읽을 수 없습니다.")
+                    else:
+                        carryover_ledger = load_adjustment_ledger(carryover_adj_file)
+                    carryover_files = generate_carryover_adjustments(
+                        carryover_ledger,
+                        load_coa_model(st.session_state.files["coa"]),
+                        int(carryover_periods),
                     )
 
-                    st.session_state.adj_workflow["carryover_file"] = carryover_excel_data
+                    st.session_state.adj_workflow["carryover_file"] = carryover_files[0]
+                    st.session_state.adj_workflow["carryover_files"] = carryover_files
                     st.success("🎉 차기이월 조정명세 생성이 완료되었습니다!")
 
                 except Exception as e:
@@ -3254,3 +2480,54 @@ with tab3:
                 st.session_state.adj_workflow["carryover_file"], 
                 "조정명세_입력템플릿_carryover.xlsx"
             )
+        for period, data in carryover_period_files()[1:]:
+            if st.button(f"📥 {period}기간 이월 조정명세 다운로드 (Excel)", key=f"download_carryover_{period}"):
+                save_excel_native(data, f"조정명세_입력템플릿_carryover_{period}.xlsx")
+
+
+# =================================================================================================
+# --- 백그라운드 저장 작업 진행 상황 ---
+# =================================================================================================
+def dismiss_save_jobs():
+    """끝난 저장 작업을 진행 상황 패널에서 숨깁니다. (재저장 판단용 기록은 유지)"""
+    for job in st.session_state.save_jobs:
+        if job.done:
+            job.dismissed = True
+
+
+def render_save_jobs():
+    """사이드바에 저장 작업 진행률/결과를 표시합니다. 진행 중인 작업이 있으면 1초마다 갱신합니다."""
+    if not any(not job.dismissed for job in st.session_state.save_jobs):
+        return
+    polling = any(not job.done for job in st.session_state.save_jobs)
+
+    @st.fragment(run_every=1.0 if polling else None)
+    def save_jobs_panel():
+        jobs = [job for job in st.session_state.save_jobs if not job.dismissed]
+        st.subheader("💾 저장 작업")
+        for job in jobs[-5:]:
+            if job.status == "error":
+                st.error(f"{job.label}: 저장 실패 - {job.error}")
+            elif job.done:
+                st.success(f"{job.label}: 저장 완료 ({job.finished_at - job.started_at:.1f}초)\n\n경로: {job.path}")
+            else:
+                st.progress(job.progress, text=f"{job.label}: 저장 중... {job.progress:.0%}")
+        if all(job.done for job in jobs):
+            if polling:
+                st.rerun()  # 모든 작업이 끝나면 한 번 전체를 다시 그려 주기적 갱신을 멈춤
+            st.button("저장 작업 목록 지우기", key="clear_save_jobs", on_click=dismiss_save_jobs)
+
+    save_jobs_panel()
+
+
+with st.sidebar:
+    # 이번 실행에서 만든 결과도 포함되도록 모든 탭을 그린 뒤 표시
+    package_items = close_package_items()
+    if st.button(
+        "📦 마감 패키지 저장 (zip)",
+        disabled=not package_items,
+        help="준비된 결과 워크북을 동시에 만들어 manifest.json과 함께 zip 파일 하나로 저장합니다.",
+        key="save_close_package",
+    ):
+        save_close_package(package_items, ingest_workers)
+    render_save_jobs()
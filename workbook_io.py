@@ -0,0 +1,349 @@
+"""
+업로드된 엑셀 워크북 읽기 도구.
+
+같은 파일(내용 해시 기준)은 시트별로 한 번만 파싱하고,
+파싱 결과를 모든 탭에서 공유합니다.
+자회사가 많은 경우 여러 워크북을 프로세스 풀에서 병렬로 파싱할 수 있습니다.
+
+읽기 엔진
+- openpyxl: pandas 기본 엔진. 읽기 전용(read_only)·값 전용(data_only) 모드로
+  셀 값을 행 단위로 스트리밍합니다.
+- calamine: python-calamine(requirements.txt에 포함) 기반의 Rust 엔진으로,
+  openpyxl보다 수 배 빠르며 기본 엔진입니다.
+  (python-calamine이 없는 환경에서는 openpyxl로 대체)
+"""
+import hashlib
+import importlib.util
+import io
+import multiprocessing
+import os
+import threading
+import weakref
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import pandas as pd
+
+
+def read_file_bytes(file):
+    """업로드 파일(UploadedFile/BytesIO) 또는 경로에서 전체 바이트를 읽습니다."""
+    if isinstance(file, (str, os.PathLike)):
+        with open(file, "rb") as f:
+            return f.read()
+    if hasattr(file, "getvalue"):
+        return file.getvalue()
+    file.seek(0)
+    return file.read()
+
+
+# 업로드 파일 객체별 해시 (같은 객체를 여러 번 읽을 때 다시 해시하지 않음)
+_digest_memo = weakref.WeakKeyDictionary()
+
+
+def file_digest(file):
+    """파일 내용의 SHA-1 해시(hex)를 반환합니다."""
+    if isinstance(file, (str, os.PathLike)):
+        return hashlib.sha1(read_file_bytes(file)).hexdigest()
+    digest = _digest_memo.get(file)
+    if digest is None:
+        digest = hashlib.sha1(read_file_bytes(file)).hexdigest()
+        _digest_memo[file] = digest
+    return digest
+
+
+def remember_digest(file, digest):
+    """이미 계산해 둔 해시를 파일 객체에 연결합니다. (재실행 시 다시 해시하지 않도록)"""
+    if not isinstance(file, (str, os.PathLike)):
+        _digest_memo[file] = digest
+
+
+# 모회사/자회사 재무제표 워크북에서 읽는 시트와 읽기 옵션
+ENTITY_SHEETS = (
+    ("BSPL", {"dtype": {"계정코드": str}}),
+    ("CF", {"dtype": {"계정코드": str, "CF_code": str}}),
+    ("CE", {"header": None}),
+)
+
+
+# 적재 스키마: 키 컬럼은 정규화된 문자열, 금액 컬럼은 숫자(빈 칸 0)
+KEY_COLUMNS = ("계정코드", "CF_code")
+AMOUNT_COLUMNS = ("금액", "조정금액")
+
+
+def normalize_codes(values):
+    """
+    계정코드 정규화: 문자열로 변환 후 공백과 소수점 이하를 제거합니다. ('105100.0' -> '105100')
+    빈 칸은 NaN으로 유지합니다.
+    """
+    normalized = values.astype(str).str.strip().str.split(".").str[0]
+    return normalized.where(values.notna())
+
+
+def apply_ingest_schema(df, drop_blank_rows=False):
+    """
+    시트를 적재 스키마에 맞게 한 번 정규화합니다.
+    - 키 컬럼(계정코드, CF_code)은 normalize_codes로 정규화합니다.
+    - 금액 컬럼(금액, 조정금액)은 숫자로 변환하고 빈 칸은 0으로 채웁니다.
+    - 완전히 빈 행은 drop_blank_rows=True(재무제표 BSPL/CF)이면 제거하고, 아니면
+      (템플릿으로 다시 쓰는 조정명세 시트 등) 금액도 빈 칸인 채로 그대로 둡니다.
+    이후 단계에서는 다시 변환하지 않습니다.
+    """
+    key_cols = [c for c in KEY_COLUMNS if c in df.columns]
+    amount_cols = [c for c in AMOUNT_COLUMNS if c in df.columns]
+    if not key_cols and not amount_cols:
+        return df
+    blank = df.isna().all(axis=1)
+    if drop_blank_rows:
+        df = df[~blank].copy()
+    for col in key_cols:
+        df[col] = normalize_codes(df[col])
+    for col in amount_cols:
+        amounts = pd.to_numeric(df[col], errors="coerce").fillna(0)
+        df[col] = amounts if drop_blank_rows else amounts.mask(blank)
+    return df
+
+
+def available_excel_engines():
+    """사용 가능한 엑셀 읽기 엔진 목록 (빠른 순)."""
+    engines = ["openpyxl"]
+    if importlib.util.find_spec("python_calamine") is not None:
+        engines.insert(0, "calamine")
+    return engines
+
+
+def default_excel_engine():
+    """설치된 엔진 중 가장 빠른 엔진."""
+    return available_excel_engines()[0]
+
+
+def default_ingest_workers():
+    """병렬 읽기에 사용할 기본 프로세스 수 (CPU 코어 수 - 1, 최대 8)."""
+    return max(1, min(8, (os.cpu_count() or 1) - 1))
+
+
+def _read_key(sheet_name, read_kwargs):
+    # dtype 딕셔너리 등 해시 불가능한 인자를 포함하므로 repr로 키를 만든다
+    return (sheet_name, repr(sorted(read_kwargs.items())))
+
+
+def _parse_workbook_sheets(data, sheet_specs, engine="openpyxl"):
+    """
+    [프로세스 풀 작업 함수] 워크북 바이트에서 지정 시트들을 파싱합니다.
+    반환: (시트 이름 목록, {읽기 키: DataFrame})
+    """
+    with pd.ExcelFile(io.BytesIO(data), engine=engine) as xls:
+        sheet_names = list(xls.sheet_names)
+        frames = {
+            _read_key(sheet_name, read_kwargs): xls.parse(sheet_name, **read_kwargs)
+            for sheet_name, read_kwargs in sheet_specs
+            if sheet_name in sheet_names
+        }
+    return sheet_names, frames
+
+
+_process_pool = None
+_process_pool_workers = 0
+_process_pool_lock = threading.Lock()
+
+
+def get_process_pool(max_workers):
+    """
+    재사용 가능한 프로세스 풀을 반환합니다.
+    (Windows/PyInstaller 환경과 동일하게 동작하도록 spawn 방식 사용)
+    작업 프로세스가 비정상 종료되어 깨진 풀은 버리고 새로 만듭니다.
+    """
+    global _process_pool, _process_pool_workers
+    with _process_pool_lock:
+        if (
+            _process_pool is None
+            or _process_pool_workers != max_workers
+            or getattr(_process_pool, "_broken", False)
+        ):
+            if _process_pool is not None:
+                _process_pool.shutdown(wait=False)
+            _process_pool = ProcessPoolExecutor(
+                max_workers=max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            _process_pool_workers = max_workers
+        return _process_pool
+
+
+def discard_process_pool(pool):
+    """
+    깨진 풀(BrokenProcessPool)을 버립니다. 다음 get_process_pool 호출에서 새로 만듭니다.
+    (다른 호출이 이미 새 풀로 바꿨다면 그 풀은 그대로 둠)
+    """
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is pool:
+            _process_pool = None
+    pool.shutdown(wait=False)
+
+
+class _WorkbookEntry:
+    """하나의 워크북(내용 해시)에 대한 파싱 상태."""
+
+    def __init__(self, data, engine="openpyxl", sheet_names=None, frames=None):
+        self.data = data
+        self.engine = engine
+        self._xls = None
+        self._sheet_names = sheet_names
+        self.frames = dict(frames or {})
+        self.lock = threading.Lock()
+
+    @property
+    def xls(self):
+        # 병렬 파싱으로 채워진 항목은 추가 시트가 필요할 때만 워크북을 연다
+        if self._xls is None:
+            self._xls = pd.ExcelFile(io.BytesIO(self.data), engine=self.engine)
+        return self._xls
+
+    @property
+    def sheet_names(self):
+        if self._sheet_names is None:
+            self._sheet_names = list(self.xls.sheet_names)
+        return self._sheet_names
+
+    def close(self):
+        if self._xls is not None:
+            self._xls.close()
+
+
+class WorkbookRegistry:
+    """
+    내용 해시를 키로 워크북 파싱 결과를 보관합니다.
+    - 같은 시트/읽기 옵션은 업로드당 한 번만 파싱합니다.
+    - 호출자가 결과를 수정해도 캐시가 오염되지 않도록 복사본을 반환합니다.
+    - 보관 워크북 수가 max_workbooks를 넘으면 가장 오래 사용하지 않은 것부터 제거합니다.
+    - engine: pandas 엑셀 읽기 엔진 ("openpyxl" 또는 "calamine")
+    """
+
+    def __init__(self, max_workbooks=256, engine="openpyxl"):
+        self.max_workbooks = max_workbooks
+        self.engine = engine
+        self._books = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _entry(self, file):
+        digest = file_digest(file)
+        with self._lock:
+            entry = self._books.get(digest)
+            if entry is not None:
+                self._books.move_to_end(digest)
+                return entry
+        return self._register(
+            digest, _WorkbookEntry(read_file_bytes(file), self.engine)
+        )
+
+    def _register(self, digest, entry):
+        with self._lock:
+            # 다른 세션이 먼저 등록했다면 그 결과를 사용
+            existing = self._books.get(digest)
+            if existing is not None:
+                entry.close()
+                return existing
+            self._books[digest] = entry
+            while len(self._books) > self.max_workbooks:
+                _, evicted = self._books.popitem(last=False)
+                evicted.close()
+        return entry
+
+    def prefetch(self, files, sheet_specs=ENTITY_SHEETS, max_workers=None):
+        """
+        여러 워크북의 지정 시트를 프로세스 풀에서 병렬로 파싱해 등록합니다.
+        이후 read_sheet 호출은 파싱 없이 등록된 결과를 사용합니다.
+        max_workers가 1 이하이거나 대상 파일이 1개 이하이면 아무것도 하지 않습니다.
+        파싱에 실패한 워크북(손상/형식 오류, 작업 프로세스 종료 등)은 등록하지 않으므로
+        이후 read_sheet에서 순차로 다시 읽으며 평소와 같은 오류 처리를 거칩니다.
+        """
+        if max_workers is None:
+            max_workers = default_ingest_workers()
+
+        pending = {}
+        for file in files:
+            digest = file_digest(file)
+            with self._lock:
+                if digest in self._books:
+                    continue
+            if digest not in pending:
+                pending[digest] = read_file_bytes(file)
+
+        if max_workers <= 1 or len(pending) <= 1:
+            return
+
+        pool = get_process_pool(max_workers)
+        try:
+            futures = {
+                digest: pool.submit(
+                    _parse_workbook_sheets, data, tuple(sheet_specs), self.engine
+                )
+                for digest, data in pending.items()
+            }
+        except BrokenProcessPool:
+            discard_process_pool(pool)
+            return
+        for digest, future in futures.items():
+            try:
+                sheet_names, frames = future.result()
+            except BrokenProcessPool:
+                discard_process_pool(pool)
+                continue
+            except Exception:
+                continue
+            self._register(
+                digest,
+                _WorkbookEntry(pending[digest], self.engine, sheet_names, frames),
+            )
+
+    def sheet_names(self, file):
+        """워크북의 시트 이름 목록을 반환합니다."""
+        return list(self._entry(file).sheet_names)
+
+    def read_sheet(
+        self, file, sheet_name, optional=False, normalize=False, drop_blank_rows=False,
+        **read_kwargs
+    ):
+        """
+        시트를 DataFrame으로 반환합니다. (pd.read_excel과 같은 읽기 옵션 사용)
+        optional=True이면 시트가 없을 때 빈 DataFrame을 반환합니다.
+        normalize=True이면 적재 스키마(apply_ingest_schema)를 적용한 결과를 반환합니다.
+        (drop_blank_rows: 완전히 빈 행 제거 여부, 재무제표 BSPL/CF 시트용)
+        """
+        entry = self._entry(file)
+        if (
+            optional
+            and isinstance(sheet_name, str)
+            and sheet_name not in entry.sheet_names
+        ):
+            return pd.DataFrame()
+
+        key = _read_key(sheet_name, read_kwargs)
+        with entry.lock:
+            df = entry.frames.get(key)
+            if df is None:
+                df = entry.xls.parse(sheet_name, **read_kwargs)
+                entry.frames[key] = df
+            if normalize:
+                # 정규화 결과도 업로드당 한 번만 계산
+                normalized_key = ("normalized", drop_blank_rows) + key
+                normalized = entry.frames.get(normalized_key)
+                if normalized is None:
+                    normalized = apply_ingest_schema(df.copy(), drop_blank_rows)
+                    entry.frames[normalized_key] = normalized
+                df = normalized
+        return df.copy()
+
+    def read_workbook(self, file, **read_kwargs):
+        """모든 시트를 {시트명: DataFrame} 형태로 반환합니다. (sheet_name=None과 동일)"""
+        return {
+            name: self.read_sheet(file, name, **read_kwargs)
+            for name in self.sheet_names(file)
+        }
+
+    def clear(self):
+        with self._lock:
+            for entry in self._books.values():
+                entry.close()
+            self._books.clear()